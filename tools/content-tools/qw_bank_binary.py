@@ -0,0 +1,467 @@
+"""Compact binary encoding of a locale question bank (``bank.v1.qwb``).
+
+Layout (little-endian)::
+
+    header          HEADER struct, see below
+    string blocks   block directory + blocks of varint-length-prefixed UTF-8 strings
+    record blocks   block directory + blocks of varint-length-prefixed records
+    id index        sorted (id -> record block, byte offset inside the block)
+    task index      sorted (taskId -> run in the positions array)
+    positions       id index positions grouped by taskId
+
+Every string in a record (keys, ids, stems, choice texts, rationales, ...) is
+stored once in the shared string table and referenced by number. Blocks are
+compressed individually, so a lookup only inflates the blocks it touches; the
+id and task indexes stay uncompressed and are binary-searched straight from the
+memory-mapped file.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:  # optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+MAGIC = b"QWBB"
+FORMAT_VERSION = 1
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+# magic, version, codec, reserved, record_count, string_count,
+# records_per_block, strings_per_block, string_dir_offset, record_dir_offset,
+# id_index_offset, task_index_offset, task_positions_offset
+HEADER = struct.Struct("<4sHBBIIII5Q")
+BLOCK_COUNT = struct.Struct("<I")
+BLOCK_OFFSET = struct.Struct("<Q")
+INDEX_COUNT = struct.Struct("<I")
+# key offset in blob, key length, value a, value b
+INDEX_ENTRY = struct.Struct("<4I")
+POSITION = struct.Struct("<I")
+FLOAT = struct.Struct("<d")
+
+_TAG_NULL = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_FLOAT = 4
+_TAG_STR = 5
+_TAG_LIST = 6
+_TAG_DICT = 7
+
+
+class BinaryBankError(ValueError):
+    pass
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _compress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_NONE:
+        return data
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 9)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise BinaryBankError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    raise BinaryBankError(f"Unknown codec {codec}")
+
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_NONE:
+        return data
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise BinaryBankError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise BinaryBankError(f"Unknown codec {codec}")
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._numbers: Dict[str, int] = {}
+
+    def number(self, value: str) -> int:
+        number = self._numbers.get(value)
+        if number is None:
+            number = len(self.strings)
+            self._numbers[value] = number
+            self.strings.append(value)
+        return number
+
+
+def _encode_value(out: bytearray, value: Any, strings: _StringTable) -> None:
+    if value is None:
+        out.append(_TAG_NULL)
+    elif value is True:
+        out.append(_TAG_TRUE)
+    elif value is False:
+        out.append(_TAG_FALSE)
+    elif isinstance(value, int):
+        if not -(1 << 63) <= value < (1 << 63):
+            raise BinaryBankError(f"Integer out of range: {value}")
+        out.append(_TAG_INT)
+        _write_varint(out, (value << 1) ^ (value >> 63))
+    elif isinstance(value, float):
+        out.append(_TAG_FLOAT)
+        out += FLOAT.pack(value)
+    elif isinstance(value, str):
+        out.append(_TAG_STR)
+        _write_varint(out, strings.number(value))
+    elif isinstance(value, list):
+        out.append(_TAG_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode_value(out, item, strings)
+    elif isinstance(value, dict):
+        out.append(_TAG_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _write_varint(out, strings.number(str(key)))
+            _encode_value(out, item, strings)
+    else:
+        raise BinaryBankError(f"Unsupported value of type {type(value).__name__}")
+
+
+def _decode_value(data: bytes, pos: int, string_at) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _TAG_NULL:
+        return None, pos
+    if tag == _TAG_FALSE:
+        return False, pos
+    if tag == _TAG_TRUE:
+        return True, pos
+    if tag == _TAG_INT:
+        raw, pos = _read_varint(data, pos)
+        return (raw >> 1) ^ -(raw & 1), pos
+    if tag == _TAG_FLOAT:
+        return FLOAT.unpack_from(data, pos)[0], pos + FLOAT.size
+    if tag == _TAG_STR:
+        number, pos = _read_varint(data, pos)
+        return string_at(number), pos
+    if tag == _TAG_LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(data, pos, string_at)
+            items.append(item)
+        return items, pos
+    if tag == _TAG_DICT:
+        count, pos = _read_varint(data, pos)
+        obj: Dict[str, Any] = {}
+        for _ in range(count):
+            key_number, pos = _read_varint(data, pos)
+            obj[string_at(key_number)], pos = _decode_value(data, pos, string_at)
+        return obj, pos
+    raise BinaryBankError(f"Unknown value tag {tag}")
+
+
+def _blocks(items: Sequence[bytes], per_block: int, codec: int) -> Tuple[List[bytes], List[List[int]]]:
+    """Packs items into compressed blocks; also returns each item's offset inside its block."""
+    blocks: List[bytes] = []
+    offsets: List[List[int]] = []
+    for start in range(0, len(items), per_block):
+        raw = bytearray()
+        block_offsets = []
+        for item in items[start:start + per_block]:
+            block_offsets.append(len(raw))
+            _write_varint(raw, len(item))
+            raw += item
+        blocks.append(_compress(bytes(raw), codec))
+        offsets.append(block_offsets)
+    return blocks, offsets
+
+
+def _block_section(base: int, blocks: Sequence[bytes]) -> bytes:
+    out = bytearray(BLOCK_COUNT.pack(len(blocks)))
+    position = base + BLOCK_COUNT.size + BLOCK_OFFSET.size * (len(blocks) + 1)
+    for block in blocks:
+        out += BLOCK_OFFSET.pack(position)
+        position += len(block)
+    out += BLOCK_OFFSET.pack(position)
+    for block in blocks:
+        out += block
+    return bytes(out)
+
+
+def _index_section(entries: Sequence[Tuple[str, int, int]]) -> bytes:
+    blob = bytearray()
+    out = bytearray(INDEX_COUNT.pack(len(entries)))
+    for key, a, b in entries:
+        encoded = key.encode("utf-8")
+        out += INDEX_ENTRY.pack(len(blob), len(encoded), a, b)
+        blob += encoded
+    return bytes(out) + bytes(blob)
+
+
+def encode_binary_bank(
+    questions: Sequence[Mapping[str, Any]],
+    codec: str = "zlib",
+    records_per_block: int = 64,
+    strings_per_block: int = 256,
+) -> bytes:
+    """Encodes questions (in bank order) into the binary bank format."""
+    if codec not in CODECS:
+        raise BinaryBankError(f"Unknown codec {codec!r}; expected one of {sorted(CODECS)}")
+    codec_id = CODECS[codec]
+
+    strings = _StringTable()
+    records: List[bytes] = []
+    for question in questions:
+        out = bytearray()
+        _encode_value(out, dict(question), strings)
+        records.append(bytes(out))
+
+    string_blocks, _ = _blocks([s.encode("utf-8") for s in strings.strings], strings_per_block, codec_id)
+    record_blocks, record_offsets = _blocks(records, records_per_block, codec_id)
+
+    # id index: sorted by id, value = (record block, byte offset inside the block)
+    id_entries = []
+    for ordinal, question in enumerate(questions):
+        block, inner = divmod(ordinal, records_per_block)
+        id_entries.append((str(question.get("id", "")), block, record_offsets[block][inner]))
+    order = sorted(range(len(id_entries)), key=lambda i: (id_entries[i][0], i))
+    id_entries = [id_entries[i] for i in order]
+
+    # task index: taskId -> run of positions in the id index
+    by_task: Dict[str, List[int]] = {}
+    rank = {ordinal: position for position, ordinal in enumerate(order)}
+    for ordinal, question in enumerate(questions):
+        by_task.setdefault(str(question.get("taskId", "")), []).append(rank[ordinal])
+    task_entries = []
+    positions = bytearray()
+    for task_id in sorted(by_task):
+        members = sorted(by_task[task_id])
+        task_entries.append((task_id, len(positions) // POSITION.size, len(members)))
+        for member in members:
+            positions += POSITION.pack(member)
+
+    string_dir_offset = HEADER.size
+    string_section = _block_section(string_dir_offset, string_blocks)
+    record_dir_offset = string_dir_offset + len(string_section)
+    record_section = _block_section(record_dir_offset, record_blocks)
+    id_index_offset = record_dir_offset + len(record_section)
+    id_section = _index_section(id_entries)
+    task_index_offset = id_index_offset + len(id_section)
+    task_section = _index_section(task_entries)
+    task_positions_offset = task_index_offset + len(task_section)
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        codec_id,
+        0,
+        len(records),
+        len(strings.strings),
+        records_per_block,
+        strings_per_block,
+        string_dir_offset,
+        record_dir_offset,
+        id_index_offset,
+        task_index_offset,
+        task_positions_offset,
+    )
+    return header + string_section + record_section + id_section + task_section + bytes(positions)
+
+
+class _BlockedSection:
+    def __init__(self, data: mmap.mmap, offset: int, codec: int, cache_size: int) -> None:
+        self._data = data
+        self._codec = codec
+        self._count = BLOCK_COUNT.unpack_from(data, offset)[0]
+        self._dir = offset + BLOCK_COUNT.size
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def block(self, number: int) -> bytes:
+        cached = self._cache.get(number)
+        if cached is not None:
+            self._cache.move_to_end(number)
+            return cached
+        if not 0 <= number < self._count:
+            raise BinaryBankError(f"Block {number} out of range")
+        start = BLOCK_OFFSET.unpack_from(self._data, self._dir + BLOCK_OFFSET.size * number)[0]
+        end = BLOCK_OFFSET.unpack_from(self._data, self._dir + BLOCK_OFFSET.size * (number + 1))[0]
+        raw = _decompress(self._data[start:end], self._codec)
+        self._cache[number] = raw
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return raw
+
+    @staticmethod
+    def items(raw: bytes) -> Iterator[bytes]:
+        pos = 0
+        while pos < len(raw):
+            length, pos = _read_varint(raw, pos)
+            yield raw[pos:pos + length]
+            pos += length
+
+
+class _Index:
+    def __init__(self, data: mmap.mmap, offset: int) -> None:
+        self._data = data
+        self.count = INDEX_COUNT.unpack_from(data, offset)[0]
+        self._entries = offset + INDEX_COUNT.size
+        self._blob = self._entries + INDEX_ENTRY.size * self.count
+
+    def entry(self, position: int) -> Tuple[int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._data, self._entries + INDEX_ENTRY.size * position)
+
+    def key(self, position: int) -> bytes:
+        key_offset, key_length, _, _ = self.entry(position)
+        start = self._blob + key_offset
+        return self._data[start:start + key_length]
+
+    def find(self, key: str) -> Optional[int]:
+        encoded = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.key(lo) == encoded:
+            return lo
+        return None
+
+
+class BinaryBank:
+    """Memory-mapped random-access reader for ``bank.v1.qwb`` files."""
+
+    def __init__(self, path: Path, cache_blocks: int = 16) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:  # empty file
+            self._file.close()
+            raise BinaryBankError(f"{self.path}: not a binary bank") from exc
+        if len(self._data) < HEADER.size:
+            self.close()
+            raise BinaryBankError(f"{self.path}: truncated header")
+        (
+            magic,
+            version,
+            codec,
+            _,
+            self._record_count,
+            self._string_count,
+            _,
+            self._strings_per_block,
+            string_dir_offset,
+            record_dir_offset,
+            id_index_offset,
+            task_index_offset,
+            self._task_positions,
+        ) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise BinaryBankError(f"{self.path}: unsupported binary bank (magic={magic!r}, version={version})")
+        self._strings = _BlockedSection(self._data, string_dir_offset, codec, cache_blocks * 4)
+        self._records = _BlockedSection(self._data, record_dir_offset, codec, cache_blocks)
+        self._id_index = _Index(self._data, id_index_offset)
+        self._task_index = _Index(self._data, task_index_offset)
+        self._string_blocks: "OrderedDict[int, List[str]]" = OrderedDict()
+
+    def __enter__(self) -> "BinaryBank":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._data.closed:
+            self._data.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def _string(self, number: int) -> str:
+        block_number, inner = divmod(number, self._strings_per_block)
+        decoded = self._string_blocks.get(block_number)
+        if decoded is None:
+            raw = self._strings.block(block_number)
+            decoded = [item.decode("utf-8") for item in _BlockedSection.items(raw)]
+            self._string_blocks[block_number] = decoded
+            if len(self._string_blocks) > 64:
+                self._string_blocks.popitem(last=False)
+        return decoded[inner]
+
+    def _record_at(self, block_number: int, offset: int) -> Dict[str, Any]:
+        raw = self._records.block(block_number)
+        length, pos = _read_varint(raw, offset)
+        value, _ = _decode_value(raw[pos:pos + length], 0, self._string)
+        return value
+
+    def _record_for_position(self, position: int) -> Dict[str, Any]:
+        _, _, block_number, offset = self._id_index.entry(position)
+        return self._record_at(block_number, offset)
+
+    def ids(self) -> List[str]:
+        """All question ids in sorted order, read from the index only."""
+        return [self._id_index.key(i).decode("utf-8") for i in range(self._id_index.count)]
+
+    def task_ids(self) -> List[str]:
+        return [self._task_index.key(i).decode("utf-8") for i in range(self._task_index.count)]
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        position = self._id_index.find(question_id)
+        if position is None:
+            return None
+        return self._record_for_position(position)
+
+    def __contains__(self, question_id: object) -> bool:
+        return isinstance(question_id, str) and self._id_index.find(question_id) is not None
+
+    def by_task(self, task_id: str) -> List[Dict[str, Any]]:
+        """Questions of one task, ordered by id."""
+        position = self._task_index.find(task_id)
+        if position is None:
+            return []
+        _, _, first, count = self._task_index.entry(position)
+        return [
+            self._record_for_position(POSITION.unpack_from(self._data, self._task_positions + POSITION.size * i)[0])
+            for i in range(first, first + count)
+        ]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """All records in bank order."""
+        for block_number in range(len(self._records)):
+            for item in _BlockedSection.items(self._records.block(block_number)):
+                yield _decode_value(item, 0, self._string)[0]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+BANK_MANIFEST_SCHEMA = "questions-bank-manifest-v1"
+BANK_DELTA_SCHEMA = "questions-bank-delta-v1"
+
+
+def question_sha256(question: Mapping[str, Any]) -> str:
+    """Content hash of one bank question; key order is part of it, as it is part of the bank bytes."""
+    payload = json.dumps(question, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_manifest(questions: Sequence[Mapping[str, Any]], locale: str, bank_sha: str) -> Dict[str, Any]:
+    """Per-question hashes of a bank, in bank order; the next build diffs against it."""
+    return {
+        "schema": BANK_MANIFEST_SCHEMA,
+        "locale": locale,
+        "bankSha256": bank_sha,
+        "questions": [
+            {"id": str(question.get("id", "")), "sha256": question_sha256(question)} for question in questions
+        ],
+    }
+
+
+def load_manifest(path: Path) -> Dict[str, Any] | None:
+    if not path.is_file():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("schema") != BANK_MANIFEST_SCHEMA:
+        return None
+    return manifest
+
+
+def _hashes_by_id(entries: Sequence[Mapping[str, str]]) -> Dict[str, List[str]]:
+    # Ids are not unique in every bank; an id changes when any of its questions does
+    by_id: Dict[str, List[str]] = {}
+    for entry in entries:
+        by_id.setdefault(entry["id"], []).append(entry["sha256"])
+    return by_id
+
+
+def build_delta(
+    previous: Mapping[str, Any], manifest: Mapping[str, Any], questions: Sequence[Mapping[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Delta from the bank described by previous to the one described by manifest (questions is that bank).
+
+    patch rebuilds the new bank from the old one: "copy" takes count questions starting at position from
+    of the old bank, "insert" adds new questions verbatim; old questions not copied are dropped.
+    """
+    old_entries = previous["questions"]
+    new_entries = manifest["questions"]
+    old_ids = _hashes_by_id(old_entries)
+    new_ids = _hashes_by_id(new_entries)
+
+    patch: List[Dict[str, Any]] = []
+    matcher = SequenceMatcher(
+        None, [entry["sha256"] for entry in old_entries], [entry["sha256"] for entry in new_entries], autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            patch.append({"op": "copy", "from": i1, "count": i2 - i1})
+        elif tag in ("replace", "insert"):
+            if patch and patch[-1]["op"] == "insert":
+                patch[-1]["questions"].extend(questions[j1:j2])
+            else:
+                patch.append({"op": "insert", "questions": list(questions[j1:j2])})
+
+    changed = sorted(question_id for question_id in old_ids.keys() & new_ids.keys() if old_ids[question_id] != new_ids[question_id])
+    added = sorted(new_ids.keys() - old_ids.keys())
+    return {
+        "schema": BANK_DELTA_SCHEMA,
+        "locale": manifest["locale"],
+        "fromBankSha256": previous["bankSha256"],
+        "toBankSha256": manifest["bankSha256"],
+        "fromCount": len(old_entries),
+        "toCount": len(new_entries),
+        "added": added,
+        "removed": sorted(old_ids.keys() - new_ids.keys()),
+        "changed": changed,
+        "hashes": {question_id: new_ids[question_id] for question_id in sorted(added + changed)},
+        "patch": patch,
+    }
+
+
+def apply_delta(previous_questions: Sequence[Any], delta: Mapping[str, Any]) -> List[Any]:
+    """Reference implementation of what the app does with a delta: the new bank, in bank order."""
+    if len(previous_questions) != delta["fromCount"]:
+        raise ValueError(f"delta expects a bank of {delta['fromCount']} questions, got {len(previous_questions)}")
+    questions: List[Any] = []
+    for step in delta["patch"]:
+        if step["op"] == "copy":
+            questions.extend(previous_questions[step["from"] : step["from"] + step["count"]])
+        elif step["op"] == "insert":
+            questions.extend(step["questions"])
+        else:
+            raise ValueError(f"unknown delta op {step['op']!r}")
+    return questions
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:  # optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+SHARD_TABLE_SCHEMA = "questions-bank-shards-v1"
+SHARD_MODES = ("task", "bytes")
+SHARD_CODECS = {"gzip": ".json.gz", "zstd": ".json.zst"}
+DEFAULT_SHARD_BYTES = 256 * 1024
+
+
+class ShardError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """How a locale bank is split: one shard per taskId, or runs of the bank under max_bytes."""
+
+    mode: str = "task"
+    codec: str = "gzip"
+    max_bytes: int = DEFAULT_SHARD_BYTES
+
+    def fingerprint(self) -> Dict[str, Any]:
+        fingerprint: Dict[str, Any] = {"mode": self.mode, "codec": self.codec}
+        if self.mode == "bytes":
+            fingerprint["maxBytes"] = self.max_bytes
+        return fingerprint
+
+
+def _minified(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        # mtime=0 keeps the output byte-for-byte reproducible
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ShardError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    raise ShardError(f"Unknown shard codec {codec!r}; expected one of {sorted(SHARD_CODECS)}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ShardError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ShardError(f"Unknown shard codec {codec!r}; expected one of {sorted(SHARD_CODECS)}")
+
+
+def plan_shards(questions: Sequence[Mapping[str, Any]], spec: ShardSpec) -> List[Tuple[str, List[Mapping[str, Any]]]]:
+    """
+    Splits a bank, in bank order, into named shards. The byte budget is on the minified,
+    uncompressed JSON, i.e. what the device holds after inflating one shard; a question
+    larger than the budget gets a shard of its own.
+    """
+    if spec.mode == "task":
+        by_task: Dict[str, List[Mapping[str, Any]]] = {}
+        for question in questions:
+            by_task.setdefault(str(question.get("taskId", "")), []).append(question)
+        return sorted(by_task.items())
+    if spec.mode != "bytes":
+        raise ShardError(f"Unknown shard mode {spec.mode!r}; expected one of {list(SHARD_MODES)}")
+
+    shards: List[List[Mapping[str, Any]]] = []
+    current: List[Mapping[str, Any]] = []
+    size = 2  # "[]"
+    for question in questions:
+        item_size = len(_minified(question)) + (1 if current else 0)
+        if current and size + item_size > spec.max_bytes:
+            shards.append(current)
+            current = []
+            size = 2
+            item_size -= 1
+        current.append(question)
+        size += item_size
+    if current:
+        shards.append(current)
+    return [(f"{number:04d}", shard) for number, shard in enumerate(shards)]
+
+
+def encode_shard(questions: Sequence[Mapping[str, Any]], codec: str) -> Tuple[bytes, int]:
+    """Compressed minified JSON array of the shard and its uncompressed size."""
+    payload = _minified(list(questions))
+    return compress(payload, codec), len(payload)
+
+
+def shard_entry(
+    locale: str, name: str, questions: Sequence[Mapping[str, Any]], spec: ShardSpec, sha: str, size: int, raw_size: int
+) -> Dict[str, Any]:
+    ids = [str(question.get("id", "")) for question in questions]
+    return {
+        "path": f"questions/{locale}/shards/{name}{SHARD_CODECS[spec.codec]}",
+        "sha256": sha,
+        "count": len(questions),
+        "firstId": min(ids),
+        "lastId": max(ids),
+        "taskIds": sorted({str(question.get("taskId", "")) for question in questions}),
+        "size": size,
+        "rawSize": raw_size,
+    }
+
+
+def shard_file(questions_root: Path, path: str) -> Path:
+    """
+    File of a shard path from the table. Paths are asset paths (questions/<locale>/shards/...), as in the
+    files maps; the first part stands for the questions root, whatever the directory is called on disk.
+    """
+    return Path(questions_root) / path.split("/", 1)[1]
+
+
+def build_shard_table(locale: str, spec: ShardSpec, bank_sha: str, shards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"schema": SHARD_TABLE_SCHEMA, "locale": locale, "bankSha256": bank_sha, **spec.fingerprint(), "shards": shards}
+
+
+class ShardedBank:
+    """
+    Reads a sharded bank through its table (a locale index.json with a "shards" member, or
+    bank.shards.v1.json). A lookup inflates only the shards whose id range holds the id;
+    the last cache_shards of them stay in memory.
+    """
+
+    def __init__(self, table_path: Path, cache_shards: int = 4, verify: bool = True) -> None:
+        data = json.loads(Path(table_path).read_text(encoding="utf-8"))
+        table = data if data.get("schema") == SHARD_TABLE_SCHEMA else data.get("shards")
+        if not isinstance(table, dict) or table.get("schema") != SHARD_TABLE_SCHEMA:
+            raise ShardError(f"{table_path}: no shard table")
+        self.table = table
+        # The table sits in <questions root>/<locale>/; see shard_file
+        self.questions_root = Path(table_path).resolve().parents[1]
+        self.cache_shards = cache_shards
+        self.verify = verify
+        self.loads = 0
+        self._shards: "OrderedDict[str, Dict[str, Mapping[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(shard["count"] for shard in self.table["shards"])
+
+    def _load(self, shard: Mapping[str, Any]) -> Dict[str, Mapping[str, Any]]:
+        path = shard["path"]
+        cached = self._shards.get(path)
+        if cached is not None:
+            self._shards.move_to_end(path)
+            return cached
+        raw = shard_file(self.questions_root, path).read_bytes()
+        if self.verify and hashlib.sha256(raw).hexdigest() != shard["sha256"]:
+            raise ShardError(f"{path}: sha256 does not match the shard table")
+        self.loads += 1
+        by_id: Dict[str, Mapping[str, Any]] = {}
+        for question in json.loads(decompress(raw, self.table["codec"])):
+            by_id.setdefault(str(question.get("id", "")), question)
+        self._shards[path] = by_id
+        while len(self._shards) > self.cache_shards:
+            self._shards.popitem(last=False)
+        return by_id
+
+    def get(self, question_id: str) -> Optional[Mapping[str, Any]]:
+        for shard in self.table["shards"]:
+            if shard["firstId"] <= question_id <= shard["lastId"]:
+                question = self._load(shard).get(question_id)
+                if question is not None:
+                    return question
+        return None
+
+    def iter_questions(self) -> Iterator[Mapping[str, Any]]:
+        """Every question in shard order: bank order for byte shards, grouped by taskId for task shards."""
+        for shard in self.table["shards"]:
+            raw = shard_file(self.questions_root, shard["path"]).read_bytes()
+            yield from json.loads(decompress(raw, self.table["codec"]))
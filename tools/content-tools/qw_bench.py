@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover - platform dependent
+    resource = None
+
+import qw_fix_familyid
+import qw_ru_lint
+from qw_content_loader import iter_question_files
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# The bank generator lives one level up, in tools/
+if str(REPO_ROOT / "tools") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+import generate_bank_and_index_from_assets as bank_generator  # noqa: E402
+
+BENCH_VERSION = 1
+TOOLS = ("familyid", "ru_lint", "bank_cold", "bank_warm")
+LOCALES = ("en", "ru")
+_LATIN_WORD = re.compile(r"\b[A-Za-z][a-z]{3,}\b")
+
+
+@dataclass
+class BenchResult:
+    name: str
+    tool: str
+    scale: int
+    glossary_terms: int | None
+    files: int
+    seconds: float
+    files_per_sec: float
+    peak_rss_kb: int | None
+
+
+def synthesize_content(source_root: Path, out_root: Path, scale: int) -> int:
+    """Writes scale copies of every localized question under out_root, with unique ids; returns the file count."""
+    count = 0
+    for locale in LOCALES:
+        for path in sorted((source_root / locale).rglob("*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(data, dict) or not data.get("id"):
+                continue
+            target_dir = out_root / locale / path.parent.name
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for copy in range(scale):
+                question = dict(data)
+                if copy:
+                    question["id"] = f"{data['id']}x{copy}"
+                (target_dir / f"{path.stem}.x{copy}.json").write_text(
+                    json.dumps(question, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+                )
+                count += 1
+    return count
+
+
+def synthesize_assets(content_root: Path, questions_root: Path) -> int:
+    """Aggregates a content tree into <locale>/tasks/<taskId>.json bundles, as the generator expects them."""
+    count = 0
+    for locale in LOCALES:
+        tasks: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for path in sorted((content_root / locale).rglob("*.json")):
+            question = json.loads(path.read_text(encoding="utf-8"))
+            tasks[question["taskId"]].append(question)
+        tasks_dir = questions_root / locale / "tasks"
+        tasks_dir.mkdir(parents=True, exist_ok=True)
+        for task_id, questions in sorted(tasks.items()):
+            (tasks_dir / f"{task_id}.json").write_text(
+                json.dumps(questions, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            count += 1
+    return count
+
+
+def synthesize_glossary(base_glossary: Path, content_root: Path, out_path: Path, terms: int) -> int:
+    """Real glossary rows first, then the most frequent Latin words of the RU content, up to terms rows."""
+    rows = [
+        line for line in base_glossary.read_text(encoding="utf-8").splitlines()
+        if line.startswith("|") and not line.startswith("| ---") and "Англицизм" not in line
+    ][:terms]
+    known = {row.strip("|").split("|")[0].strip().lower() for row in rows}
+
+    words: Counter[str] = Counter()
+    for path in sorted((content_root / "ru").rglob("*.json")):
+        words.update(word.lower() for word in _LATIN_WORD.findall(path.read_text(encoding="utf-8")))
+    # Words that only ever show up in JSON keys would never match a value
+    for key in ("choice", "choices", "correctid", "rationales", "stem", "taskid", "difficulty", "text"):
+        words.pop(key, None)
+
+    index = 0
+    for word, _ in words.most_common():
+        if len(rows) >= terms:
+            break
+        if word in known:
+            continue
+        rows.append(f"| {word} | термин-{index} | synthetic |")
+        index += 1
+    while len(rows) < terms:
+        rows.append(f"| qwbenchterm{index} | термин-{index} | synthetic |")
+        index += 1
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(
+        "| Англицизм | Предпочтительный термин | Комментарий |\n| --- | --- | --- |\n" + "\n".join(rows) + "\n",
+        encoding="utf-8",
+    )
+    return len(rows)
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _clear_bank_outputs(questions_root: Path) -> None:
+    for path in [questions_root / "index.json", *questions_root.glob("*/bank.v1.*"), *questions_root.glob("*/index.json")]:
+        path.unlink(missing_ok=True)
+
+
+def measure(tool: str, work_root: Path, glossary: Path | None, jobs: int) -> Dict[str, Any]:
+    """Runs one tool once in this process and reports files, wall time and peak RSS."""
+    content_root = work_root / "content"
+    questions_root = work_root / "assets"
+    cache_file = work_root / "bank-build-cache.json"
+
+    if tool == "familyid":
+        files = sum(1 for _ in iter_question_files(content_root))
+        start = time.perf_counter()
+        qw_fix_familyid.process(content_root, apply=False)
+    elif tool == "ru_lint":
+        if glossary is None:
+            raise ValueError("ru_lint needs a glossary")
+        paths = list(iter_question_files(content_root / "ru"))
+        files = len(paths)
+        start = time.perf_counter()
+        entries = qw_ru_lint.load_glossary(glossary)
+        qw_ru_lint.lint_paths(paths, entries, apply=False, report_dir=None, jobs=jobs)
+    elif tool in ("bank_cold", "bank_warm"):
+        files = sum(1 for _ in questions_root.glob("*/tasks/*.json"))
+        _clear_bank_outputs(questions_root)
+        cache_file.unlink(missing_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if tool == "bank_warm":
+                # Prime outputs and cache; the timed run is the no-op rebuild
+                bank_generator.build_banks_and_indexes(questions_root, bank_generator.BuildCache(cache_file), jobs=jobs)
+            start = time.perf_counter()
+            bank_generator.build_banks_and_indexes(questions_root, bank_generator.BuildCache(cache_file), jobs=jobs)
+    else:
+        raise ValueError(f"Unknown tool {tool!r}")
+
+    seconds = time.perf_counter() - start
+    return {"files": files, "seconds": seconds, "peak_rss_kb": _peak_rss_kb()}
+
+
+def _measure_in_subprocess(tool: str, work_root: Path, glossary: Path | None, jobs: int) -> Dict[str, Any]:
+    # A fresh interpreter per sample keeps peak RSS and parse caches from leaking between runs
+    command = [sys.executable, str(Path(__file__).resolve()), "--measure", tool, "--work-dir", str(work_root), "--jobs", str(jobs)]
+    if glossary is not None:
+        command += ["--glossary", str(glossary)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{tool} benchmark failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_suite(
+    source_root: Path,
+    base_glossary: Path,
+    work_dir: Path,
+    scales: Sequence[int],
+    glossary_sizes: Sequence[int],
+    tools: Sequence[str],
+    repeat: int,
+    jobs: int,
+) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    for scale in scales:
+        work_root = work_dir / f"x{scale}"
+        shutil.rmtree(work_root, ignore_errors=True)
+        synthesize_content(source_root, work_root / "content", scale)
+        synthesize_assets(work_root / "content", work_root / "assets")
+
+        for tool in tools:
+            variants: List[int | None] = list(glossary_sizes) if tool == "ru_lint" else [None]
+            for terms in variants:
+                glossary = None
+                name = f"{tool}/x{scale}"
+                if terms is not None:
+                    glossary = work_root / f"glossary-{terms}.md"
+                    synthesize_glossary(base_glossary, work_root / "content", glossary, terms)
+                    name += f"/glossary-{terms}"
+
+                samples = [_measure_in_subprocess(tool, work_root, glossary, jobs) for _ in range(repeat)]
+                best = min(sample["seconds"] for sample in samples)
+                peaks = [sample["peak_rss_kb"] for sample in samples if sample["peak_rss_kb"] is not None]
+                files = samples[0]["files"]
+                result = BenchResult(
+                    name=name,
+                    tool=tool,
+                    scale=scale,
+                    glossary_terms=terms,
+                    files=files,
+                    seconds=round(best, 4),
+                    files_per_sec=round(files / best, 1) if best > 0 else 0.0,
+                    peak_rss_kb=max(peaks) if peaks else None,
+                )
+                print(f"{name:<32} {result.files:>8} files {result.seconds:>9.3f} s {result.files_per_sec:>10.1f} files/s "
+                      f"{result.peak_rss_kb or 0:>9} KB")
+                results.append(result)
+    return results
+
+
+def write_results(results: Sequence[BenchResult], out_path: Path, meta: Dict[str, Any]) -> None:
+    payload = {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **meta,
+        "results": [asdict(result) for result in results],
+    }
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark familyId fixing, RU linting and bank generation on synthetic content trees.",
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Questions to replicate into the synthetic trees (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--glossary",
+        type=Path,
+        default=REPO_ROOT / "docs" / "glossary_ru.md",
+        help="Base glossary; synthetic glossaries extend it with frequent Latin words (default: %(default)s)",
+    )
+    parser.add_argument("--scales", type=_int_list, default=[1, 10, 100], help="Comma-separated tree sizes relative to --content-root (default: 1,10,100)")
+    parser.add_argument("--glossary-sizes", type=_int_list, default=[5, 100, 1000], help="Comma-separated glossary sizes for ru_lint (default: 5,100,1000)")
+    parser.add_argument("--tools", default=",".join(TOOLS), help="Comma-separated subset of: %(default)s")
+    parser.add_argument("--repeat", type=int, default=3, help="Samples per benchmark; the fastest is kept (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes passed to ru_lint and the bank build (default: %(default)s)")
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        help="Where to synthesize the trees (default: a temporary directory, removed afterwards)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=REPO_ROOT / "build" / "content-bench" / "results.json",
+        help="Results JSON, usable as a baseline for qw_bench_compare.py (default: %(default)s)",
+    )
+    parser.add_argument("--measure", choices=TOOLS, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.work_dir, args.glossary if args.measure == "ru_lint" else None, args.jobs)))
+        return 0
+
+    tools = [tool for tool in args.tools.split(",") if tool]
+    unknown = sorted(set(tools) - set(TOOLS))
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)}")
+
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="qw-bench-")))
+        results = run_suite(
+            args.content_root, args.glossary, work_dir, args.scales, args.glossary_sizes, tools, args.repeat, args.jobs
+        )
+    write_results(results, args.out, {"scales": args.scales, "glossarySizes": args.glossary_sizes, "repeat": args.repeat, "jobs": args.jobs})
+    print(f"Wrote {len(results)} result(s) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+@dataclass
+class Comparison:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {result["name"]: result for result in data.get("results", [])}
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    max_slowdown: float,
+    max_rss_growth: float,
+    min_delta_seconds: float = 0.0,
+) -> tuple[List[Comparison], List[Comparison]]:
+    """All comparisons for benchmarks present in both runs, and the subset over the thresholds."""
+    comparisons: List[Comparison] = []
+    regressions: List[Comparison] = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        checks = [("seconds", max_slowdown)]
+        if old.get("peak_rss_kb") and new.get("peak_rss_kb"):
+            checks.append(("peak_rss_kb", max_rss_growth))
+        for metric, threshold in checks:
+            comparison = Comparison(name, metric, float(old[metric]), float(new[metric]))
+            comparisons.append(comparison)
+            if metric == "seconds" and comparison.current - comparison.baseline < min_delta_seconds:
+                continue
+            if comparison.change > threshold:
+                regressions.append(comparison)
+    return comparisons, regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare two qw_bench.py result files and fail on time or memory regressions.",
+    )
+    parser.add_argument("baseline", type=Path, help="Baseline results JSON")
+    parser.add_argument("current", type=Path, help="Results JSON to check against the baseline")
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=0.15,
+        help="Allowed relative wall-time increase before failing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-rss-growth",
+        type=float,
+        default=0.20,
+        help="Allowed relative peak RSS increase before failing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-delta-seconds",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this in absolute terms; timer noise on tiny runs (default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+
+    comparisons, regressions = compare(
+        baseline, current, args.max_slowdown, args.max_rss_growth, args.min_delta_seconds
+    )
+    for comparison in comparisons:
+        marker = "REGRESSION" if comparison in regressions else ""
+        print(
+            f"{comparison.name:<32} {comparison.metric:<12} {comparison.baseline:>12.3f} -> {comparison.current:>12.3f} "
+            f"({comparison.change:+.1%}) {marker}".rstrip()
+        )
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<32} missing from {args.current}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over the thresholds.")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def add_changed_files_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--paths-from",
+        metavar="FILE",
+        help="Only process the files listed in FILE (one per line, '-' for stdin), "
+        "e.g. the output of scripts/changed-files.sh",
+    )
+    group.add_argument(
+        "--since",
+        metavar="GIT_REV",
+        help="Only process files added or modified since GIT_REV (committed, staged, unstaged or untracked)",
+    )
+
+
+def read_paths(source: str) -> List[Path]:
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    return [Path(line.strip()) for line in lines if line.strip()]
+
+
+def _git_lines(args: Sequence[str], repo_root: Path) -> List[str]:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_root,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def git_changed_paths(since: str, repo_root: Path = REPO_ROOT) -> List[Path]:
+    """Files added, copied, modified or renamed between since and the working tree, plus untracked files."""
+    names = _git_lines(["diff", "--name-only", "--diff-filter=ACMR", since, "--"], repo_root)
+    names += _git_lines(["ls-files", "--others", "--exclude-standard"], repo_root)
+    return [repo_root / name for name in names]
+
+
+def _resolve(path: Path, repo_root: Path) -> Path:
+    if path.is_absolute():
+        return path
+    # scripts/changed-files.sh prints repo-relative paths; hand-written lists may be cwd-relative
+    if path.exists():
+        return path.resolve()
+    return repo_root / path
+
+
+def select_question_files(content_root: Path, paths: Iterable[Path], repo_root: Path = REPO_ROOT) -> List[Path]:
+    """Keeps the existing *.json files under content_root, sorted and de-duplicated."""
+    root = content_root.resolve()
+    selected = set()
+    for path in paths:
+        resolved = _resolve(path, repo_root).resolve()
+        if resolved.suffix != ".json" or not resolved.is_file():
+            continue
+        if resolved == root or root in resolved.parents:
+            selected.add(resolved)
+    return sorted(selected)
+
+
+def changed_paths_from_args(args: argparse.Namespace, repo_root: Path = REPO_ROOT) -> List[Path] | None:
+    """The explicit file selection requested on the command line, or None for a full-tree run."""
+    if getattr(args, "paths_from", None):
+        return read_paths(args.paths_from)
+    if getattr(args, "since", None):
+        return git_changed_paths(args.since, repo_root)
+    return None
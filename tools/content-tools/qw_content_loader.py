@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from qw_changed_files import select_question_files
+from qw_profile import count, stage
+from qw_schema import CompiledSchema, question_issues
+
+REQUIRED_QUESTION_FIELDS = ("id", "taskId", "stem", "choices", "correctId")
+
+# What the bank build relies on; schemas/question.schema.json is stricter and checked by qw_validate
+BUNDLE_QUESTION_SCHEMA = CompiledSchema(
+    {
+        "type": "object",
+        "required": list(REQUIRED_QUESTION_FIELDS),
+        "properties": {
+            "choices": {
+                "type": "array",
+                "minItems": 1,
+                "items": {"type": "object", "required": ["id", "text"]},
+            }
+        },
+    }
+)
+
+
+class ContentDocument:
+    """One JSON file as read from disk; parsed lazily and shared, so callers must not mutate ``data``."""
+
+    def __init__(self, path: Path, raw: bytes) -> None:
+        self.path = path
+        self.raw = raw
+        self._text: str | None = None
+        self._data: Any = None
+        self._parsed = False
+        self._sha256: str | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.raw.decode("utf-8")
+        return self._text
+
+    @property
+    def data(self) -> Any:
+        if not self._parsed:
+            try:
+                with stage("parse", trace=False):
+                    self._data = json.loads(self.text)
+            except json.JSONDecodeError as exc:
+                raise RuntimeError(f"Invalid JSON in {self.path}: {exc}") from exc
+            self._parsed = True
+        return self._data
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            with stage("hash", trace=False):
+                self._sha256 = hashlib.sha256(self.raw).hexdigest()
+        return self._sha256
+
+
+class ContentLoader:
+    """LRU cache of ContentDocument keyed by path, mtime and size."""
+
+    def __init__(self, max_entries: int = 8192) -> None:
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, Tuple[int, int, ContentDocument]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path) -> ContentDocument:
+        key = str(path.resolve())
+        stat = path.stat()
+        cached = self._documents.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            self._documents.move_to_end(key)
+            self.hits += 1
+            count("loader.hits")
+            return cached[2]
+
+        self.misses += 1
+        count("loader.misses")
+        with stage("read", trace=False):
+            document = ContentDocument(path, path.read_bytes())
+        self._documents[key] = (stat.st_mtime_ns, stat.st_size, document)
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+        return document
+
+    def prime(self, path: Path, raw: bytes, data: Any) -> ContentDocument:
+        """Caches a file this process has just written, so the next load neither reads nor parses it."""
+        document = ContentDocument(path, raw)
+        document._data = data
+        document._parsed = True
+        stat = path.stat()
+        key = str(path.resolve())
+        self._documents[key] = (stat.st_mtime_ns, stat.st_size, document)
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+        return document
+
+    def peek(self, path: Path) -> ContentDocument | None:
+        """The cached document if the file has not changed since, without reading it or counting a hit."""
+        cached = self._documents.get(str(path.resolve()))
+        if cached is None:
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return cached[2] if cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size else None
+
+    def invalidate(self, path: Path) -> None:
+        self._documents.pop(str(path.resolve()), None)
+
+    def clear(self) -> None:
+        self._documents.clear()
+
+    def iter_documents(self, content_root: Path, paths: Iterable[Path] | None = None) -> Iterator[ContentDocument]:
+        for path in iter_question_files(content_root, paths):
+            yield self.load(path)
+
+
+# Shared by every tool running in this process, so a combined run parses each file once
+default_loader = ContentLoader()
+
+
+def load_document(path: Path) -> ContentDocument:
+    return default_loader.load(path)
+
+
+def iter_question_files(content_root: Path, paths: Iterable[Path] | None = None) -> Iterable[Path]:
+    with stage("discover", root=str(content_root)):
+        if paths is not None:
+            files = select_question_files(content_root, paths)
+        else:
+            files = [path for path in sorted(content_root.rglob("*.json")) if path.is_file()]
+    count("files.discovered", len(files))
+    yield from files
+
+
+def validate_task_questions(data: Any, task_path: Path, task_id: str) -> List[Dict[str, Any]]:
+    """
+    Checks the invariants of an aggregated task bundle (questions/<locale>/tasks/<taskId>.json)
+    and reports every violation in the bundle at once.
+    """
+    if not isinstance(data, list):
+        raise ValueError(
+            f"{task_path}: expected JSON array of questions, got {type(data).__name__}"
+        )
+
+    problems: List[str] = []
+    for idx, q in enumerate(data):
+        issues = BUNDLE_QUESTION_SCHEMA.validate(q)
+        if isinstance(q, dict):
+            issues.extend(question_issues(q, task_id))
+        problems.extend(f"question #{idx} {issue}" for issue in issues)
+    if problems:
+        details = "\n".join(f"  {problem}" for problem in problems)
+        raise ValueError(f"{task_path}: {len(problems)} invalid value(s):\n{details}")
+    return list(data)
+
+
+def load_task_questions(
+    task_path: Path, locale: str, task_id: str, loader: ContentLoader | None = None
+) -> List[Dict[str, Any]]:
+    document = (loader or default_loader).load(task_path)
+    return validate_task_questions(document.data, task_path, task_id)
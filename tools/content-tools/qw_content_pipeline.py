@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import qw_fix_familyid
+import qw_ru_lint
+import qw_validate
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args
+from qw_content_loader import default_loader, iter_question_files, load_document
+from qw_profile import add_profile_arguments, profiling_from_args
+from qw_watch import open_watcher, wait_for_changes
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# The bank generator lives one level up, in tools/
+if str(REPO_ROOT / "tools") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+import generate_bank_and_index_from_assets as bank_generator  # noqa: E402
+
+TaskKey = Tuple[str, str]
+
+
+def _stat_key(path: Path) -> Tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class WatchSession:
+    """
+    State kept in memory between watch cycles: the compiled glossary, the parsed members of every
+    task bundle and the bank build cache, so a save only re-processes the files that changed.
+    """
+
+    def __init__(self, args: argparse.Namespace, jobs: int) -> None:
+        self.args = args
+        self.jobs = jobs
+        self.content_root: Path = args.content_root
+        self.questions_root: Path = args.questions_root
+        self.glossary: qw_ru_lint.Glossary | None = None
+        self.glossary_stat: Tuple[int, int] | None = None
+        self.lint_cache: qw_ru_lint.LintCache | None = None
+        self.bank_cache = bank_generator.BuildCache(None if args.no_cache else args.cache_file)
+        schema_args = qw_validate.build_parser().parse_args(["--content-root", str(self.content_root)])
+        self.schema_target = next(target for target in qw_validate.build_targets(schema_args) if target.kind == "questions")
+        # (locale, taskId) -> source file -> parsed question
+        self.tasks: Dict[TaskKey, Dict[Path, Dict[str, Any]]] = {}
+        # Last seen mtime/size per file; events that do not move them (our own writes included) are ignored
+        self.seen: Dict[Path, Tuple[int, int]] = {}
+        for path in iter_question_files(self.content_root):
+            self._remember(path)
+
+    def task_key(self, path: Path) -> TaskKey | None:
+        """Only content/questions/<locale>/<taskId>/*.json make up task bundles, as in build-questions-dist.mjs."""
+        try:
+            parts = path.relative_to(self.content_root).parts
+        except ValueError:
+            return None
+        if len(parts) != 3 or parts[0] not in bank_generator.LOCALES:
+            return None
+        return parts[0], parts[1]
+
+    def _remember(self, path: Path, parsed: bool = True) -> None:
+        stat = _stat_key(path)
+        key = self.task_key(path)
+        if stat is None:
+            self.seen.pop(path, None)
+            if key is not None:
+                self.tasks.get(key, {}).pop(path, None)
+            return
+        self.seen[path] = stat
+        if key is not None and parsed:
+            try:
+                self.tasks.setdefault(key, {})[path] = load_document(path).data
+            except RuntimeError as exc:
+                print(f"[watch] {exc}")
+
+    def _load_glossary(self) -> qw_ru_lint.Glossary:
+        stat = _stat_key(self.args.glossary)
+        if self.glossary is None or stat != self.glossary_stat:
+            self.glossary = qw_ru_lint.load_glossary(self.args.glossary)
+            self.glossary_stat = stat
+            glossary_sha = qw_ru_lint.sha256_of_bytes(self.args.glossary.read_bytes())
+            self.lint_cache = qw_ru_lint.LintCache(qw_ru_lint.build_parser().get_default("cache_file"), glossary_sha)
+        return self.glossary
+
+    def _expand(self, changed: Iterable[Path]) -> Set[Path]:
+        """Changed files, plus everything under reported directories (new, moved or rescanned trees)."""
+        paths: Set[Path] = set()
+        for path in changed:
+            if path.suffix == ".json" and not path.is_dir():
+                paths.add(path)
+                continue
+            paths.update(iter_question_files(path) if path.is_dir() else [])
+            paths.update(known for known in self.seen if known.is_relative_to(path))
+        return {path for path in paths if _stat_key(path) != self.seen.get(path)}
+
+    def write_task_bundle(self, key: TaskKey) -> bool:
+        locale, task_id = key
+        bundle_path = self.questions_root / locale / "tasks" / f"{task_id}.json"
+        _, written = bank_generator.write_task_bundle(bundle_path, self.tasks.get(key, {}), self.bank_cache)
+        return written
+
+    def cycle(self, changed: Iterable[Path]) -> None:
+        start = time.perf_counter()
+        paths = sorted(self._expand(changed))
+        if not paths:
+            return
+
+        for path in paths:
+            default_loader.invalidate(path)
+        existing: List[Path] = []
+        for path in paths:
+            if not path.is_file():
+                continue
+            try:
+                load_document(path).data
+            except RuntimeError as exc:
+                # Usually a half-written save; the next event for the file retries it
+                print(f"[watch] {exc}")
+                continue
+            existing.append(path)
+
+        # Same gate as the schema step of run(): a file that fails it never reaches a task bundle
+        invalid: Set[Path] = set()
+        for path in existing:
+            issues = qw_validate.validate_file(path, self.schema_target)
+            for issue in issues:
+                print(f"[schema] {issue}")
+            if issues:
+                invalid.add(path)
+        existing = [path for path in existing if path not in invalid]
+
+        updates = qw_fix_familyid.process(self.content_root, apply=self.args.apply, paths=existing)
+        for update in updates:
+            print(f"[watch] familyId {update.path}: {update.previous or '<empty>'} -> {update.new}")
+
+        glossary = self._load_glossary()
+        linted = qw_ru_lint.lint_paths(
+            existing, glossary, apply=self.args.apply, report_dir=self.args.report_dir, cache=self.lint_cache
+        )
+        for result in linted:
+            if result.changed and result.diff_text:
+                print(result.diff_text)
+        if self.lint_cache is not None:
+            self.lint_cache.save()
+
+        touched = set()
+        blocked = set()
+        for path in paths:
+            # An invalid file keeps its last valid version in the task until it is fixed
+            self._remember(path, parsed=path not in invalid)
+            key = self.task_key(path)
+            if key is not None:
+                (blocked if path in invalid else touched).add(key)
+        for key in sorted(blocked):
+            print(f"[watch] {key[0]}/{key[1]}: task bundle not rebuilt until its schema errors are fixed")
+        bundles: List[TaskKey] = []
+        if not self.args.skip_bank:
+            for key in sorted(touched - blocked):
+                if (self.questions_root / key[0] / "tasks").is_dir() and self.write_task_bundle(key):
+                    bundles.append(key)
+        if bundles:
+            bank_generator.build_banks_and_indexes(self.questions_root, self.bank_cache, jobs=self.jobs)
+        else:
+            self.bank_cache.save()
+
+        print(
+            f"[watch] {len(paths)} file(s): {len(updates)} familyId fix(es), "
+            f"{sum(result.changed for result in linted)} with RU replacements, "
+            f"{len(invalid)} invalid, {len(bundles)} task bundle(s) rebuilt in {time.perf_counter() - start:.3f} s"
+        )
+
+
+def watch(args: argparse.Namespace, jobs: int) -> int:
+    session = WatchSession(args, jobs)
+    watcher = open_watcher(args.content_root, polling=args.poll, interval=args.poll_interval)
+    print(f"Watching {args.content_root} ({type(watcher).__name__}); press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+            if not changed:
+                continue
+            try:
+                session.cycle(changed)
+            except (ValueError, RuntimeError) as exc:
+                # A failed cycle (e.g. a bundle that no longer validates) must not stop the watcher
+                print(f"[watch] cycle failed: {exc}")
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run familyId fixing, RU linting and bank/index generation in one process, "
+            "sharing a single parse of the content tree."
+        ),
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Root directory containing localized question JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--glossary",
+        type=Path,
+        default=REPO_ROOT / "docs" / "glossary_ru.md",
+        help="Path to the Russian terminology glossary (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        default=REPO_ROOT / "logs" / "diffs" / "ru_lint",
+        help="Where to store per-file RU lint diff reports (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--questions-root",
+        type=Path,
+        default=REPO_ROOT / "app-android" / "src" / "main" / "assets" / "questions",
+        help="Questions assets directory for bank/index generation (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--skip-bank",
+        action="store_true",
+        help="Only fix and lint content; do not regenerate banks and indexes.",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=bank_generator.build_parser().get_default("cache_file"),
+        help="Bank build cache, shared with generate_bank_and_index_from_assets.py (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the bank build cache and rebuild banks and indexes from scratch.",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Write familyId fixes and RU lint replacements to disk (dry-run otherwise).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for linting and bank generation; 0 means one per CPU (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first run keep watching --content-root and re-run the affected files, task bundles and banks on every save.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Watch by polling file mtimes instead of inotify (used automatically where inotify is unavailable).",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.25,
+        help="Seconds between scans when polling (default: %(default)s)",
+    )
+    add_changed_files_arguments(parser)
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Resolve the selection once: --paths-from - can only read stdin a single time
+    paths = changed_paths_from_args(args)
+    if paths is not None:
+        paths = list(paths)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    with profiling_from_args(args):
+        status = run(args, paths, jobs)
+    if status or not args.watch:
+        return status
+    return watch(args, jobs)
+
+
+def run(args: argparse.Namespace, paths: List[Path] | None, jobs: int) -> int:
+    apply_flag = ["--apply"] if args.apply else []
+
+    # Parses every question once; the loader hands the same documents to the steps below
+    print("== schema ==")
+    schema_args = qw_validate.build_parser().parse_args(
+        ["--content-root", str(args.content_root), "--kinds", "questions", "explanations"]
+    )
+    status = qw_validate.run(schema_args, paths)
+    if status:
+        return status
+
+    print("== familyId ==")
+    fix_args = qw_fix_familyid.build_parser().parse_args(["--content-root", str(args.content_root), *apply_flag])
+    status = qw_fix_familyid.run(fix_args, paths)
+    if status:
+        return status
+
+    print("== RU lint ==")
+    lint_args = qw_ru_lint.build_parser().parse_args(
+        [
+            "--content-root",
+            str(args.content_root),
+            "--glossary",
+            str(args.glossary),
+            "--report-dir",
+            str(args.report_dir),
+            "--jobs",
+            str(jobs),
+            *apply_flag,
+        ]
+    )
+    status = qw_ru_lint.run(lint_args, paths)
+    if status:
+        return status
+
+    print(f"Content cache: {default_loader.misses} file(s) read, {default_loader.hits} reused across tools.")
+
+    if not args.skip_bank:
+        print("== banks and indexes ==")
+        # Task bundles are re-aggregated from --content-root first, so edited questions reach the bank
+        cache_args = ["--no-cache"] if args.no_cache else ["--cache-file", str(args.cache_file)]
+        bank_generator.main(
+            [
+                "--questions-root",
+                str(args.questions_root),
+                "--content-root",
+                str(args.content_root),
+                *cache_args,
+                "--jobs",
+                str(jobs),
+            ]
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
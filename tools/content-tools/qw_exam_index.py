@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from qw_fix_familyid import compute_family_id
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_EXAM_PROFILE = REPO_ROOT / "content" / "exam_profiles" / "welder_exam_2024.json"
+EXAM_INDEX_SCHEMA = "questions-exam-index-v1"
+MODES = ("min", "exact")
+
+
+class ExamProfileError(ValueError):
+    pass
+
+
+@dataclass
+class ExamProfile:
+    id: str
+    blueprint_id: str
+    blueprint_path: Path
+    locales: List[str]
+    mode: str
+    min_multiple: int
+    allow_extra: bool
+    question_count: int
+    # taskId -> blueprint quota, in blueprint order
+    quotas: Dict[str, int]
+
+    def fingerprint(self) -> Dict[str, Any]:
+        """Everything an exam index depends on besides the bank itself."""
+        return {
+            "schema": EXAM_INDEX_SCHEMA,
+            "id": self.id,
+            "blueprintId": self.blueprint_id,
+            "mode": self.mode,
+            "minMultiple": self.min_multiple,
+            "allowExtra": self.allow_extra,
+            "questionCount": self.question_count,
+            "quotas": self.quotas,
+        }
+
+
+@dataclass
+class TaskQuota:
+    taskId: str
+    quota: int
+    required: int
+    available: int
+    families: int
+    status: str
+
+
+def resolve_blueprint_path(reference: str, repo_root: Path = REPO_ROOT) -> Path:
+    """Same lookup as scripts/check-quotas.sh: a path, a repo-relative path, or a content/blueprints name."""
+    candidates = [Path(reference), repo_root / reference, repo_root / "content" / "blueprints" / reference]
+    if not reference.endswith(".json"):
+        candidates.append(repo_root / "content" / "blueprints" / f"{reference}.json")
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    raise ExamProfileError(f"Blueprint not found: {reference}")
+
+
+def load_blueprint_quotas(blueprint_path: Path) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """The blueprint and its taskId -> quota map, in blueprint order."""
+    blueprint = json.loads(blueprint_path.read_text(encoding="utf-8"))
+    quotas: Dict[str, int] = {}
+    for block in blueprint.get("blocks", []):
+        for task in block.get("tasks", []):
+            quotas[str(task["id"])] = int(task["quota"])
+    if not quotas:
+        raise ExamProfileError(f"{blueprint_path}: no tasks defined")
+    return blueprint, quotas
+
+
+def load_exam_profile(profile_path: Path, repo_root: Path = REPO_ROOT) -> ExamProfile:
+    profile = json.loads(profile_path.read_text(encoding="utf-8"))
+    reference = profile.get("blueprintPath") or profile.get("blueprint") or profile.get("blueprintId")
+    if not reference:
+        raise ExamProfileError(f"{profile_path}: no blueprint reference")
+    blueprint_path = resolve_blueprint_path(str(reference), repo_root)
+    blueprint, quotas = load_blueprint_quotas(blueprint_path)
+
+    mode = profile.get("mode", "min")
+    if mode not in MODES:
+        raise ExamProfileError(f"{profile_path}: unsupported mode {mode!r}")
+    min_multiple = int(profile.get("minMultiple", 1))
+    if min_multiple < 0:
+        raise ExamProfileError(f"{profile_path}: minMultiple must be a non-negative integer")
+
+    return ExamProfile(
+        id=str(profile.get("id", profile_path.stem)),
+        blueprint_id=str(blueprint.get("id") or profile.get("blueprintId") or blueprint_path.stem),
+        blueprint_path=blueprint_path,
+        locales=[str(locale) for locale in profile.get("locales", [])],
+        mode=mode,
+        min_multiple=min_multiple,
+        allow_extra=bool(profile.get("allowExtra", True)),
+        question_count=int(blueprint.get("questionCount") or blueprint.get("totalQuestions") or sum(quotas.values())),
+        quotas=quotas,
+    )
+
+
+def quota_status(profile: ExamProfile, required: int, available: int) -> str:
+    """ok / missing / excess, with the semantics of scripts/check-quotas.sh."""
+    if available < required:
+        return "missing"
+    if available > required and (profile.mode == "exact" or not profile.allow_extra):
+        return "excess"
+    return "ok"
+
+
+def quota_report(
+    profile: ExamProfile, counts: Mapping[str, int], families: Mapping[str, int] | None = None
+) -> List[TaskQuota]:
+    report: List[TaskQuota] = []
+    for task_id, quota in profile.quotas.items():
+        required = quota * profile.min_multiple
+        available = counts.get(task_id, 0)
+        report.append(
+            TaskQuota(
+                taskId=task_id,
+                quota=quota,
+                required=required,
+                available=available,
+                families=(families or {}).get(task_id, 0),
+                status=quota_status(profile, required, available),
+            )
+        )
+    return report
+
+
+def failed_quotas(report: Iterable[TaskQuota]) -> List[TaskQuota]:
+    return [item for item in report if item.status != "ok"]
+
+
+def family_of(question: Mapping[str, Any]) -> str:
+    return str(question.get("familyId") or compute_family_id(str(question.get("id", ""))))
+
+
+def build_exam_index(questions: Iterable[Mapping[str, Any]], profile: ExamProfile, locale: str) -> Dict[str, Any]:
+    """Question ids grouped by taskId, difficulty and familyId, plus the quota report for the profile."""
+    tasks: Dict[str, Dict[str, Any]] = {}
+    for question in questions:
+        task_id = str(question.get("taskId", ""))
+        task = tasks.setdefault(task_id, {"ids": [], "byDifficulty": {}, "byFamily": {}})
+        question_id = str(question.get("id", ""))
+        task["ids"].append(question_id)
+        task["byDifficulty"].setdefault(str(question.get("difficulty") or "unknown"), []).append(question_id)
+        task["byFamily"].setdefault(family_of(question), []).append(question_id)
+
+    task_entries: Dict[str, Dict[str, Any]] = {}
+    for task_id in sorted(tasks):
+        task = tasks[task_id]
+        task_entries[task_id] = {
+            "count": len(task["ids"]),
+            "familyCount": len(task["byFamily"]),
+            "difficultyCounts": {name: len(ids) for name, ids in sorted(task["byDifficulty"].items())},
+            "ids": task["ids"],
+            "byDifficulty": dict(sorted(task["byDifficulty"].items())),
+            "byFamily": dict(sorted(task["byFamily"].items())),
+        }
+
+    report = quota_report(
+        profile,
+        {task_id: entry["count"] for task_id, entry in task_entries.items()},
+        {task_id: entry["familyCount"] for task_id, entry in task_entries.items()},
+    )
+    return {
+        "schema": EXAM_INDEX_SCHEMA,
+        "locale": locale,
+        "profileId": profile.id,
+        "blueprintId": profile.blueprint_id,
+        "questionCount": profile.question_count,
+        "mode": profile.mode,
+        "minMultiple": profile.min_multiple,
+        "allowExtra": profile.allow_extra,
+        "feasible": not failed_quotas(report),
+        "quotas": [asdict(item) for item in report],
+        "tasks": task_entries,
+    }
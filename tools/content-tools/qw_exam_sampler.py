@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from qw_exam_index import DEFAULT_EXAM_PROFILE, ExamProfile, build_exam_index, load_exam_profile
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class TaskPool:
+    task_id: str
+    required: int
+    # Grouped by family, so each family is one contiguous run
+    ids: List[str]
+    # Family of every question in ids, as small integers
+    families: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.family_starts = np.flatnonzero(np.r_[True, np.diff(self.families) != 0]) if len(self.families) else self.families
+        self.family_sizes = np.diff(np.r_[self.family_starts, len(self.families)])
+
+    @property
+    def family_count(self) -> int:
+        return len(self.family_sizes)
+
+
+@dataclass
+class TaskStats:
+    task_id: str
+    required: int
+    pool: int
+    family_count: int
+    drawn: int
+    exams_with_collision: int = 0
+    collisions: int = 0
+
+    @property
+    def shortfall(self) -> int:
+        return self.required - self.drawn
+
+
+def load_exam_index(questions_root: Path, locale: str, profile: ExamProfile) -> Dict[str, Any]:
+    """The generator's exam.index.v1.json for the profile, or one built in memory from bank.v1.json."""
+    index_path = questions_root / locale / "exam.index.v1.json"
+    if index_path.is_file():
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        if index.get("profileId") == profile.id:
+            return index
+    bank = json.loads((questions_root / locale / "bank.v1.json").read_text(encoding="utf-8"))
+    return build_exam_index(bank, profile, locale)
+
+
+def task_pools(index: Dict[str, Any], profile: ExamProfile) -> List[TaskPool]:
+    """Integer-encoded pools for the blueprint tasks, in blueprint order."""
+    pools: List[TaskPool] = []
+    for task_id, quota in profile.quotas.items():
+        task = index["tasks"].get(task_id, {"byFamily": {}})
+        ids: List[str] = []
+        families: List[int] = []
+        for code, members in enumerate(task["byFamily"].values()):
+            ids.extend(members)
+            families.extend([code] * len(members))
+        pools.append(
+            TaskPool(
+                task_id=task_id,
+                required=quota * profile.min_multiple,
+                ids=ids,
+                families=np.array(families, dtype=np.int64),
+            )
+        )
+    return pools
+
+
+def draw_task(pool: TaskPool, batch: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws the task for batch exams with the distribution of ExamAssembler.selectUniform: shuffle the pool,
+    walk it, skip questions whose family was already taken, stop at the quota.
+
+    Returns the picked pool positions (batch x drawn) and the number of skipped family repeats per exam.
+    """
+    sizes = pool.family_sizes
+    family_count = len(sizes)
+    # Fewer families than the quota leaves a shortfall; the rest is still drawn for exposure
+    drawn = min(pool.required, family_count)
+    if drawn == 0:
+        return np.empty((batch, 0), dtype=np.int64), np.zeros(batch, dtype=np.int64)
+
+    # Walking a shuffled pool = ordering families by the smallest key of their members.
+    # That minimum is Beta(1, size) distributed, and the member holding it is uniform.
+    keys = rng.random((batch, family_count))
+    shared = sizes > 1
+    if shared.any():
+        keys[:, shared] = 1.0 - keys[:, shared] ** (1.0 / sizes[shared])
+    picked = np.argpartition(keys, drawn - 1, axis=1)[:, :drawn]
+    if not shared.any():
+        return picked, np.zeros(batch, dtype=np.int64)
+    positions = pool.family_starts[picked] + (rng.random(picked.shape) * sizes[picked]).astype(np.int64)
+
+    if drawn < pool.required:
+        # The walk exhausts the pool: every second member of a family is skipped
+        collisions = np.full(batch, int((sizes - 1).sum()), dtype=np.int64)
+    else:
+        # The other members' keys are uniform above their family minimum; count those before the last pick
+        cutoff = np.take_along_axis(keys, picked, axis=1).max(axis=1, keepdims=True)
+        family_keys = keys[:, shared]
+        below = np.clip((cutoff - family_keys) / (1.0 - family_keys), 0.0, 1.0)
+        collisions = rng.binomial(sizes[shared] - 1, below).sum(axis=1)
+    return positions, collisions
+
+
+def simulate(pools: Sequence[TaskPool], exams: int, batch: int, seed: int | None) -> tuple[List[TaskStats], List[np.ndarray]]:
+    """Per-task statistics and per-question exposure counts (aligned with TaskPool.ids) over exams draws."""
+    rng = np.random.default_rng(seed)
+    stats = [
+        TaskStats(pool.task_id, pool.required, len(pool.ids), pool.family_count, min(pool.required, pool.family_count))
+        for pool in pools
+    ]
+    exposure = [np.zeros(len(pool.ids), dtype=np.int64) for pool in pools]
+
+    remaining = exams
+    while remaining > 0:
+        size = min(batch, remaining)
+        for pool, task_stats, counts in zip(pools, stats, exposure):
+            picked, collisions = draw_task(pool, size, rng)
+            counts += np.bincount(picked.ravel(), minlength=len(pool.ids))
+            task_stats.collisions += int(collisions.sum())
+            task_stats.exams_with_collision += int(np.count_nonzero(collisions))
+        remaining -= size
+    return stats, exposure
+
+
+def build_report(
+    locale: str,
+    profile: ExamProfile,
+    pools: Sequence[TaskPool],
+    stats: Sequence[TaskStats],
+    exposure: Sequence[np.ndarray],
+    exams: int,
+    seconds: float,
+    top: int,
+) -> Dict[str, Any]:
+    questions: List[Dict[str, Any]] = []
+    for pool, task_stats, counts in zip(pools, stats, exposure):
+        # Uniform exposure if every question of the task were equally likely
+        expected = task_stats.drawn / len(pool.ids) if pool.ids else 0.0
+        for question_id, count in zip(pool.ids, counts.tolist()):
+            frequency = count / exams if exams else 0.0
+            questions.append(
+                {
+                    "id": question_id,
+                    "taskId": pool.task_id,
+                    "exposure": round(frequency, 6),
+                    "expected": round(expected, 6),
+                    "ratio": round(frequency / expected, 4) if expected else 0.0,
+                }
+            )
+    questions.sort(key=lambda item: (-item["ratio"], item["id"]))
+
+    return {
+        "locale": locale,
+        "profileId": profile.id,
+        "blueprintId": profile.blueprint_id,
+        "exams": exams,
+        "seconds": round(seconds, 3),
+        "examsPerSecond": round(exams / seconds, 1) if seconds > 0 else None,
+        "feasibleExams": exams if all(item.shortfall == 0 for item in stats) else 0,
+        "tasks": [
+            {
+                "taskId": item.task_id,
+                "required": item.required,
+                "pool": item.pool,
+                "families": item.family_count,
+                "shortfall": item.shortfall,
+                "familyCollisionRate": round(item.exams_with_collision / exams, 6) if exams else 0.0,
+                "meanFamilyCollisions": round(item.collisions / exams, 6) if exams else 0.0,
+            }
+            for item in stats
+        ],
+        "mostExposed": questions[:top],
+        "leastExposed": questions[::-1][:top],
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Simulate exam assembly over the generated bank to measure exposure, familyId collisions and quota shortfalls.",
+    )
+    parser.add_argument(
+        "--questions-root",
+        type=Path,
+        default=REPO_ROOT / "app-android" / "src" / "main" / "assets" / "questions",
+        help="Questions assets directory produced by the bank generator (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--exam-profile",
+        type=Path,
+        default=DEFAULT_EXAM_PROFILE,
+        help="Exam profile with the blueprint quotas (default: %(default)s)",
+    )
+    parser.add_argument("--locale", action="append", help="Locale to simulate; repeatable (default: the profile's locales)")
+    parser.add_argument("--exams", type=int, default=1_000_000, help="Exams to draw per locale (default: %(default)s)")
+    parser.add_argument("--batch", type=int, default=20_000, help="Exams drawn per vectorised batch (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    parser.add_argument("--top", type=int, default=20, help="Most/least exposed questions to list (default: %(default)s)")
+    parser.add_argument("--out", type=Path, help="Write the full JSON report here")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    profile = load_exam_profile(args.exam_profile)
+    locales = args.locale or profile.locales or ["en"]
+
+    reports = []
+    for locale in locales:
+        pools = task_pools(load_exam_index(args.questions_root, locale, profile), profile)
+        start = time.perf_counter()
+        stats, exposure = simulate(pools, args.exams, args.batch, args.seed)
+        report = build_report(locale, profile, pools, stats, exposure, args.exams, time.perf_counter() - start, args.top)
+        reports.append(report)
+
+        print(f"[{locale}] {args.exams} exams in {report['seconds']} s ({report['examsPerSecond']} exams/s)")
+        for task in report["tasks"]:
+            flags = []
+            if task["shortfall"]:
+                flags.append(f"shortfall={task['shortfall']}")
+            if task["familyCollisionRate"]:
+                flags.append(f"collisions={task['familyCollisionRate']:.2%}")
+            print(f"  {task['taskId']:<6} need={task['required']:<3} pool={task['pool']:<4} families={task['families']:<4} {' '.join(flags)}".rstrip())
+        for question in report["mostExposed"][:5]:
+            print(f"  most exposed: {question['id']} {question['exposure']:.4f} ({question['ratio']}x expected)")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps({"reports": reports}, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote report to {args.out}")
+    return 1 if any(task["shortfall"] for report in reports for task in report["tasks"]) else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from qw_content_loader import default_loader, iter_question_files, load_document
+from qw_json_patch import JsonPatcher, atomic_write_text
+from qw_profile import add_profile_arguments, count, profiling_from_args, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+COVERAGE_INDEX_VERSION = 2
+DEFAULT_COVERAGE_INDEX = REPO_ROOT / "build" / "content-cache" / "explanation-coverage.json"
+DEFAULT_LOCALES = ("en", "ru")
+ISSUE_TYPES = ("missing", "orphaned", "stale", "untranslated")
+# Explanations are authored in this locale and translated into the others
+SOURCE_LOCALE = "en"
+# What an explanation is written against; other question fields (tags, familyId, ...) do not make it stale
+EXPLAINED_FIELDS = ("stem", "choices", "correctId")
+
+
+@dataclass
+class SourceEntry:
+    id: str | None
+    taskId: str | None
+    sha256: str
+    mtimeNs: int
+    size: int
+    # Explanations only: questionRef.sha256, the question_sha256() the explanation was written against
+    questionSha256: str | None = None
+
+
+@dataclass
+class CoverageIssue:
+    type: str
+    id: str
+    locale: str
+    taskId: str | None = None
+    file: str | None = None
+    detail: str | None = None
+
+
+def question_sha256(question: Dict[str, Any]) -> str:
+    payload = json.dumps({field: question.get(field) for field in EXPLAINED_FIELDS}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read_entry(kind: str, path: Path, mtime_ns: int, size: int) -> SourceEntry:
+    document = load_document(path)
+    data = document.data
+    fields: Dict[str, Any] = data if isinstance(data, dict) else {}
+    if kind == "questions":
+        # Explanations are keyed by the question id without its "Q-" prefix
+        question_id = fields.get("id")
+        if isinstance(question_id, str) and question_id.startswith("Q-"):
+            question_id = question_id[2:]
+        return SourceEntry(question_id, fields.get("taskId"), question_sha256(fields), mtime_ns, size)
+    reference = fields.get("questionRef") if isinstance(fields.get("questionRef"), dict) else {}
+    return SourceEntry(
+        fields.get("id"), reference.get("taskId"), document.sha256, mtime_ns, size, reference.get("sha256")
+    )
+
+
+class CoverageIndex:
+    """
+    Question and explanation summaries per locale, keyed by path relative to their roots. An
+    explanation records the hash of the question it was written against in questionRef.sha256,
+    so staleness is judged from the committed files alone; one without the hash is never stale.
+    """
+
+    def __init__(
+        self,
+        questions_root: Path,
+        explanations_root: Path,
+        questions: Dict[str, Dict[str, SourceEntry]],
+        explanations: Dict[str, Dict[str, SourceEntry]],
+    ) -> None:
+        self.questions_root = questions_root
+        self.explanations_root = explanations_root
+        self.questions = questions
+        self.explanations = explanations
+        self.reused = 0
+        self.parsed = 0
+
+    @staticmethod
+    def _by_id(entries: Dict[str, SourceEntry]) -> Dict[str, Tuple[str, SourceEntry]]:
+        by_id: Dict[str, Tuple[str, SourceEntry]] = {}
+        for relative, entry in sorted(entries.items()):
+            if entry.id:
+                by_id.setdefault(entry.id, (relative, entry))
+        return by_id
+
+    def issues(self) -> List[CoverageIssue]:
+        issues: List[CoverageIssue] = []
+        for locale in sorted(set(self.questions) | set(self.explanations)):
+            questions = self._by_id(self.questions.get(locale, {}))
+            explanations = self._by_id(self.explanations.get(locale, {}))
+            for explanation_id, (relative, question) in sorted(questions.items()):
+                if explanation_id not in explanations:
+                    issues.append(CoverageIssue("missing", explanation_id, locale, question.taskId, relative))
+            for relative, explanation in sorted(self.explanations.get(locale, {}).items()):
+                question_entry = questions.get(explanation.id or "")
+                if question_entry is None:
+                    issues.append(
+                        CoverageIssue("orphaned", explanation.id or "(no id)", locale, explanation.taskId, relative,
+                                      "no question with this id")
+                    )
+                    continue
+                question = question_entry[1]
+                if explanation.taskId != question.taskId:
+                    issues.append(
+                        CoverageIssue("orphaned", explanation.id or "", locale, explanation.taskId, relative,
+                                      f"questionRef.taskId={explanation.taskId}, question is in {question.taskId}")
+                    )
+                if explanation.questionSha256 is not None and explanation.questionSha256 != question.sha256:
+                    issues.append(
+                        CoverageIssue("stale", explanation.id or "", locale, question.taskId, relative,
+                                      f"question changed since the explanation was written ({question_entry[0]}, "
+                                      f"now sha256 {question.sha256})")
+                    )
+            if locale != SOURCE_LOCALE and SOURCE_LOCALE in self.explanations and locale in self.explanations:
+                for explanation_id, (relative, explanation) in sorted(self._by_id(self.explanations[SOURCE_LOCALE]).items()):
+                    if explanation_id not in explanations:
+                        issues.append(
+                            CoverageIssue("untranslated", explanation_id, locale, explanation.taskId,
+                                          f"{SOURCE_LOCALE}/{relative}",
+                                          f"{SOURCE_LOCALE.upper()} explanation has no {locale.upper()} translation")
+                        )
+        return issues
+
+    def unstamped(self) -> Dict[str, int]:
+        """locale -> explanations of an existing question without questionRef.sha256, i.e. never judged stale."""
+        counts: Dict[str, int] = {}
+        for locale, entries in sorted(self.explanations.items()):
+            questions = self._by_id(self.questions.get(locale, {}))
+            unchecked = sum(1 for entry in entries.values() if entry.questionSha256 is None and entry.id in questions)
+            if unchecked:
+                counts[locale] = unchecked
+        return counts
+
+    def translation_summary(self, issues: Sequence[CoverageIssue]) -> Dict[str, Tuple[int, int]]:
+        """locale -> (translated, SOURCE_LOCALE explanations) for every other checked locale."""
+        if SOURCE_LOCALE not in self.explanations:
+            return {}
+        total = len(self._by_id(self.explanations[SOURCE_LOCALE]))
+        untranslated = Counter(issue.locale for issue in issues if issue.type == "untranslated")
+        return {
+            locale: (total - untranslated[locale], total)
+            for locale in sorted(self.explanations)
+            if locale != SOURCE_LOCALE
+        }
+
+    def task_summary(self, issues: Sequence[CoverageIssue]) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """locale -> taskId -> question count and issue counts."""
+        summary: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(Counter))
+        for locale, entries in self.questions.items():
+            for entry in self._by_id(entries).values():
+                summary[locale][entry[1].taskId or ""]["questions"] += 1
+        for issue in issues:
+            summary[issue.locale][issue.taskId or ""][issue.type] += 1
+        return {
+            locale: {task_id: dict(sorted(counts.items())) for task_id, counts in sorted(tasks.items())}
+            for locale, tasks in sorted(summary.items())
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        issues = self.issues()
+        return {
+            "version": COVERAGE_INDEX_VERSION,
+            "questionsRoot": str(self.questions_root),
+            "explanationsRoot": str(self.explanations_root),
+            "questions": _entries_to_json(self.questions),
+            "explanations": _entries_to_json(self.explanations),
+            "tasks": self.task_summary(issues),
+            "issues": [{key: value for key, value in asdict(issue).items() if value is not None} for issue in issues],
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_json(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def _entries_to_json(locales: Dict[str, Dict[str, SourceEntry]]) -> Dict[str, Any]:
+    return {
+        locale: {relative: asdict(entry) for relative, entry in sorted(entries.items())}
+        for locale, entries in sorted(locales.items())
+    }
+
+
+def load_coverage_index(path: Path, questions_root: Path, explanations_root: Path) -> CoverageIndex | None:
+    """The saved index, or None if it is missing, unreadable, outdated or built for other roots."""
+    if not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != COVERAGE_INDEX_VERSION:
+        return None
+    if (
+        Path(data["questionsRoot"]).resolve() != questions_root.resolve()
+        or Path(data["explanationsRoot"]).resolve() != explanations_root.resolve()
+    ):
+        return None
+    return CoverageIndex(
+        questions_root,
+        explanations_root,
+        {locale: {rel: SourceEntry(**entry) for rel, entry in entries.items()} for locale, entries in data["questions"].items()},
+        {locale: {rel: SourceEntry(**entry) for rel, entry in entries.items()} for locale, entries in data["explanations"].items()},
+    )
+
+
+def build_coverage_index(
+    questions_root: Path,
+    explanations_root: Path,
+    locales: Sequence[str] = DEFAULT_LOCALES,
+    previous: CoverageIndex | None = None,
+    jobs: int = 1,
+) -> CoverageIndex:
+    """
+    Walks both trees once; files whose mtime and size match the previous index are not re-read,
+    the others are read and summarized in jobs worker processes.
+    """
+    index = CoverageIndex(questions_root, explanations_root, {}, {})
+    pending: List[Tuple[str, str, str, Path, int, int]] = []
+    for kind, root, target in (
+        ("questions", questions_root, index.questions),
+        ("explanations", explanations_root, index.explanations),
+    ):
+        for locale in locales:
+            known = getattr(previous, kind).get(locale, {}) if previous is not None else {}
+            entries = target.setdefault(locale, {})
+            for path in iter_question_files(root / locale):
+                relative = path.relative_to(root / locale).as_posix()
+                stat = path.stat()
+                entry = known.get(relative)
+                if entry is not None and entry.mtimeNs == stat.st_mtime_ns and entry.size == stat.st_size:
+                    entries[relative] = entry
+                    index.reused += 1
+                else:
+                    pending.append((kind, locale, relative, path, stat.st_mtime_ns, stat.st_size))
+
+    with stage("read", files=len(pending), jobs=jobs):
+        args = [(item[0], item[3], item[4], item[5]) for item in pending]
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                read = list(pool.map(_read_entry, *zip(*args), chunksize=max(1, len(args) // (jobs * 4))))
+        else:
+            read = [_read_entry(*item) for item in args]
+    for (kind, locale, relative, *_), entry in zip(pending, read):
+        (index.questions if kind == "questions" else index.explanations)[locale][relative] = entry
+    index.parsed = len(pending)
+    count("coverage.parsed", index.parsed)
+    count("coverage.reused", index.reused)
+    return index
+
+
+def stamp_explanations(index: CoverageIndex) -> List[Path]:
+    """
+    Writes questionRef.sha256 into explanations that do not record it yet and whose question
+    exists in the same task, and refreshes their index entries. Returns the written files.
+    """
+    stamped: List[Path] = []
+    for locale, entries in index.explanations.items():
+        questions = index._by_id(index.questions.get(locale, {}))
+        for relative, explanation in sorted(entries.items()):
+            question_entry = questions.get(explanation.id or "")
+            if explanation.questionSha256 is not None or question_entry is None:
+                continue
+            if question_entry[1].taskId != explanation.taskId:
+                continue
+            path = index.explanations_root / locale / relative
+            patcher = JsonPatcher(load_document(path).text)
+            # The same layout as the rest of the file, right after questionRef.taskId
+            patcher.insert_member(("questionRef",), "sha256", question_entry[1].sha256, after="taskId")
+            atomic_write_text(path, patcher.apply())
+            default_loader.invalidate(path)
+            stat = path.stat()
+            entries[relative] = _read_entry("explanations", path, stat.st_mtime_ns, stat.st_size)
+            stamped.append(path)
+    return stamped
+
+
+def format_issue(issue: CoverageIssue) -> str:
+    parts = [f"[explain-coverage:{issue.locale}] {issue.type}", issue.id, f"(task: {issue.taskId})"]
+    if issue.detail:
+        parts.append(issue.detail)
+    if issue.file:
+        parts.append(issue.file)
+    return " ".join(parts)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Report missing, orphaned and stale explanations per locale and task.",
+    )
+    parser.add_argument(
+        "--questions-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Root directory containing localized question JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--explanations-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "explanations",
+        help="Root directory containing localized explanation JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--locales",
+        default=",".join(DEFAULT_LOCALES),
+        help="Comma-separated locales to check (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=DEFAULT_COVERAGE_INDEX,
+        help="Coverage index reused by later runs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-read every file instead of reusing unchanged entries from --out.",
+    )
+    parser.add_argument(
+        "--stamp",
+        action="store_true",
+        help="Write questionRef.sha256 (the current question hash) into explanations that do not record it yet.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for reading changed files; 0 means one per CPU (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fail-on",
+        nargs="+",
+        choices=ISSUE_TYPES,
+        default=[],
+        help="Exit with status 1 when issues of these types are found (default: report only)",
+    )
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with profiling_from_args(args):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    locales = [value.strip() for value in args.locales.split(",") if value.strip()]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    previous = load_coverage_index(args.out, args.questions_root, args.explanations_root)
+    if args.rebuild:
+        previous = None
+    with stage("coverage"):
+        index = build_coverage_index(args.questions_root, args.explanations_root, locales, previous, jobs)
+    if args.stamp:
+        with stage("stamp"):
+            for path in stamp_explanations(index):
+                print(f"[explain-coverage] stamped questionRef.sha256 in {path}")
+    issues = index.issues()
+    index.save(args.out)
+
+    for issue in issues:
+        print(format_issue(issue))
+    for locale, tasks in index.task_summary(issues).items():
+        questions = sum(counts.get("questions", 0) for counts in tasks.values())
+        missing = sum(counts.get("missing", 0) for counts in tasks.values())
+        covered = questions - missing
+        percent = 100 * covered / questions if questions else 0.0
+        print(f"[explain-coverage:{locale}] {covered}/{questions} questions explained ({percent:.1f}%)")
+        for task_id, counts in tasks.items():
+            gaps = " ".join(f"{kind}={counts[kind]}" for kind in ISSUE_TYPES if counts.get(kind))
+            if gaps:
+                print(f"[explain-coverage:{locale}]   {task_id}: {counts.get('questions', 0)} questions, {gaps}")
+    for locale, (translated, total) in index.translation_summary(issues).items():
+        percent = 100 * translated / total if total else 0.0
+        print(
+            f"[explain-coverage:{locale}] {translated}/{total} {SOURCE_LOCALE.upper()} explanations have "
+            f"{locale.upper()} translations ({percent:.1f}%)"
+        )
+    unstamped = index.unstamped()
+    for locale, unchecked in unstamped.items():
+        print(
+            f"[explain-coverage:{locale}] {unchecked} explanation(s) without questionRef.sha256 are not checked "
+            "for staleness; run --stamp once they are reviewed"
+        )
+    summary = Counter(issue.type for issue in issues)
+    totals = [f"{count} {kind}" for kind, count in sorted(summary.items())]
+    if unstamped:
+        totals.append(f"{sum(unstamped.values())} unstamped")
+    print(
+        f"Indexed {index.parsed + index.reused} file(s) ({index.reused} unchanged) into {args.out}; "
+        + (", ".join(totals) or "full coverage")
+    )
+    return 1 if any(summary.get(kind) for kind in args.fail_on) else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
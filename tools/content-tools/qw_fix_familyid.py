@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import argparse
-import json
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List
 
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args
+from qw_content_loader import default_loader, iter_question_files, load_document
+from qw_json_patch import JsonPatcher, atomic_write_text
+from qw_profile import add_profile_arguments, profiling_from_args, stage
+
 
 @dataclass
 class FamilyUpdate:
@@ -36,32 +40,35 @@ def ensure_family_id(data: dict) -> tuple[bool, str | None, str | None]:
     return True, current_family_id, desired_family_id
 
 
-def iter_question_files(content_root: Path) -> Iterable[Path]:
-    for path in sorted(content_root.rglob("*.json")):
-        if path.is_file():
-            yield path
-
-
 def process_file(path: Path, apply: bool) -> FamilyUpdate | None:
-    with path.open("r", encoding="utf-8") as fh:
-        original_text = fh.read()
-    data = json.loads(original_text)
+    document = load_document(path)
+    shared = document.data
+    if not shared.get("id") or shared.get("familyId"):
+        return None
 
+    # The parsed document is shared with other tools; only the top level changes, so a shallow copy is enough
+    data = dict(shared)
     changed, previous, new_value = ensure_family_id(data)
     if not changed:
         return None
 
     if apply:
-        with path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
-            fh.write("\n")
+        # Splice the key into the original text so the rest of the file keeps its formatting
+        patcher = JsonPatcher(document.text)
+        if "familyId" in shared:
+            patcher.replace_value(("familyId",), new_value)
+        else:
+            patcher.insert_member((), "familyId", new_value)
+        with stage("write", trace=False):
+            atomic_write_text(path, patcher.apply())
+        default_loader.invalidate(path)
 
     return FamilyUpdate(path=path, previous=previous, new=new_value or "")
 
 
-def process(content_root: Path, apply: bool) -> List[FamilyUpdate]:
+def process(content_root: Path, apply: bool, paths: Iterable[Path] | None = None) -> List[FamilyUpdate]:
     updates: List[FamilyUpdate] = []
-    for path in iter_question_files(content_root):
+    for path in iter_question_files(content_root, paths):
         result = process_file(path, apply)
         if result:
             updates.append(result)
@@ -83,14 +90,21 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Apply the changes to disk. Without this flag the script runs in dry-run mode.",
     )
+    add_changed_files_arguments(parser)
+    add_profile_arguments(parser)
     return parser
 
 
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    with profiling_from_args(args):
+        return run(args, changed_paths_from_args(args))
+
 
-    updates = process(args.content_root, apply=args.apply)
+def run(args: argparse.Namespace, paths: Iterable[Path] | None = None) -> int:
+    with stage("fix-familyid"):
+        updates = process(args.content_root, apply=args.apply, paths=paths)
 
     if updates:
         print(f"Updated familyId in {len(updates)} file(s).")
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import difflib
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+JsonPath = Tuple[Union[str, int], ...]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# Same boundaries as str.splitlines(), which difflib callers use
+_LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_LITERAL = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null")
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+@dataclass
+class Member:
+    key: str
+    key_start: int
+    key_end: int
+    value_start: int
+    value_end: int
+
+
+class JsonSpans:
+    """Source offsets of every value (and object member) in a JSON document."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.values: Dict[JsonPath, Tuple[int, int]] = {}
+        self.members: Dict[JsonPath, List[Member]] = {}
+        pos = self._value(_WHITESPACE.match(text, 0).end(), ())
+        if _WHITESPACE.match(text, pos).end() != len(text):
+            raise JsonPatchError(f"Trailing data at offset {pos}")
+
+    def _skip(self, pos: int) -> int:
+        return _WHITESPACE.match(self.text, pos).end()
+
+    def _value(self, pos: int, path: JsonPath) -> int:
+        text = self.text
+        if pos >= len(text):
+            raise JsonPatchError("Unexpected end of document")
+        char = text[pos]
+        if char == "{":
+            end = self._object(pos, path)
+        elif char == "[":
+            end = self._array(pos, path)
+        else:
+            match = (_STRING if char == '"' else _LITERAL).match(text, pos)
+            if match is None:
+                raise JsonPatchError(f"Unexpected character {char!r} at offset {pos}")
+            end = match.end()
+        self.values[path] = (pos, end)
+        return end
+
+    def _object(self, start: int, path: JsonPath) -> int:
+        text = self.text
+        members: List[Member] = []
+        self.members[path] = members
+        pos = self._skip(start + 1)
+        if text.startswith("}", pos):
+            return pos + 1
+        while True:
+            match = _STRING.match(text, pos)
+            if match is None:
+                raise JsonPatchError(f"Expected object key at offset {pos}")
+            key = json.loads(match.group(0))
+            pos = self._skip(match.end())
+            if not text.startswith(":", pos):
+                raise JsonPatchError(f"Expected ':' at offset {pos}")
+            value_start = self._skip(pos + 1)
+            value_end = self._value(value_start, path + (key,))
+            members.append(Member(key, match.start(), match.end(), value_start, value_end))
+            pos = self._skip(value_end)
+            if text.startswith(",", pos):
+                pos = self._skip(pos + 1)
+                continue
+            if text.startswith("}", pos):
+                return pos + 1
+            raise JsonPatchError(f"Expected ',' or '}}' at offset {pos}")
+
+    def _array(self, start: int, path: JsonPath) -> int:
+        text = self.text
+        pos = self._skip(start + 1)
+        if text.startswith("]", pos):
+            return pos + 1
+        index = 0
+        while True:
+            pos = self._skip(self._value(pos, path + (index,)))
+            index += 1
+            if text.startswith(",", pos):
+                pos = self._skip(pos + 1)
+                continue
+            if text.startswith("]", pos):
+                return pos + 1
+            raise JsonPatchError(f"Expected ',' or ']' at offset {pos}")
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class JsonPatcher:
+    """Splices value replacements and member insertions into the original JSON text, leaving the rest untouched."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.spans = JsonSpans(text)
+        self.edits: List[Tuple[int, int, str]] = []
+
+    def replace_value(self, path: JsonPath, value: Any) -> None:
+        if path not in self.spans.values:
+            raise JsonPatchError(f"No value at {path!r}")
+        start, end = self.spans.values[path]
+        self.edits.append((start, end, _encode(value)))
+
+    def insert_member(self, path: JsonPath, key: str, value: Any, after: str | None = None) -> None:
+        """Inserts key into the object at path, after member ``after`` (default: last), matching its layout."""
+        members = self.spans.members.get(path)
+        if members is None:
+            raise JsonPatchError(f"No object at {path!r}")
+        text = self.text
+        if not members:
+            start = self.spans.values[path][0]
+            self.edits.append((start + 1, start + 1, f"{_encode(key)}: {_encode(value)}"))
+            return
+
+        anchor = members[-1]
+        if after is not None:
+            anchor = next((member for member in members if member.key == after), anchor)
+        first = members[0]
+        colon = text[first.key_end:first.value_start]
+        if len(members) > 1:
+            separator = text[first.value_end:members[1].key_start]
+        else:
+            separator = "," + text[self.spans.values[path][0] + 1:first.key_start]
+        self.edits.append((anchor.value_end, anchor.value_end, f"{separator}{_encode(key)}{colon}{_encode(value)}"))
+
+    def _sorted_edits(self) -> List[Tuple[int, int, str]]:
+        edits = sorted(self.edits, key=lambda edit: (edit[0], edit[1]))
+        for previous, current in zip(edits, edits[1:]):
+            if current[0] < previous[1]:
+                raise JsonPatchError("Overlapping edits")
+        return edits
+
+    def apply(self) -> str:
+        parts: List[str] = []
+        pos = 0
+        for start, end, replacement in self._sorted_edits():
+            parts.append(self.text[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+    def unified_diff(self, fromfile: str, tofile: str, n: int = 3) -> str:
+        """
+        Output of difflib.unified_diff over the whole file. When every removed and added line is unique
+        in the original text the hunks are computed from the edited lines only; otherwise the alignment
+        is ambiguous (difflib may match a repeated line elsewhere) and difflib runs on the full text.
+        """
+        edits = self._sorted_edits()
+        if not edits:
+            return ""
+        text = self.text
+        line_starts = [0]
+        line_starts.extend(match.end() for match in _LINE_BREAK.finditer(text))
+        if line_starts[-1] == len(text):
+            line_starts.pop()
+        line_count = len(line_starts)
+
+        def line_of(offset: int) -> int:
+            return bisect_right(line_starts, offset) - 1
+
+        def line_end(index: int) -> int:
+            return line_starts[index + 1] if index + 1 < line_count else len(text)
+
+        def lines(first: int, last: int) -> List[str]:
+            return [text[line_starts[i]:line_end(i)] for i in range(first, last + 1)]
+
+        # Edits sharing a line are spliced together into one block of replacement lines
+        groups: List[Tuple[int, int, List[Tuple[int, int, str]]]] = []
+        for edit in edits:
+            first = line_of(edit[0])
+            last = line_of(max(edit[0], edit[1] - 1))
+            if groups and first <= groups[-1][1]:
+                groups[-1] = (groups[-1][0], max(groups[-1][1], last), groups[-1][2] + [edit])
+            else:
+                groups.append((first, last, [edit]))
+
+        blocks: List[Tuple[int, int, List[str]]] = []
+        for first, last, group in groups:
+            parts: List[str] = []
+            pos = line_starts[first]
+            for start, end, replacement in group:
+                parts.append(text[pos:start])
+                parts.append(replacement)
+                pos = end
+            parts.append(text[pos:line_end(last)])
+            old_lines = lines(first, last)
+            new_lines = "".join(parts).splitlines(keepends=True)
+            # Lines the edit left intact (e.g. the anchor of an inserted member) stay context, as in difflib
+            while old_lines and new_lines and old_lines[0] == new_lines[0]:
+                old_lines.pop(0)
+                new_lines.pop(0)
+                first += 1
+            while old_lines and new_lines and old_lines[-1] == new_lines[-1]:
+                old_lines.pop()
+                new_lines.pop()
+                last -= 1
+            if not old_lines and not new_lines:
+                continue
+            if blocks and first == blocks[-1][1] + 1:
+                # Back-to-back changes form a single replace run
+                blocks[-1] = (blocks[-1][0], last, blocks[-1][2] + new_lines)
+            else:
+                blocks.append((first, last, new_lines))
+
+        if not blocks:
+            return ""
+        counts = Counter(lines(0, line_count - 1))
+        if any(counts[line] > 1 for first, last, _ in blocks for line in lines(first, last)) or any(
+            counts[line] for _, _, new_lines in blocks for line in new_lines
+        ):
+            return "".join(
+                difflib.unified_diff(
+                    text.splitlines(keepends=True), self.apply().splitlines(keepends=True), fromfile, tofile, n=n
+                )
+            )
+
+        def fmt_range(start: int, length: int) -> str:
+            beginning = start + 1
+            if length == 1:
+                return f"{beginning}"
+            if not length:
+                beginning -= 1
+            return f"{beginning},{length}"
+
+        out = [f"--- {fromfile}\n", f"+++ {tofile}\n"]
+        delta = 0
+        index = 0
+        while index < len(blocks):
+            hunk = [blocks[index]]
+            while index + 1 < len(blocks) and blocks[index + 1][0] - hunk[-1][1] - 1 <= 2 * n:
+                index += 1
+                hunk.append(blocks[index])
+            index += 1
+
+            old_start = max(0, hunk[0][0] - n)
+            old_end = min(line_count - 1, hunk[-1][1] + n)
+            body: List[str] = []
+            cursor = old_start
+            hunk_delta = 0
+            for first, last, new_lines in hunk:
+                body.extend(" " + line for line in lines(cursor, first - 1))
+                body.extend("-" + line for line in lines(first, last))
+                body.extend("+" + line for line in new_lines)
+                hunk_delta += len(new_lines) - (last - first + 1)
+                cursor = last + 1
+            body.extend(" " + line for line in lines(cursor, old_end))
+
+            old_length = old_end - old_start + 1
+            new_length = old_length + hunk_delta
+            new_start = old_start + delta
+            out.append(f"@@ -{fmt_range(old_start, old_length)} +{fmt_range(new_start, new_length)} @@\n")
+            out.extend(body)
+            delta += hunk_delta
+        return "".join(out)
+
+
+def changed_values(old: Any, new: Any, path: JsonPath = ()) -> Iterator[Tuple[JsonPath, Any]]:
+    """Leaves that differ between a document and its copy-on-write rewrite; shared subtrees are skipped."""
+    if new is old:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            yield from changed_values(old.get(key), value, path + (key,))
+    elif isinstance(old, list) and isinstance(new, list):
+        for index, value in enumerate(new):
+            yield from changed_values(old[index] if index < len(old) else None, value, path + (index,))
+    elif new != old:
+        yield path, new
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Writes via a temporary file in the same directory and renames it over path."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args
+from qw_content_loader import iter_question_files, load_document
+from qw_profile import add_profile_arguments, profiling_from_args
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CONTENT_DIR = REPO_ROOT / "content"
+
+# Shingling and scoring are those of scripts/check-plagiarism.mjs
+N_GRAM_SIZE = 5
+DEFAULT_THRESHOLD = 0.7
+SIGNATURE_CACHE_VERSION = 1
+NUM_PERM = 128
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[\W_]+")
+_LOCALE = re.compile(r"^[a-z]{2}$", re.IGNORECASE)
+
+
+@dataclass
+class NearDupDocument:
+    id: str
+    type: str
+    locale: str
+    file: str
+    path: Path
+    sha256: str
+
+
+@dataclass
+class NearDupMatch:
+    a: NearDupDocument
+    b: NearDupDocument
+    overlap: int
+    basis: int
+    similarity: float
+
+
+def question_segments(payload: Dict[str, Any]) -> List[str]:
+    segments: List[str] = []
+    if isinstance(payload.get("stem"), str):
+        segments.append(payload["stem"])
+    for choice in payload.get("choices") or []:
+        if isinstance(choice, dict) and isinstance(choice.get("text"), str):
+            segments.append(choice["text"])
+    rationales = payload.get("rationales")
+    if isinstance(rationales, dict):
+        segments.extend(value for value in rationales.values() if isinstance(value, str))
+    if isinstance(payload.get("source"), str):
+        segments.append(payload["source"])
+    return segments
+
+
+def explanation_segments(payload: Dict[str, Any]) -> List[str]:
+    segments: List[str] = []
+    if isinstance(payload.get("summary"), str):
+        segments.append(payload["summary"])
+    for step in payload.get("steps") or []:
+        if isinstance(step, dict):
+            segments.extend(step[key] for key in ("title", "text") if isinstance(step.get(key), str))
+    for entry in payload.get("why_not") or []:
+        if isinstance(entry, dict) and isinstance(entry.get("text"), str):
+            segments.append(entry["text"])
+    segments.extend(tip for tip in payload.get("tips") or [] if isinstance(tip, str))
+    for reference in payload.get("references") or []:
+        if isinstance(reference, dict):
+            segments.extend(
+                reference[key] for key in ("title", "publisher", "section") if isinstance(reference.get(key), str)
+            )
+    return segments
+
+
+SEGMENTS = {"question": question_segments, "explanation": explanation_segments}
+
+
+def tokens_of(text: str) -> List[str]:
+    cleaned = _NON_WORD.sub(" ", text.lower()).strip()
+    return cleaned.split() if cleaned else []
+
+
+def shingles(doc_type: str, payload: Any) -> Set[str]:
+    if not isinstance(payload, dict):
+        return set()
+    tokens = [token for segment in SEGMENTS[doc_type](payload) for token in tokens_of(segment)]
+    return {" ".join(tokens[i:i + N_GRAM_SIZE]) for i in range(len(tokens) - N_GRAM_SIZE + 1)}
+
+
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Fixed seed: cached signatures must stay comparable across runs
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def minhash(grams: Iterable[str]) -> np.ndarray:
+    """MinHash signature (NUM_PERM x uint32) of a shingle set; all-ones for an empty set."""
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams),
+        dtype=np.uint64,
+    )
+    if not len(values):
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    a, b = _PERMUTATIONS
+    hashed = ((values[:, None] * a + b) % _MERSENNE_PRIME) & _MAX_HASH
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """Bands and rows per band whose S-curve (1/b)^(1/r) sits closest to threshold."""
+    best = (num_perm, 1)
+    best_gap = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        gap = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class SignatureCache:
+    """MinHash signatures keyed by path and file sha256, so unchanged files are not reshingled."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        if path is not None and path.is_file():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            if data.get("version") == SIGNATURE_CACHE_VERSION and data.get("numPerm") == NUM_PERM:
+                self.entries = data.get("entries", {})
+        self.hits = 0
+
+    def get(self, document: NearDupDocument) -> np.ndarray | None:
+        entry = self.entries.get(document.file)
+        if entry is None or entry.get("sha256") != document.sha256:
+            return None
+        self.hits += 1
+        return np.frombuffer(bytes.fromhex(entry["signature"]), dtype="<u4").astype(np.uint32)
+
+    def put(self, document: NearDupDocument, signature: np.ndarray) -> None:
+        self.entries[document.file] = {"sha256": document.sha256, "signature": signature.astype("<u4").tobytes().hex()}
+        self.dirty = True
+
+    def save(self, keep: Iterable[str]) -> None:
+        keep = set(keep)
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        if self.path is None or not (self.dirty or stale):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": SIGNATURE_CACHE_VERSION, "numPerm": NUM_PERM, "entries": self.entries}
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def _infer_locale(relative: str) -> str:
+    parts = relative.split("/")
+    for marker in ("questions", "explanations"):
+        if marker in parts:
+            index = parts.index(marker)
+            if index + 1 < len(parts) and _LOCALE.match(parts[index + 1]):
+                return parts[index + 1]
+    return "en"
+
+
+def collect_documents(content_dir: Path, locales: Set[str] | None = None) -> List[NearDupDocument]:
+    documents: List[NearDupDocument] = []
+    for doc_type, folder in (("question", "questions"), ("explanation", "explanations")):
+        for path in iter_question_files(content_dir / folder):
+            document = load_document(path)
+            payload = document.data
+            try:
+                relative = path.relative_to(REPO_ROOT).as_posix()
+            except ValueError:
+                relative = path.as_posix()
+            fields = payload if isinstance(payload, dict) else {}
+            locale = fields.get("locale") if isinstance(fields.get("locale"), str) else _infer_locale(relative)
+            if locales and locale not in locales:
+                continue
+            documents.append(
+                NearDupDocument(
+                    id=fields["id"] if isinstance(fields.get("id"), str) else path.stem,
+                    type=doc_type,
+                    locale=locale,
+                    file=relative,
+                    path=path,
+                    sha256=document.sha256,
+                )
+            )
+    return documents
+
+
+def document_shingles(document: NearDupDocument) -> Set[str]:
+    return shingles(document.type, load_document(document.path).data)
+
+
+def compare_shingles(left: Set[str], right: Set[str]) -> Tuple[int, int, float] | None:
+    """Overlap relative to the smaller shingle set, exactly as compareDocuments in check-plagiarism.mjs."""
+    if not left or not right:
+        return None
+    smaller, larger = (left, right) if len(left) <= len(right) else (right, left)
+    overlap = sum(1 for gram in smaller if gram in larger)
+    if not overlap:
+        return None
+    return overlap, len(smaller), overlap / len(smaller)
+
+
+def find_near_duplicates(
+    documents: Sequence[NearDupDocument],
+    threshold: float,
+    lsh_threshold: float,
+    cache: SignatureCache,
+    focus: Set[str] | None = None,
+    ignore_cross_locale: bool = True,
+) -> Tuple[List[NearDupMatch], Dict[str, int]]:
+    """
+    Candidate pairs from LSH banding over MinHash signatures, confirmed with the exact 5-gram overlap.
+
+    With focus, only pairs touching one of those files (repo-relative) are reported.
+    """
+    signatures = np.empty((len(documents), NUM_PERM), dtype=np.uint32)
+    shingle_sets: Dict[int, Set[str]] = {}
+    for index, document in enumerate(documents):
+        signature = cache.get(document)
+        if signature is None:
+            shingle_sets[index] = document_shingles(document)
+            signature = minhash(shingle_sets[index])
+            cache.put(document, signature)
+        signatures[index] = signature
+
+    bands, rows = lsh_params(lsh_threshold)
+    empty = np.all(signatures == np.uint32(_MAX_HASH), axis=1)
+    candidates: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: Dict[Tuple[str, bytes], List[int]] = defaultdict(list)
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for index in range(len(documents)):
+            if empty[index]:
+                continue
+            scope = documents[index].locale if ignore_cross_locale else ""
+            buckets[(scope, block[index].tobytes())].append(index)
+        for members in buckets.values():
+            for i, left in enumerate(members):
+                for right in members[i + 1:]:
+                    candidates.add((left, right))
+
+    if focus is not None:
+        candidates = {pair for pair in candidates if documents[pair[0]].file in focus or documents[pair[1]].file in focus}
+
+    matches: List[NearDupMatch] = []
+    for left, right in sorted(candidates):
+        for index in (left, right):
+            if index not in shingle_sets:
+                shingle_sets[index] = document_shingles(documents[index])
+        comparison = compare_shingles(shingle_sets[left], shingle_sets[right])
+        if comparison is not None and comparison[2] >= threshold:
+            matches.append(NearDupMatch(documents[left], documents[right], *comparison))
+
+    matches.sort(key=lambda match: (-match.similarity, match.a.file, match.b.file))
+    stats = {
+        "documents": len(documents),
+        "signaturesReused": cache.hits,
+        "bands": bands,
+        "rows": rows,
+        "candidatePairs": len(candidates),
+    }
+    return matches, stats
+
+
+def _document_json(document: NearDupDocument) -> Dict[str, str]:
+    return {"id": document.id, "type": document.type, "locale": document.locale, "file": document.file}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Find near-duplicate questions and explanations with MinHash/LSH (5-gram overlap, as check-plagiarism.mjs).",
+    )
+    parser.add_argument(
+        "--content-dir",
+        type=Path,
+        default=CONTENT_DIR,
+        help="Directory with questions/ and explanations/ (default: %(default)s)",
+    )
+    parser.add_argument("--locales", help="Comma-separated locales to analyse (default: all)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.environ.get("QWELD_PLAGIARISM_THRESHOLD", DEFAULT_THRESHOLD)),
+        help="Minimum 5-gram overlap of the smaller document to report (default: QWELD_PLAGIARISM_THRESHOLD or %(default)s)",
+    )
+    parser.add_argument(
+        "--lsh-threshold",
+        type=float,
+        default=0.3,
+        help="Estimated Jaccard similarity at which LSH starts proposing pairs; keep it well below --threshold "
+        "because overlap is measured against the smaller document (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--include-cross-locale",
+        action="store_true",
+        help="Also compare documents of different locales.",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=REPO_ROOT / "build" / "content-cache" / "near-dupes-cache.json",
+        help="MinHash signature cache keyed by file sha256 (default: %(default)s)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every signature.")
+    parser.add_argument("--out", type=Path, help="Write the JSON report here")
+    parser.add_argument("--soft-fail", action="store_true", help="Exit 0 even when near-duplicates are found.")
+    add_changed_files_arguments(parser)
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with profiling_from_args(args):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    locales = {value.strip() for value in args.locales.split(",") if value.strip()} if args.locales else None
+
+    focus = None
+    paths = changed_paths_from_args(args)
+    if paths is not None:
+        # Signatures still cover the whole tree; only pairs touching the selection are reported
+        focus = set()
+        for folder in ("questions", "explanations"):
+            for path in iter_question_files(args.content_dir / folder, paths):
+                try:
+                    focus.add(path.relative_to(REPO_ROOT).as_posix())
+                except ValueError:
+                    focus.add(path.as_posix())
+
+    started = time.perf_counter()
+    cache = SignatureCache(None if args.no_cache else args.cache_file)
+    documents = collect_documents(args.content_dir, locales)
+    if not documents:
+        print("No documents found to analyse.")
+        return 0
+    matches, stats = find_near_duplicates(
+        documents,
+        args.threshold,
+        args.lsh_threshold,
+        cache,
+        focus=focus,
+        ignore_cross_locale=not args.include_cross_locale,
+    )
+    cache.save(document.file for document in documents)
+    elapsed = time.perf_counter() - started
+
+    if matches:
+        print("⚠️ Potential plagiarism overlaps detected:")
+        for match in matches:
+            print(
+                f"- {match.a.file} ↔ {match.b.file} :: {match.similarity * 100:.1f}% overlap "
+                f"({match.overlap}/{match.basis} {N_GRAM_SIZE}-grams)"
+            )
+    else:
+        print("✅ No potential plagiarism overlaps detected.")
+    print(
+        f"{stats['documents']} document(s), {stats['signaturesReused']} cached signature(s), "
+        f"{stats['candidatePairs']} candidate pair(s) from {stats['bands']}x{stats['rows']} LSH bands in {elapsed:.2f} s"
+    )
+
+    if args.out:
+        report = {
+            **stats,
+            "threshold": args.threshold,
+            "locales": sorted(locales) if locales else [],
+            "duplicates": [
+                {
+                    "a": _document_json(match.a),
+                    "b": _document_json(match.b),
+                    "overlap": match.overlap,
+                    "basis": match.basis,
+                    "similarity": match.similarity,
+                }
+                for match in matches
+            ],
+        }
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    return 1 if matches and not args.soft_fail else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from qw_content_loader import iter_question_files, load_document
+from qw_profile import add_profile_arguments, profiling_from_args
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PARITY_INDEX_VERSION = 1
+DEFAULT_PARITY_INDEX = REPO_ROOT / "build" / "content-cache" / "parity-index.json"
+DEFAULT_LOCALES = ("en", "ru")
+
+
+@dataclass
+class ParityEntry:
+    id: str | None
+    taskId: str | None
+    correctId: str | None
+    choiceIds: List[str]
+    familyId: str | None
+    mtimeNs: int
+    size: int
+
+
+@dataclass
+class ParityIssue:
+    type: str
+    id: str | None
+    locale: str | None = None
+    taskId: str | None = None
+    files: List[str] | None = None
+    detail: str | None = None
+
+
+def _entry_from_file(path: Path, mtime_ns: int, size: int) -> ParityEntry:
+    data = load_document(path).data
+    fields: Dict[str, Any] = data if isinstance(data, dict) else {}
+    choices = fields.get("choices") if isinstance(fields.get("choices"), list) else []
+    return ParityEntry(
+        id=fields.get("id"),
+        taskId=fields.get("taskId"),
+        correctId=None if fields.get("correctId") is None else str(fields["correctId"]),
+        choiceIds=sorted(str(choice["id"]) for choice in choices if isinstance(choice, dict) and "id" in choice),
+        familyId=fields.get("familyId") or None,
+        mtimeNs=mtime_ns,
+        size=size,
+    )
+
+
+class ParityIndex:
+    """Per-locale question summaries keyed by file path relative to content_root."""
+
+    def __init__(self, content_root: Path, locales: Dict[str, Dict[str, ParityEntry]]) -> None:
+        self.content_root = content_root
+        self.locales = locales
+        self.reused = 0
+        self.parsed = 0
+
+    def files(self, locale: str) -> List[Path]:
+        return [self.content_root / relative for relative in sorted(self.locales.get(locale, {}))]
+
+    def by_id(self, locale: str) -> Dict[str, List[str]]:
+        ids: Dict[str, List[str]] = defaultdict(list)
+        for relative, entry in sorted(self.locales.get(locale, {}).items()):
+            if entry.id:
+                ids[entry.id].append(relative)
+        return ids
+
+    def task_counts(self) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for locale, entries in self.locales.items():
+            for task_id, count in Counter(entry.taskId or "" for entry in entries.values()).items():
+                counts[task_id][locale] = count
+        return {task_id: counts[task_id] for task_id in sorted(counts)}
+
+    def issues(self) -> List[ParityIssue]:
+        issues: List[ParityIssue] = []
+        views = {locale: self.by_id(locale) for locale in self.locales}
+        entries = {locale: self.locales[locale] for locale in self.locales}
+
+        for locale, ids in views.items():
+            for relative, entry in sorted(entries[locale].items()):
+                if not entry.id:
+                    issues.append(ParityIssue("missing-id", None, locale, entry.taskId, [relative]))
+                elif not entry.familyId:
+                    issues.append(ParityIssue("missing-family-id", entry.id, locale, entry.taskId, [relative]))
+            for question_id, files in sorted(ids.items()):
+                if len(files) > 1:
+                    issues.append(ParityIssue("duplicate-id", question_id, locale, entries[locale][files[0]].taskId, files))
+
+        all_ids = sorted(set().union(*(ids.keys() for ids in views.values()))) if views else []
+        for question_id in all_ids:
+            present = {locale: ids[question_id][0] for locale, ids in views.items() if question_id in ids}
+            reference_locale, reference_file = next(iter(present.items()))
+            reference = entries[reference_locale][reference_file]
+            for locale in views:
+                if locale not in present:
+                    issues.append(
+                        ParityIssue("missing", question_id, locale, reference.taskId, [reference_file],
+                                    f"present in {reference_locale}")
+                    )
+                    continue
+                if locale == reference_locale:
+                    continue
+                other = entries[locale][present[locale]]
+                files = [reference_file, present[locale]]
+                if other.taskId != reference.taskId:
+                    issues.append(ParityIssue("task-mismatch", question_id, locale, reference.taskId, files,
+                                              f"{reference_locale}={reference.taskId} {locale}={other.taskId}"))
+                if other.correctId != reference.correctId:
+                    issues.append(ParityIssue("correct-id-mismatch", question_id, locale, reference.taskId, files,
+                                              f"{reference_locale}={reference.correctId} {locale}={other.correctId}"))
+                if other.choiceIds != reference.choiceIds:
+                    issues.append(ParityIssue("choice-ids-mismatch", question_id, locale, reference.taskId, files,
+                                              f"{reference_locale}={reference.choiceIds} {locale}={other.choiceIds}"))
+        return issues
+
+    def to_json(self) -> Dict[str, Any]:
+        issues = self.issues()
+        return {
+            "version": PARITY_INDEX_VERSION,
+            "contentRoot": str(self.content_root),
+            "locales": {
+                locale: {relative: asdict(entry) for relative, entry in sorted(entries.items())}
+                for locale, entries in self.locales.items()
+            },
+            "taskCounts": self.task_counts(),
+            "issueCounts": dict(sorted(Counter(issue.type for issue in issues).items())),
+            "issues": [{key: value for key, value in asdict(issue).items() if value is not None} for issue in issues],
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_json(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def load_parity_index(path: Path, content_root: Path | None = None) -> ParityIndex | None:
+    """The saved artifact, or None if it is missing, unreadable, outdated or built for another content root."""
+    if not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != PARITY_INDEX_VERSION:
+        return None
+    root = Path(data["contentRoot"])
+    if content_root is not None and root.resolve() != content_root.resolve():
+        return None
+    locales = {
+        locale: {relative: ParityEntry(**entry) for relative, entry in entries.items()}
+        for locale, entries in data.get("locales", {}).items()
+    }
+    return ParityIndex(root, locales)
+
+
+def build_parity_index(
+    content_root: Path, locales: Sequence[str] = DEFAULT_LOCALES, previous: ParityIndex | None = None
+) -> ParityIndex:
+    """Walks every locale once; files whose mtime and size match the previous index are not re-read."""
+    index = ParityIndex(content_root, {})
+    for locale in locales:
+        known = previous.locales.get(locale, {}) if previous is not None else {}
+        entries: Dict[str, ParityEntry] = {}
+        for path in iter_question_files(content_root / locale):
+            relative = path.relative_to(content_root).as_posix()
+            stat = path.stat()
+            entry = known.get(relative)
+            if entry is not None and entry.mtimeNs == stat.st_mtime_ns and entry.size == stat.st_size:
+                index.reused += 1
+            else:
+                entry = _entry_from_file(path, stat.st_mtime_ns, stat.st_size)
+                index.parsed += 1
+            entries[relative] = entry
+        index.locales[locale] = entries
+    return index
+
+
+def format_issue(issue: ParityIssue) -> str:
+    parts = [f"[parity:{issue.locale}] {issue.type}", issue.id or "(no id)"]
+    if issue.detail:
+        parts.append(issue.detail)
+    if issue.files:
+        parts.append(", ".join(issue.files))
+    return " ".join(parts)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Index en/ru question trees by id and report parity gaps between locales.",
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Root directory containing localized question JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--locales",
+        default=",".join(DEFAULT_LOCALES),
+        help="Comma-separated locales to compare (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=DEFAULT_PARITY_INDEX,
+        help="Parity index artifact, reused by later runs, the bank generator and qw_ru_lint (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-read every file instead of reusing unchanged entries from --out.",
+    )
+    parser.add_argument(
+        "--fail-on-issues",
+        action="store_true",
+        help="Exit with status 1 when any parity issue is found.",
+    )
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with profiling_from_args(args):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    locales = [value.strip() for value in args.locales.split(",") if value.strip()]
+
+    previous = None if args.rebuild else load_parity_index(args.out, args.content_root)
+    index = build_parity_index(args.content_root, locales, previous)
+    index.save(args.out)
+
+    issues = index.issues()
+    for issue in issues:
+        print(format_issue(issue))
+    for task_id, counts in index.task_counts().items():
+        if len(set(counts.get(locale, 0) for locale in locales)) > 1:
+            print(f"[parity] {task_id}: " + " ".join(f"{locale}={counts.get(locale, 0)}" for locale in locales))
+    summary = Counter(issue.type for issue in issues)
+    print(
+        f"Indexed {index.parsed + index.reused} file(s) ({index.reused} unchanged) into {args.out}; "
+        + (", ".join(f"{count} {kind}" for kind, count in sorted(summary.items())) or "no parity issues")
+    )
+    return 1 if issues and args.fail_on_issues else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover - depends on the platform
+    resource = None
+
+PROFILE_FORMATS = ("jsonl", "chrome")
+
+
+def peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if os.uname().sysname == "Darwin" else peak
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "trace", "args", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, trace: bool, args: Dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.trace = trace
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.profiler._finish(self, time.perf_counter_ns())
+
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    Per-stage timers and counters. Disabled it hands out a shared no-op context manager,
+    so instrumented code pays one attribute check per stage.
+
+    Stages opened with trace=False (per-file work such as parsing or hashing) only add to
+    the totals; the others are also recorded as individual events with the peak RSS at their end.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self.origin_ns = time.perf_counter_ns()
+        self.events: List[Dict[str, Any]] = []
+        self.totals: Dict[str, List[int]] = {}
+        self.counters: Counter[str] = Counter()
+
+    def enable(self) -> None:
+        self._reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def stage(self, name: str, trace: bool = True, **args: Any) -> contextlib.AbstractContextManager:
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, trace, args)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += value
+
+    def _finish(self, stage: _Stage, end_ns: int) -> None:
+        total = self.totals.setdefault(stage.name, [0, 0])
+        total[0] += 1
+        total[1] += end_ns - stage.start
+        if stage.trace:
+            self.events.append(
+                {
+                    "name": stage.name,
+                    "startUs": (stage.start - self.origin_ns) // 1000,
+                    "durationUs": (end_ns - stage.start) // 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "peakRssKb": peak_rss_kb(),
+                    "args": stage.args,
+                }
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stages": {
+                name: {"count": count, "seconds": round(total_ns / 1e9, 6)}
+                for name, (count, total_ns) in sorted(self.totals.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "peakRssKb": peak_rss_kb(),
+        }
+
+    def jsonl_lines(self) -> Iterator[str]:
+        for event in self.events:
+            yield json.dumps({"type": "stage", **event}, ensure_ascii=False)
+        yield json.dumps({"type": "summary", **self.summary()}, ensure_ascii=False)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace-event format, loadable in chrome://tracing and Perfetto."""
+        trace_events: List[Dict[str, Any]] = []
+        for event in self.events:
+            trace_events.append(
+                {
+                    "name": event["name"],
+                    "ph": "X",
+                    "ts": event["startUs"],
+                    "dur": event["durationUs"],
+                    "pid": event["pid"],
+                    "tid": event["tid"],
+                    "args": event["args"],
+                }
+            )
+            if event["peakRssKb"] is not None:
+                trace_events.append(
+                    {
+                        "name": "peakRssKb",
+                        "ph": "C",
+                        "ts": event["startUs"] + event["durationUs"],
+                        "pid": event["pid"],
+                        "args": {"peakRssKb": event["peakRssKb"]},
+                    }
+                )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": self.summary()}
+
+    def write(self, path: Path, profile_format: str | None = None) -> None:
+        profile_format = profile_format or ("chrome" if path.suffix == ".json" else "jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if profile_format == "chrome":
+            text = json.dumps(self.chrome_trace(), ensure_ascii=False) + "\n"
+        else:
+            text = "\n".join(self.jsonl_lines()) + "\n"
+        path.write_text(text, encoding="utf-8")
+
+
+# Shared by every tool running in this process, like qw_content_loader.default_loader
+profiler = Profiler()
+
+
+def stage(name: str, trace: bool = True, **args: Any) -> contextlib.AbstractContextManager:
+    return profiler.stage(name, trace, **args)
+
+
+def count(name: str, value: int = 1) -> None:
+    profiler.count(name, value)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile-out",
+        type=Path,
+        help="Write per-stage timings, counters and peak RSS here (Chrome trace for *.json, JSON lines otherwise)",
+    )
+    group.add_argument(
+        "--profile-format",
+        choices=PROFILE_FORMATS,
+        help="Force the --profile-out format instead of choosing it by file extension",
+    )
+    group.add_argument(
+        "--cprofile-out",
+        type=Path,
+        help="Also dump a cProfile of the whole run here (pstats format)",
+    )
+
+
+@contextlib.contextmanager
+def profiling(
+    profile_out: Path | None, profile_format: str | None = None, cprofile_out: Path | None = None
+) -> Iterator[None]:
+    """Profiles the block if an output was requested; a nested call inside a profiled run is a no-op."""
+    if (profile_out is None and cprofile_out is None) or profiler.enabled:
+        yield
+        return
+    profiler.enable()
+    cprofiler = cProfile.Profile() if cprofile_out is not None else None
+    if cprofiler is not None:
+        cprofiler.enable()
+    try:
+        with profiler.stage("run"):
+            yield
+    finally:
+        if cprofiler is not None:
+            cprofiler.disable()
+            cprofile_out.parent.mkdir(parents=True, exist_ok=True)
+            cprofiler.dump_stats(str(cprofile_out))
+        profiler.disable()
+        if profile_out is not None:
+            profiler.write(profile_out, profile_format)
+
+
+def profiling_from_args(args: argparse.Namespace) -> contextlib.AbstractContextManager:
+    return profiling(
+        getattr(args, "profile_out", None), getattr(args, "profile_format", None), getattr(args, "cprofile_out", None)
+    )
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import subprocess
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args, git_changed_paths
+from qw_exam_index import (
+    DEFAULT_EXAM_PROFILE,
+    MODES,
+    ExamProfile,
+    ExamProfileError,
+    TaskQuota,
+    load_blueprint_quotas,
+    load_exam_profile,
+    resolve_blueprint_path,
+)
+from qw_profile import add_profile_arguments, count, profiling_from_args, stage
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BLUEPRINT = "content/blueprints/welder_ip_sk_202404.json"
+STATUSES = ("ok", "missing", "excess", "n/a")
+OK, MISSING, EXCESS, NOT_IN_BLUEPRINT = range(len(STATUSES))
+
+
+@dataclass
+class QuestionTable:
+    """One row per question file: its id (file stem) and locale and taskId as codes into the lists."""
+
+    locales: List[str]
+    task_ids: List[str]
+    ids: List[str]
+    locale_codes: np.ndarray
+    task_codes: np.ndarray
+
+    def available(self, locales: Sequence[str], task_ids: Sequence[str]) -> np.ndarray:
+        """Question counts, shape (len(locales), len(task_ids)); 0 for unknown locales and tasks."""
+        rows, cols = len(self.locales), len(self.task_ids)
+        grid = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+        grid[:rows, :cols] = np.bincount(
+            self.locale_codes * cols + self.task_codes, minlength=rows * cols
+        ).reshape(rows, cols)
+        # -1 picks the zero padding row/column
+        locale_index = [self.locales.index(locale) if locale in self.locales else -1 for locale in locales]
+        task_index = {task_id: code for code, task_id in enumerate(self.task_ids)}
+        return grid[np.ix_(locale_index, [task_index.get(task_id, -1) for task_id in task_ids])]
+
+
+def scan_question_table(content_root: Path, locales: Sequence[str]) -> QuestionTable:
+    """
+    Lists <locale>/<taskId>/*.json under content_root in one pass, without parsing the files: like
+    scripts/check-quotas.sh, a question counts for the task directory it is filed under.
+    """
+    task_ids: List[str] = []
+    task_numbers = {}
+    ids: List[str] = []
+    locale_codes: List[int] = []
+    task_codes: List[int] = []
+    for locale_code, locale in enumerate(locales):
+        locale_dir = content_root / locale
+        if not locale_dir.is_dir():
+            raise ExamProfileError(f"locale directory not found: {locale_dir}")
+        for task_dir in sorted(os.scandir(locale_dir), key=lambda entry: entry.name):
+            if not task_dir.is_dir():
+                continue
+            code = task_numbers.setdefault(task_dir.name, len(task_numbers))
+            if code == len(task_ids):
+                task_ids.append(task_dir.name)
+            for entry in os.scandir(task_dir.path):
+                if entry.name.endswith(".json") and entry.is_file():
+                    ids.append(entry.name[: -len(".json")])
+                    locale_codes.append(locale_code)
+                    task_codes.append(code)
+    return QuestionTable(
+        list(locales),
+        task_ids,
+        ids,
+        np.array(locale_codes, dtype=np.int64),
+        np.array(task_codes, dtype=np.int64),
+    )
+
+
+@dataclass
+class QuotaMatrix:
+    """Quota check of several profiles (scenarios) against the same question table at once."""
+
+    profiles: List[ExamProfile]
+    locales: List[str]
+    # Union of the blueprints' tasks, in blueprint order
+    task_ids: List[str]
+    # (scenarios, tasks); 0 where a blueprint has no such task
+    required: np.ndarray
+    # (locales, tasks)
+    available: np.ndarray
+    # (scenarios, locales, tasks), indexes into STATUSES
+    status: np.ndarray
+
+    def report(self, scenario: int, locale: str) -> List[TaskQuota]:
+        profile = self.profiles[scenario]
+        row = self.locales.index(locale)
+        return [
+            TaskQuota(
+                taskId=task_id,
+                quota=profile.quotas[task_id],
+                required=int(self.required[scenario, column]),
+                available=int(self.available[row, column]),
+                families=0,
+                status=STATUSES[self.status[scenario, row, column]],
+            )
+            for column, task_id in enumerate(self.task_ids)
+            if task_id in profile.quotas
+        ]
+
+    def shortfall(self) -> np.ndarray:
+        """Questions still to write, shape (scenarios, locales, tasks)."""
+        return np.maximum(self.required[:, None, :] - self.available[None, :, :], 0)
+
+    def failures(self) -> np.ndarray:
+        """Tasks that are not ok, per scenario and locale."""
+        return ((self.status != OK) & (self.status != NOT_IN_BLUEPRINT)).sum(axis=2)
+
+
+def evaluate_quotas(table: QuestionTable, profiles: Sequence[ExamProfile], locales: Sequence[str]) -> QuotaMatrix:
+    task_ids = list(dict.fromkeys(task_id for profile in profiles for task_id in profile.quotas))
+    quotas = np.array([[profile.quotas.get(task_id, -1) for task_id in task_ids] for profile in profiles], dtype=np.int64)
+    present = quotas >= 0
+    multiples = np.array([profile.min_multiple for profile in profiles], dtype=np.int64)[:, None]
+    required = np.where(present, quotas * multiples, 0)
+    strict = np.array([profile.mode == "exact" or not profile.allow_extra for profile in profiles])[:, None, None]
+
+    available = table.available(locales, task_ids)
+    need = required[:, None, :]
+    have = available[None, :, :]
+    status = np.where(have < need, MISSING, np.where((have > need) & strict, EXCESS, OK))
+    status = np.where(present[:, None, :], status, NOT_IN_BLUEPRINT)
+    return QuotaMatrix(list(profiles), list(locales), task_ids, required, available, status)
+
+
+def profile_with_blueprint(profile: ExamProfile, reference: str, repo_root: Path = REPO_ROOT) -> ExamProfile:
+    blueprint_path = resolve_blueprint_path(reference, repo_root)
+    blueprint, quotas = load_blueprint_quotas(blueprint_path)
+    return dataclasses.replace(
+        profile,
+        blueprint_id=str(blueprint.get("id") or blueprint_path.stem),
+        blueprint_path=blueprint_path,
+        question_count=int(blueprint.get("questionCount") or blueprint.get("totalQuestions") or sum(quotas.values())),
+        quotas=quotas,
+    )
+
+
+def effective_profile(args: argparse.Namespace, repo_root: Path = REPO_ROOT) -> ExamProfile:
+    """The profile of scripts/check-quotas.sh: its blueprint unless --blueprint, options from the command line."""
+    profile_path: Optional[Path] = args.profile
+    if profile_path is None and args.blueprint is None:
+        profile_path = DEFAULT_EXAM_PROFILE
+    profile: Optional[ExamProfile] = None
+    if profile_path is not None:
+        if profile_path.is_file():
+            profile = load_exam_profile(profile_path, repo_root)
+        else:
+            print(f"[quotas] WARNING: profile not found: {profile_path}")
+    if profile is None:
+        profile = ExamProfile("cli", "", Path(), [], "min", 1, True, 0, {})
+        profile = profile_with_blueprint(profile, args.blueprint or DEFAULT_BLUEPRINT, repo_root)
+    elif args.blueprint is not None:
+        print(f"[quotas] --blueprint provided; ignoring blueprint from profile: {profile_path}")
+        profile = profile_with_blueprint(profile, args.blueprint, repo_root)
+
+    overrides = {}
+    if args.mode is not None:
+        overrides["mode"] = args.mode
+    if args.min_multiple is not None:
+        overrides["min_multiple"] = args.min_multiple
+    if args.allow_extra is not None:
+        overrides["allow_extra"] = args.allow_extra
+    return dataclasses.replace(profile, **overrides)
+
+
+def default_base(repo_root: Path = REPO_ROOT) -> str:
+    """Same base as scripts/changed-files.sh: BASE_SHA, the merge base with origin/main, or HEAD."""
+    base = os.environ.get("BASE_SHA") or os.environ.get("GITHUB_BASE_SHA")
+    if base:
+        return base
+    merge_base = subprocess.run(
+        ["git", "merge-base", "HEAD", "origin/main"], cwd=repo_root, capture_output=True, text=True
+    )
+    return merge_base.stdout.strip() if merge_base.returncode == 0 and merge_base.stdout.strip() else "HEAD"
+
+
+def changed_scope(
+    paths: Iterable[Path], content_root: Path, profile_path: Optional[Path], repo_root: Path = REPO_ROOT
+) -> Optional[Set[Tuple[str, str]]]:
+    """(locale, taskId) pairs with changed question files, or None if a blueprint or profile changed."""
+    root = content_root.resolve()
+    config_dirs = [(repo_root / "content" / "blueprints").resolve(), (repo_root / "content" / "exam_profiles").resolve()]
+    profile = profile_path.resolve() if profile_path is not None else None
+    scope: Set[Tuple[str, str]] = set()
+    for path in paths:
+        resolved = (path if path.is_absolute() else repo_root / path).resolve()
+        if resolved == profile or any(directory in resolved.parents for directory in config_dirs):
+            return None
+        if resolved.suffix == ".json" and root in resolved.parents:
+            parts = resolved.relative_to(root).parts
+            if len(parts) == 3:
+                scope.add((parts[0], parts[1]))
+    return scope
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Check question counts per task and locale against blueprint quotas (scripts/check-quotas.sh).",
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Root directory containing <locale>/<taskId>/*.json question files (default: %(default)s)",
+    )
+    parser.add_argument("--profile", type=Path, help=f"Exam profile (default: {DEFAULT_EXAM_PROFILE} unless --blueprint)")
+    parser.add_argument("--blueprint", help="Blueprint path or content/blueprints name; overrides the profile's")
+    parser.add_argument("--locales", default="en,ru", help="Comma-separated locales (default: %(default)s)")
+    parser.add_argument("--mode", choices=MODES, help="min or exact (default: the profile's, else min)")
+    parser.add_argument("--min-multiple", type=int, help="Multiply blueprint quotas by this factor (default: the profile's, else 1)")
+    extra = parser.add_mutually_exclusive_group()
+    extra.add_argument("--allow-extra", dest="allow_extra", action="store_true", default=None, help="Allow counts above the requirement")
+    extra.add_argument("--no-allow-extra", dest="allow_extra", action="store_false", help="Fail if counts exceed the requirement")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only check tasks with changed question files (from --paths-from/--since, else since BASE_SHA or "
+        "the merge base with origin/main); a changed blueprint or profile means a full check",
+    )
+    add_changed_files_arguments(parser)
+    parser.add_argument(
+        "--warn-only",
+        action="store_true",
+        help="Report quota mismatches but exit 0 (for gates that are not enforced yet)",
+    )
+    parser.add_argument("--log-dir", type=Path, help="Also write each locale's lines to LOG_DIR/quotas_<locale>.txt")
+    parser.add_argument(
+        "--plan-min-multiple",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="Instead of checking, report the shortfall for each of these multiples (e.g. 1 2 3 4 5)",
+    )
+    parser.add_argument(
+        "--plan-blueprint",
+        nargs="+",
+        metavar="BLUEPRINT",
+        default=[],
+        help="Instead of checking, also report the shortfall against these blueprints (e.g. welder_ip_2024.json)",
+    )
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    with profiling_from_args(args):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    locales = [value.strip() for value in args.locales.split(",") if value.strip()]
+    if not locales:
+        print("[quotas] ERROR: no locales provided")
+        return 1
+    if args.min_multiple is not None and args.min_multiple < 0:
+        print("[quotas] ERROR: --min-multiple must be a non-negative integer")
+        return 1
+    try:
+        profile = effective_profile(args)
+        print(f"[quotas] effective blueprint: {profile.blueprint_path}")
+        with stage("scan"):
+            table = scan_question_table(args.content_root, locales)
+        count("quotas.questions", len(table.ids))
+        if args.plan_min_multiple or args.plan_blueprint:
+            return run_plan(args, profile, table, locales)
+    except ExamProfileError as exc:
+        print(f"[quotas] ERROR: {exc}")
+        return 1
+
+    scope: Optional[Set[Tuple[str, str]]] = None
+    if args.changed_only:
+        paths = changed_paths_from_args(args)
+        if paths is None:
+            paths = git_changed_paths(default_base())
+        scope = changed_scope(paths, args.content_root, args.profile)
+        if scope is None:
+            print("[quotas] blueprint/profile changed; running full check")
+        elif not any(task_id in profile.quotas for _, task_id in scope):
+            print("[quotas] no changed question tasks; skip")
+            return 0
+
+    with stage("evaluate"):
+        matrix = evaluate_quotas(table, [profile], locales)
+    failed = False
+    for locale in locales:
+        lines = [f"[quotas] locale={locale}"]
+        report = [item for item in matrix.report(0, locale) if scope is None or (locale, item.taskId) in scope]
+        if not report:
+            lines.append(f"[quota:{locale}] no tasks to check; skip")
+        for item in report:
+            lines.append(f"[quota:{locale}] {item.taskId} expected={item.required} got={item.available} status={item.status}")
+            failed = failed or item.status != "ok"
+        print("\n".join(lines))
+        if args.log_dir is not None:
+            args.log_dir.mkdir(parents=True, exist_ok=True)
+            (args.log_dir / f"quotas_{locale}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    if failed and args.warn_only:
+        print("[quotas] WARNING: quota mismatches detected (--warn-only, not failing)")
+        return 0
+    if failed:
+        print("[quotas] ERROR: quota mismatches detected")
+        return 1
+    print("[quotas] OK: all quotas satisfied")
+    return 0
+
+
+def run_plan(args: argparse.Namespace, profile: ExamProfile, table: QuestionTable, locales: List[str]) -> int:
+    blueprints = [profile] + [profile_with_blueprint(profile, reference) for reference in args.plan_blueprint]
+    multiples = args.plan_min_multiple or [profile.min_multiple]
+    scenarios = [dataclasses.replace(base, min_multiple=multiple) for base, multiple in product(blueprints, multiples)]
+    with stage("evaluate", scenarios=len(scenarios)):
+        matrix = evaluate_quotas(table, scenarios, locales)
+        shortfall = matrix.shortfall()
+        failures = matrix.failures()
+    for number, scenario in enumerate(scenarios):
+        for row, locale in enumerate(locales):
+            needed = {
+                task_id: int(shortfall[number, row, column])
+                for column, task_id in enumerate(matrix.task_ids)
+                if shortfall[number, row, column]
+            }
+            summary = " ".join(f"{task_id}:+{value}" for task_id, value in needed.items())
+            print(
+                f"[quotas:plan] {scenario.blueprint_id} x{scenario.min_multiple} {locale}: "
+                f"{failures[number, row]}/{len(scenario.quotas)} task(s) not ok, "
+                f"{sum(needed.values())} question(s) to write" + (f" ({summary})" if summary else "")
+            )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
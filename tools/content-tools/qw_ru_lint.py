@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
-from dataclasses import dataclass
-from difflib import unified_diff
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args
+from qw_content_loader import default_loader, iter_question_files, load_document
+from qw_json_patch import JsonPatcher, atomic_write_text, changed_values
+from qw_parity import load_parity_index
+from qw_profile import add_profile_arguments, count, profiling_from_args, stage
+
+LINT_CACHE_VERSION = 2
 
 
 @dataclass
@@ -24,7 +34,104 @@ class ReplacementRecord:
     glossary_source: str
 
 
-def load_glossary(glossary_path: Path) -> List[GlossaryEntry]:
+@dataclass
+class LintResult:
+    path: Path
+    changed: bool
+    records: List[ReplacementRecord]
+    diff_text: str | None
+
+
+def _canonical_pattern(source: str) -> re.Pattern[str]:
+    return re.compile(rf"\b{re.escape(source)}\b", re.IGNORECASE)
+
+
+def _fold(text: str) -> str:
+    """Case-insensitive key of a glossary term; casefold() unless it changes the length (e.g. "ß" -> "ss"),
+    which re.IGNORECASE would not match."""
+    folded = text.casefold()
+    return folded if len(folded) == len(text) else text.lower()
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Builds a regex alternation that shares prefixes, so one scan tries every word at once."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and "" not in node else "(?:" + "|".join(branches) + ")"
+        # Greedy optional suffix: the longest term wins, shorter ones are tried on backtrack
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+
+class Glossary(Sequence[GlossaryEntry]):
+    """Glossary entries compiled into a single matcher that finds every term in one scan."""
+
+    def __init__(self, entries: Iterable[GlossaryEntry]) -> None:
+        self.entries: List[GlossaryEntry] = list(entries)
+        self._by_key: Dict[str, int] = {}
+        sources: List[str] = []
+        custom: List[Tuple[int, GlossaryEntry]] = []
+        for index, entry in enumerate(self.entries):
+            canonical = _canonical_pattern(entry.source)
+            if entry.pattern.pattern == canonical.pattern and entry.pattern.flags == canonical.flags:
+                self._by_key.setdefault(_fold(entry.source), index)
+                # The pattern ignores case, so the trie must too: "Tag" and "tag line" share one branch
+                sources.append(_fold(entry.source))
+            else:
+                custom.append((index, entry))
+
+        alternatives = []
+        if sources:
+            alternatives.append(rf"\b(?:{_trie_regex(sources)})\b")
+        # Entries with hand-written patterns keep their own regex, longest source first
+        self._custom_groups: Dict[str, int] = {}
+        for index, entry in sorted(custom, key=lambda item: (-len(item[1].source), item[0])):
+            group = f"g{index}"
+            flags = "i" if entry.pattern.flags & re.IGNORECASE else "-i"
+            alternatives.append(f"(?P<{group}>(?{flags}:{entry.pattern.pattern}))")
+            self._custom_groups[group] = index
+        self.pattern: re.Pattern[str] | None = (
+            re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        )
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[GlossaryEntry]:
+        return iter(self.entries)
+
+    def entry_index(self, match: re.Match[str]) -> int:
+        if match.lastgroup is not None:
+            return self._custom_groups[match.lastgroup]
+        text = match.group(0)
+        index = self._by_key.get(_fold(text))
+        if index is not None:
+            return index
+        # Case folding that changes length (e.g. "İ") misses the folded key
+        for candidate in self._by_key.values():
+            if self.entries[candidate].pattern.fullmatch(text):
+                return candidate
+        raise LookupError(f"No glossary entry matches {text!r}")
+
+
+def compile_glossary(entries: Sequence[GlossaryEntry]) -> Glossary:
+    return entries if isinstance(entries, Glossary) else Glossary(entries)
+
+
+def load_glossary(glossary_path: Path) -> Glossary:
     if not glossary_path.exists():
         raise FileNotFoundError(f"Glossary file not found: {glossary_path}")
 
@@ -44,9 +151,8 @@ def load_glossary(glossary_path: Path) -> List[GlossaryEntry]:
         source, replacement = cells[0], cells[1]
         if not source or not replacement:
             continue
-        pattern = re.compile(rf"\b{re.escape(source)}\b", re.IGNORECASE)
-        entries.append(GlossaryEntry(source=source, replacement=replacement, pattern=pattern))
-    return entries
+        entries.append(GlossaryEntry(source=source, replacement=replacement, pattern=_canonical_pattern(source)))
+    return Glossary(entries)
 
 
 def match_case(original: str, replacement: str) -> str:
@@ -60,52 +166,63 @@ def match_case(original: str, replacement: str) -> str:
 
 
 def apply_glossary(text: str, entries: Sequence[GlossaryEntry], path: str) -> tuple[str, List[ReplacementRecord]]:
-    records: List[ReplacementRecord] = []
-    updated = text
-    for entry in entries:
-        def _replacer(match: re.Match[str]) -> str:
-            replaced = match_case(match.group(0), entry.replacement)
-            records.append(
+    glossary = compile_glossary(entries)
+    if glossary.pattern is None:
+        return text, []
+    found: List[Tuple[int, ReplacementRecord]] = []
+
+    def _replacer(match: re.Match[str]) -> str:
+        index = glossary.entry_index(match)
+        entry = glossary[index]
+        replaced = match_case(match.group(0), entry.replacement)
+        found.append(
+            (
+                index,
                 ReplacementRecord(
                     path=path,
                     source_text=match.group(0),
                     replacement_text=replaced,
                     glossary_source=entry.source,
-                )
+                ),
             )
-            return replaced
-
-        updated = entry.pattern.sub(_replacer, updated)
-    return updated, records
-
+        )
+        return replaced
 
-def iter_question_files(content_root: Path) -> Iterable[Path]:
-    for path in sorted(content_root.rglob("*.json")):
-        if path.is_file():
-            yield path
+    updated = glossary.pattern.sub(_replacer, text)
+    # Report in glossary order, as the per-entry passes used to
+    found.sort(key=lambda item: item[0])
+    return updated, [record for _, record in found]
 
 
 def lint_node(node, entries: Sequence[GlossaryEntry], path: str = "") -> tuple[object, List[ReplacementRecord], bool]:
+    """Lints node copy-on-write: containers on a changed path are copied, the input is never mutated."""
+    entries = compile_glossary(entries)
     records: List[ReplacementRecord] = []
     changed = False
 
     if isinstance(node, dict):
-        for key, value in list(node.items()):
+        updated_dict = node
+        for key, value in node.items():
             new_value, sub_records, sub_changed = lint_node(value, entries, f"{path}.{key}" if path else key)
             if sub_changed:
-                node[key] = new_value
+                if updated_dict is node:
+                    updated_dict = dict(node)
+                updated_dict[key] = new_value
             records.extend(sub_records)
             changed = changed or sub_changed
-        return node, records, changed
+        return updated_dict, records, changed
 
     if isinstance(node, list):
+        updated_list = node
         for index, value in enumerate(node):
             new_value, sub_records, sub_changed = lint_node(value, entries, f"{path}[{index}]")
             if sub_changed:
-                node[index] = new_value
+                if updated_list is node:
+                    updated_list = list(node)
+                updated_list[index] = new_value
             records.extend(sub_records)
             changed = changed or sub_changed
-        return node, records, changed
+        return updated_list, records, changed
 
     if isinstance(node, str):
         updated, replacements = apply_glossary(node, entries, path)
@@ -117,34 +234,145 @@ def lint_node(node, entries: Sequence[GlossaryEntry], path: str = "") -> tuple[o
 
 
 def lint_file(path: Path, entries: Sequence[GlossaryEntry], apply: bool, report_dir: Path | None) -> tuple[bool, List[ReplacementRecord], str | None]:
-    original_text = path.read_text(encoding="utf-8")
-    data = json.loads(original_text)
-
-    _, records, changed = lint_node(data, entries)
+    document = load_document(path)
+    with stage("glossary-match", trace=False):
+        data, records, changed = lint_node(document.data, entries)
 
     if not changed:
         return False, [], None
 
-    new_text = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
-
-    diff_text = "".join(
-        unified_diff(
-            original_text.splitlines(keepends=True),
-            new_text.splitlines(keepends=True),
-            fromfile=str(path),
-            tofile=str(path),
-        )
-    )
+    # Splice only the rewritten strings into the original text so unrelated formatting survives
+    with stage("diff", trace=False):
+        patcher = JsonPatcher(document.text)
+        for value_path, value in changed_values(document.data, data):
+            patcher.replace_value(value_path, value)
+        new_text = patcher.apply()
+        diff_text = patcher.unified_diff(str(path), str(path))
 
     if apply:
-        path.write_text(new_text, encoding="utf-8")
+        with stage("write", trace=False):
+            atomic_write_text(path, new_text)
+        default_loader.invalidate(path)
+
+    write_report(path, diff_text, report_dir)
+
+    return True, records, diff_text
 
+
+def write_report(path: Path, diff_text: str, report_dir: Path | None) -> None:
     if report_dir:
         report_dir.mkdir(parents=True, exist_ok=True)
         report_path = report_dir / f"{path.name}.diff"
         report_path.write_text(diff_text, encoding="utf-8")
 
-    return True, records, diff_text
+
+def sha256_of_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class LintCache:
+    """Per-file lint results keyed by (file sha256, glossary sha256)."""
+
+    def __init__(self, path: Path | None, glossary_sha: str) -> None:
+        self.path = path
+        self.glossary_sha = glossary_sha
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        if path is None or not path.is_file():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") == LINT_CACHE_VERSION and data.get("glossarySha256") == glossary_sha:
+            self.entries = data.get("files", {})
+
+    def get(self, path: Path, file_sha: str) -> LintResult | None:
+        entry = self.entries.get(str(path))
+        if entry is None or entry.get("sha256") != file_sha:
+            return None
+        return LintResult(
+            path=path,
+            changed=entry["changed"],
+            records=[ReplacementRecord(**record) for record in entry["records"]],
+            diff_text=entry["diff"],
+        )
+
+    def put(self, file_sha: str, result: LintResult) -> None:
+        self.entries[str(result.path)] = {
+            "sha256": file_sha,
+            "changed": result.changed,
+            "records": [asdict(record) for record in result.records],
+            "diff": result.diff_text,
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": LINT_CACHE_VERSION, "glossarySha256": self.glossary_sha, "files": self.entries}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self.dirty = False
+
+
+_WORKER_GLOSSARY: Glossary | None = None
+
+
+def _init_worker(glossary: Glossary) -> None:
+    global _WORKER_GLOSSARY
+    _WORKER_GLOSSARY = glossary
+
+
+def _lint_in_worker(path: Path, apply: bool, report_dir: Path | None) -> tuple[bool, List[ReplacementRecord], str | None]:
+    assert _WORKER_GLOSSARY is not None
+    return lint_file(path, _WORKER_GLOSSARY, apply=apply, report_dir=report_dir)
+
+
+def lint_paths(
+    paths: Sequence[Path],
+    entries: Sequence[GlossaryEntry],
+    apply: bool,
+    report_dir: Path | None,
+    cache: LintCache | None = None,
+    jobs: int = 1,
+) -> List[LintResult]:
+    """Lints paths, skipping files whose cached result is still valid; results keep the order of paths."""
+    glossary = compile_glossary(entries)
+    results: List[Optional[LintResult]] = [None] * len(paths)
+    pending: List[Tuple[int, Path, str]] = []
+
+    for index, path in enumerate(paths):
+        file_sha = load_document(path).sha256
+        cached = cache.get(path, file_sha) if cache is not None else None
+        # A cached hit is enough unless the replacements still have to be written
+        if cached is not None and not (apply and cached.changed):
+            if cached.changed and cached.diff_text is not None:
+                write_report(path, cached.diff_text, report_dir)
+            results[index] = cached
+            continue
+        pending.append((index, path, file_sha))
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)), initializer=_init_worker, initargs=(glossary,)
+        ) as pool:
+            futures = [pool.submit(_lint_in_worker, path, apply, report_dir) for _, path, _ in pending]
+            outputs = [future.result() for future in futures]
+    else:
+        outputs = [lint_file(path, glossary, apply=apply, report_dir=report_dir) for _, path, _ in pending]
+
+    for (index, path, file_sha), (changed, records, diff_text) in zip(pending, outputs):
+        result = LintResult(path=path, changed=changed, records=records, diff_text=diff_text)
+        results[index] = result
+        count("lint.replacements", len(records))
+        # After --apply the file content changed, so its old digest is useless as a key
+        if cache is not None and not (apply and changed):
+            cache.put(file_sha, result)
+
+    return [result for result in results if result is not None]
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -174,9 +402,41 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Apply the replacements to disk. Without this flag the script runs in dry-run mode.",
     )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=Path(__file__).resolve().parents[2] / "build" / "content-cache" / "ru-lint-cache.json",
+        help="Per-file result cache keyed by file and glossary sha256 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lint every file even if its cached result is still valid.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for linting; 0 means one per CPU (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--parity-index",
+        type=Path,
+        help="Take the file list from a qw_parity.py artifact instead of walking --content-root.",
+    )
+    add_changed_files_arguments(parser)
+    add_profile_arguments(parser)
     return parser
 
 
+def indexed_files(index_path: Path, content_root: Path) -> List[Path] | None:
+    index = load_parity_index(index_path, content_root)
+    if index is None:
+        print(f"Parity index {index_path} is missing or stale; walking {content_root} instead.")
+        return None
+    return sorted(path for locale in index.locales for path in index.files(locale) if path.is_file())
+
+
 def summarize(records: Sequence[ReplacementRecord]) -> str:
     lines = []
     for record in records:
@@ -189,8 +449,13 @@ def summarize(records: Sequence[ReplacementRecord]) -> str:
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    with profiling_from_args(args):
+        return run(args, changed_paths_from_args(args))
+
 
-    entries = load_glossary(args.glossary)
+def run(args: argparse.Namespace, paths: Iterable[Path] | None = None) -> int:
+    with stage("glossary-load"):
+        entries = load_glossary(args.glossary)
 
     all_records: List[ReplacementRecord] = []
     changed_files = 0
@@ -199,13 +464,22 @@ def main(argv: list[str] | None = None) -> int:
         # ensure reports reflect dry-run results but do not persist writes when directory is missing
         report_dir.mkdir(parents=True, exist_ok=True)
 
-    for path in iter_question_files(args.content_root):
-        changed, records, diff_text = lint_file(path, entries, apply=args.apply, report_dir=report_dir)
-        if changed:
+    glossary_sha = sha256_of_bytes(args.glossary.read_bytes())
+    cache = LintCache(None if args.no_cache else args.cache_file, glossary_sha)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    files = indexed_files(args.parity_index, args.content_root) if args.parity_index and paths is None else None
+    if files is None:
+        files = list(iter_question_files(args.content_root, paths))
+
+    with stage("lint", files=len(files), jobs=jobs):
+        results = lint_paths(files, entries, apply=args.apply, report_dir=report_dir, cache=cache, jobs=jobs)
+    for result in results:
+        if result.changed:
             changed_files += 1
-            all_records.extend(records)
-            if diff_text:
-                print(diff_text)
+            all_records.extend(result.records)
+            if result.diff_text:
+                print(result.diff_text)
+    cache.save()
 
     print(f"Processed {changed_files} file(s) with replacements.")
     if all_records:
@@ -0,0 +1,560 @@
+"""Compiled JSON Schema validation for the content and the generated indexes.
+
+Each schema is compiled once into a tree of small check functions, one per keyword
+actually present, and every instance is validated in a single walk that collects all
+errors instead of stopping at the first one. The supported keywords are the draft-07 /
+2020-12 subset the repository schemas use, with Ajv semantics where they differ
+(``$data`` references, ECMAScript-style ``pattern``); an unsupported keyword is a
+``SchemaError`` at compile time, never a silently skipped check.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+QUESTION_SCHEMA = REPO_ROOT / "schemas" / "question.schema.json"
+EXPLANATION_SCHEMA = REPO_ROOT / "schemas" / "explanation.schema.json"
+BLUEPRINT_SCHEMA = REPO_ROOT / "scripts" / "schemas" / "blueprint.schema.json"
+INDEX_SCHEMA = REPO_ROOT / "tools" / "schema-validation" / "schemas" / "questions_index.schema.json"
+
+# Keywords that never affect validation
+_ANNOTATIONS = {"$schema", "$id", "$comment", "title", "description", "examples", "default", "$defs", "definitions"}
+_PROPERTY_KEYWORDS = {"properties", "patternProperties", "additionalProperties"}
+_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$", re.ASCII)
+_DATE_TIME = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})[Tt](\d{2}):(\d{2}):(\d{2})(\.\d+)?([Zz]|[+-]\d{2}:\d{2})$", re.ASCII
+)
+
+# Instance location as a tuple of keys; the stack holds every instance from the root down
+Location = Tuple[Any, ...]
+Check = Callable[[Any, Location, List[Any], List["ValidationIssue"]], None]
+
+
+class SchemaError(ValueError):
+    pass
+
+
+@dataclass
+class ValidationIssue:
+    path: str
+    keyword: str
+    message: str
+    file: str | None = None
+
+    def __str__(self) -> str:
+        where = f"{self.file}:" if self.file else ""
+        return f"{where}{self.path or '/'}: {self.message}"
+
+
+def json_pointer(location: Location) -> str:
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in location)
+
+
+def _fail(errors: List[ValidationIssue], location: Location, keyword: str, message: str) -> None:
+    errors.append(ValidationIssue(json_pointer(location), keyword, message))
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name == "object":
+        return isinstance(value, dict)
+    if name == "array":
+        return isinstance(value, list)
+    if name == "string":
+        return isinstance(value, str)
+    if name == "boolean":
+        return isinstance(value, bool)
+    if name == "null":
+        return value is None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if name == "number":
+        return True
+    if name == "integer":
+        return isinstance(value, int) or (math.isfinite(value) and value == int(value))
+    raise SchemaError(f"unknown type {name!r}")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float) and math.isfinite(value) and value == int(value):
+        return int(value)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _canonical(value: Any) -> str:
+    # JSON equality: key order does not matter and 1 == 1.0
+    return json.dumps(_normalize(value), sort_keys=True, separators=(",", ":"))
+
+
+def _equal(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    return left == right if not isinstance(left, (dict, list)) else _canonical(left) == _canonical(right)
+
+
+def _valid_format(name: str, value: str) -> bool:
+    if name == "date":
+        match = _DATE.match(value)
+        if not match:
+            return False
+        try:
+            dt.date(*(int(part) for part in match.groups()))
+        except ValueError:
+            return False
+        return True
+    if name == "date-time":
+        match = _DATE_TIME.match(value)
+        if not match or not _valid_format("date", match.group(1)):
+            return False
+        hour, minute, second = (int(match.group(i)) for i in (2, 3, 4))
+        return hour < 24 and minute < 60 and second < 61
+    # Formats the repository schemas do not use are annotations, as in Ajv without ajv-formats
+    return True
+
+
+def _resolve_data(reference: str, location: Location, stack: List[Any]) -> Tuple[bool, Any]:
+    """Ajv $data: a relative JSON pointer from the current instance, e.g. "1/correctId"."""
+    match = re.match(r"^(\d+)(.*)$", reference)
+    if match is None:
+        raise SchemaError(f"unsupported $data reference {reference!r}")
+    up = int(match.group(1))
+    if up >= len(stack):
+        return False, None
+    value = stack[len(stack) - 1 - up]
+    rest = match.group(2)
+    if rest == "#":
+        return True, location[len(location) - up - 1] if up < len(location) else None
+    for token in rest.split("/")[1:] if rest else []:
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(value, dict) and token in value:
+            value = value[token]
+        elif isinstance(value, list) and token.isdigit() and int(token) < len(value):
+            value = value[int(token)]
+        else:
+            return False, None
+    return True, value
+
+
+class _Compiler:
+    def __init__(self, root: Mapping[str, Any]) -> None:
+        self.root = root
+        self._refs: Dict[str, Check] = {}
+
+    def ref(self, reference: str) -> Check:
+        if not reference.startswith("#"):
+            raise SchemaError(f"only local $ref is supported, got {reference!r}")
+        if reference not in self._refs:
+            target: Any = self.root
+            for token in reference[1:].split("/")[1:]:
+                token = token.replace("~1", "/").replace("~0", "~")
+                try:
+                    target = target[int(token)] if isinstance(target, list) else target[token]
+                except (KeyError, IndexError, ValueError) as exc:
+                    raise SchemaError(f"unresolvable $ref {reference!r}") from exc
+            # Placeholder first, so recursive references compile
+            slot: List[Check] = []
+            self._refs[reference] = lambda value, location, stack, errors: slot[0](value, location, stack, errors)
+            slot.append(self.compile(target))
+        return self._refs[reference]
+
+    def compile(self, schema: Any) -> Check:
+        if schema is True or schema == {}:
+            return lambda value, location, stack, errors: None
+        if schema is False:
+            return lambda value, location, stack, errors: _fail(errors, location, "false", "no value is allowed here")
+        if not isinstance(schema, dict):
+            raise SchemaError(f"schema must be an object or a boolean, got {schema!r}")
+
+        checks: List[Check] = []
+        if _PROPERTY_KEYWORDS & schema.keys():
+            checks.append(self._properties(schema))
+        for keyword in schema:
+            if keyword in _ANNOTATIONS or keyword in _PROPERTY_KEYWORDS:
+                continue
+            builder = getattr(self, "_k_" + keyword.replace("$", "").replace("-", "_"), None)
+            if builder is None:
+                if keyword in ("then", "else", "additionalItems"):
+                    continue  # compiled together with if / items
+                raise SchemaError(f"unsupported keyword {keyword!r}")
+            checks.append(builder(schema[keyword], schema))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            for check in checks:
+                check(value, location, stack, errors)
+
+        return check_all
+
+    def _children(self, value: Any, key: Any, location: Location, stack: List[Any], errors: List[ValidationIssue], check: Check) -> None:
+        stack.append(value)
+        try:
+            check(value, location + (key,), stack, errors)
+        finally:
+            stack.pop()
+
+    def _value_keyword(self, name: str, argument: Any, test: Callable[[Any, Any], str | None]) -> Check:
+        """Keyword whose argument may be an Ajv {"$data": pointer}; an unresolved pointer skips the check."""
+        if isinstance(argument, dict) and set(argument) == {"$data"}:
+            reference = argument["$data"]
+
+            def check_data(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+                found, resolved = _resolve_data(reference, location, stack)
+                if found:
+                    message = test(value, resolved)
+                    if message:
+                        _fail(errors, location, name, message)
+
+            return check_data
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            message = test(value, argument)
+            if message:
+                _fail(errors, location, name, message)
+
+        return check
+
+    # --- any instance -------------------------------------------------------
+
+    def _k_type(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        names = [argument] if isinstance(argument, str) else list(argument)
+        for name in names:
+            _is_type(None, name)  # rejects unknown type names at compile time
+        expected = " or ".join(names)
+        return self._value_keyword(
+            "type", names, lambda value, allowed: None if any(_is_type(value, n) for n in allowed) else f"must be {expected}"
+        )
+
+    def _k_enum(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "enum",
+            argument,
+            lambda value, allowed: None if any(_equal(value, item) for item in allowed) else f"must be one of {allowed}",
+        )
+
+    def _k_const(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "const", argument, lambda value, expected: None if _equal(value, expected) else f"must be {expected!r}"
+        )
+
+    def _k_ref(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        reference = argument
+        return lambda value, location, stack, errors: self.ref(reference)(value, location, stack, errors)
+
+    def _k_allOf(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        checks = [self.compile(item) for item in argument]
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            for sub in checks:
+                sub(value, location, stack, errors)
+
+        return check
+
+    def _branches(self, argument: Any) -> List[Check]:
+        return [self.compile(item) for item in argument]
+
+    def _k_anyOf(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        checks = self._branches(argument)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            attempts: List[ValidationIssue] = []
+            for sub in checks:
+                attempt: List[ValidationIssue] = []
+                sub(value, location, stack, attempt)
+                if not attempt:
+                    return
+                attempts.extend(attempt)
+            # Like Ajv: the errors of every branch, then the anyOf failure itself
+            errors.extend(attempts)
+            _fail(errors, location, "anyOf", "must match a schema in anyOf")
+
+        return check
+
+    def _k_oneOf(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        checks = self._branches(argument)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            attempts: List[List[ValidationIssue]] = []
+            for sub in checks:
+                attempt: List[ValidationIssue] = []
+                sub(value, location, stack, attempt)
+                attempts.append(attempt)
+            passing = [index for index, attempt in enumerate(attempts) if not attempt]
+            if len(passing) == 1:
+                return
+            if not passing:
+                errors.extend(issue for attempt in attempts for issue in attempt)
+            _fail(errors, location, "oneOf", "must match exactly one schema in oneOf")
+
+        return check
+
+    def _k_not(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        sub = self.compile(argument)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            attempt: List[ValidationIssue] = []
+            sub(value, location, stack, attempt)
+            if not attempt:
+                _fail(errors, location, "not", "must not match the schema in not")
+
+        return check
+
+    def _k_if(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        condition = self.compile(argument)
+        then = self.compile(schema.get("then", True))
+        otherwise = self.compile(schema.get("else", True))
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            attempt: List[ValidationIssue] = []
+            condition(value, location, stack, attempt)
+            (then if not attempt else otherwise)(value, location, stack, errors)
+
+        return check
+
+    # --- strings and numbers ------------------------------------------------
+
+    def _k_minLength(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "minLength",
+            argument,
+            lambda value, limit: f"must NOT have fewer than {limit} characters" if isinstance(value, str) and len(value) < limit else None,
+        )
+
+    def _k_maxLength(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "maxLength",
+            argument,
+            lambda value, limit: f"must NOT have more than {limit} characters" if isinstance(value, str) and len(value) > limit else None,
+        )
+
+    def _k_pattern(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        # \d, \w and \s are ASCII-only in ECMAScript regular expressions
+        regex = re.compile(argument, re.ASCII)
+        return self._value_keyword(
+            "pattern",
+            argument,
+            lambda value, source: f'must match pattern "{source}"' if isinstance(value, str) and not regex.search(value) else None,
+        )
+
+    def _k_format(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "format",
+            argument,
+            lambda value, name: f'must match format "{name}"' if isinstance(value, str) and not _valid_format(name, value) else None,
+        )
+
+    def _number_keyword(self, name: str, argument: Any, fails: Callable[[Any, Any], bool], message: str) -> Check:
+        def test(value: Any, limit: Any) -> str | None:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+            return message.format(limit) if fails(value, limit) else None
+
+        return self._value_keyword(name, argument, test)
+
+    def _k_minimum(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._number_keyword("minimum", argument, lambda value, limit: value < limit, "must be >= {}")
+
+    def _k_maximum(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._number_keyword("maximum", argument, lambda value, limit: value > limit, "must be <= {}")
+
+    def _k_exclusiveMinimum(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._number_keyword("exclusiveMinimum", argument, lambda value, limit: value <= limit, "must be > {}")
+
+    def _k_exclusiveMaximum(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._number_keyword("exclusiveMaximum", argument, lambda value, limit: value >= limit, "must be < {}")
+
+    def _k_multipleOf(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._number_keyword(
+            "multipleOf", argument, lambda value, step: not math.isclose(value / step, round(value / step)), "must be multiple of {}"
+        )
+
+    # --- objects --------------------------------------------------------------
+
+    def _k_required(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        names = list(argument)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            if isinstance(value, dict):
+                for name in names:
+                    if name not in value:
+                        _fail(errors, location, "required", f"must have required property '{name}'")
+
+        return check
+
+    def _properties(self, schema: Mapping[str, Any]) -> Check:
+        # properties, patternProperties and additionalProperties decide together which check a key gets
+        named = {name: self.compile(sub) for name, sub in schema.get("properties", {}).items()}
+        patterns = {re.compile(pattern, re.ASCII): self.compile(sub) for pattern, sub in schema.get("patternProperties", {}).items()}
+        return self._property_checks(named, patterns, schema.get("additionalProperties", True))
+
+    def _property_checks(self, named: Dict[str, Check], patterns: Dict[re.Pattern[str], Check], additional: Any) -> Check:
+        forbid = additional is False
+        extra = None if additional is True or forbid else self.compile(additional)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                sub = named.get(key)
+                matched = sub is not None
+                if sub is not None:
+                    self._children(item, key, location, stack, errors, sub)
+                for regex, pattern_check in patterns.items():
+                    if regex.search(key):
+                        matched = True
+                        self._children(item, key, location, stack, errors, pattern_check)
+                if matched:
+                    continue
+                if forbid:
+                    _fail(errors, location, "additionalProperties", f"must NOT have additional property '{key}'")
+                elif extra is not None:
+                    self._children(item, key, location, stack, errors, extra)
+
+        return check
+
+    def _k_minProperties(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "minProperties",
+            argument,
+            lambda value, limit: f"must NOT have fewer than {limit} properties" if isinstance(value, dict) and len(value) < limit else None,
+        )
+
+    def _k_maxProperties(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "maxProperties",
+            argument,
+            lambda value, limit: f"must NOT have more than {limit} properties" if isinstance(value, dict) and len(value) > limit else None,
+        )
+
+    # --- arrays ---------------------------------------------------------------
+
+    def _k_items(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        if isinstance(argument, list):
+            positional = [self.compile(sub) for sub in argument]
+            rest = self.compile(schema.get("additionalItems", True))
+            rest_forbidden = schema.get("additionalItems", True) is False
+        else:
+            positional = []
+            rest = self.compile(argument)
+            rest_forbidden = False
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            if not isinstance(value, list):
+                return
+            for index, item in enumerate(value):
+                if index < len(positional):
+                    self._children(item, index, location, stack, errors, positional[index])
+                elif rest_forbidden:
+                    _fail(errors, location, "additionalItems", f"must NOT have more than {len(positional)} items")
+                    break
+                else:
+                    self._children(item, index, location, stack, errors, rest)
+
+        return check
+
+    def _k_prefixItems(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._k_items(argument, {"additionalItems": True})
+
+    def _k_minItems(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "minItems",
+            argument,
+            lambda value, limit: f"must NOT have fewer than {limit} items" if isinstance(value, list) and len(value) < limit else None,
+        )
+
+    def _k_maxItems(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        return self._value_keyword(
+            "maxItems",
+            argument,
+            lambda value, limit: f"must NOT have more than {limit} items" if isinstance(value, list) and len(value) > limit else None,
+        )
+
+    def _k_uniqueItems(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        def test(value: Any, unique: Any) -> str | None:
+            if not unique or not isinstance(value, list):
+                return None
+            seen: Dict[str, int] = {}
+            for index, item in enumerate(value):
+                key = _canonical(item)
+                if key in seen:
+                    return f"must NOT have duplicate items (items ## {seen[key]} and {index} are identical)"
+                seen[key] = index
+            return None
+
+        return self._value_keyword("uniqueItems", argument, test)
+
+    def _k_contains(self, argument: Any, schema: Mapping[str, Any]) -> Check:
+        sub = self.compile(argument)
+
+        def check(value: Any, location: Location, stack: List[Any], errors: List[ValidationIssue]) -> None:
+            if not isinstance(value, list):
+                return
+            for index, item in enumerate(value):
+                attempt: List[ValidationIssue] = []
+                self._children(item, index, location, stack, attempt, sub)
+                if not attempt:
+                    return
+            _fail(errors, location, "contains", "must contain at least 1 valid item")
+
+        return check
+
+
+class CompiledSchema:
+    def __init__(self, schema: Mapping[str, Any], source: Path | None = None) -> None:
+        self.source = source
+        self._check = _Compiler(schema).compile(schema)
+
+    def validate(self, instance: Any) -> List[ValidationIssue]:
+        errors: List[ValidationIssue] = []
+        self._check(instance, (), [instance], errors)
+        return errors
+
+
+@lru_cache(maxsize=None)
+def compile_schema_file(path: Path) -> CompiledSchema:
+    try:
+        schema = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise SchemaError(f"cannot load schema {path}: {exc}") from exc
+    return CompiledSchema(schema, path)
+
+
+def question_issues(question: Mapping[str, Any], task_id: str | None = None) -> List[ValidationIssue]:
+    """
+    Question invariants the schema does not enforce: unique choice ids, correctId among them and,
+    inside a task bundle, the bundle's taskId. The schema's contains/$data check resolves
+    "1/correctId" against the choice object, so it never fires, in Ajv or here.
+    """
+    issues: List[ValidationIssue] = []
+    if task_id is not None and "taskId" in question and question["taskId"] != task_id:
+        issues.append(ValidationIssue("/taskId", "taskId", f"has taskId={question['taskId']!r}, expected {task_id!r}"))
+    choices = question.get("choices")
+    if not isinstance(choices, list) or not all(isinstance(c, dict) and "id" in c for c in choices):
+        return issues
+    choice_ids: List[str] = []
+    for index, choice in enumerate(choices):
+        choice_id = str(choice["id"])
+        if choice_id in choice_ids:
+            issues.append(ValidationIssue(f"/choices/{index}/id", "choiceId", f"has duplicate choice id {choice_id!r}"))
+        choice_ids.append(choice_id)
+    if "correctId" in question and str(question["correctId"]) not in choice_ids:
+        issues.append(
+            ValidationIssue(
+                "/correctId",
+                "correctId",
+                f"has correctId={str(question['correctId'])!r} which is not present in choices {sorted(set(choice_ids))}",
+            )
+        )
+    return issues
+
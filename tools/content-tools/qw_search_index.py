@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+SEARCH_INDEX_SCHEMA = "questions-search-index-v1"
+# 2: one doc per bank question; version 1 kept a single doc per id and dropped repeated ids
+SEARCH_INDEX_VERSION = 2
+SEARCH_FIELDS = ("stem", "choices", "rationales")
+
+# A word, with inner apostrophes (don't) and decimal/thousands separators between digits (0,035; 1.5)
+_TOKEN_RE = re.compile(r"[^\W_]+(?:(?:['’](?=[^\W\d_])|[.,](?=\d))[^\W_]+)*")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# postings: term -> {doc: {field: [positions]}}
+Postings = Dict[int, Dict[int, List[int]]]
+# A bank question: (id, taskId, occurrence of that id and taskId in bank order). Ids repeat in real banks
+DocKey = Tuple[str, str, int]
+
+
+def _normalize_number(token: str, locale: str) -> str:
+    if locale == "ru":
+        # 0,035 and 0.035 are the same number in ru
+        return token.replace(",", ".")
+    # en: comma groups thousands
+    return token.replace(",", "")
+
+
+def tokenize(text: str, locale: str) -> List[str]:
+    """Case-folded tokens; ru folds ё into е, en drops possessive 's, numbers keep their separators."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if locale == "ru":
+        text = text.replace("ё", "е")
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall(text):
+        if _NUMBER_RE.fullmatch(token):
+            token = _normalize_number(token, locale)
+        elif "'" in token or "’" in token:
+            token = token.replace("’", "'")
+            if locale == "en" and token.endswith("'s"):
+                token = token[:-2]
+            token = token.replace("'", "")
+        tokens.append(token)
+    return tokens
+
+
+def question_field_texts(question: Mapping[str, Any]) -> Iterator[Tuple[int, List[str]]]:
+    """(field number in SEARCH_FIELDS, its texts) for every searchable field of a question."""
+    stem = question.get("stem")
+    if isinstance(stem, str):
+        yield 0, [stem]
+    choices = question.get("choices")
+    if isinstance(choices, list):
+        yield 1, [c["text"] for c in choices if isinstance(c, dict) and isinstance(c.get("text"), str)]
+    rationales = question.get("rationales")
+    if isinstance(rationales, dict):
+        yield 2, [text for _, text in sorted(rationales.items()) if isinstance(text, str)]
+
+
+def tokenize_question(question: Mapping[str, Any], locale: str) -> Dict[str, Dict[int, List[int]]]:
+    """term -> field -> positions. Values of a multi-valued field are a position apart, so phrases do not span them."""
+    terms: Dict[str, Dict[int, List[int]]] = {}
+    for field, texts in question_field_texts(question):
+        position = 0
+        for text in texts:
+            for token in tokenize(text, locale):
+                terms.setdefault(token, {}).setdefault(field, []).append(position)
+                position += 1
+            position += 1
+    return terms
+
+
+def encode_postings(postings: Postings) -> List[int]:
+    """Flat list of [doc delta, field, position count, first position, position deltas...] per doc and field."""
+    encoded: List[int] = []
+    last_doc = 0
+    for doc in sorted(postings):
+        for field, positions in sorted(postings[doc].items()):
+            encoded.append(doc - last_doc)
+            last_doc = doc
+            encoded.extend((field, len(positions), positions[0]))
+            encoded.extend(b - a for a, b in zip(positions, positions[1:]))
+    return encoded
+
+
+def decode_postings(encoded: Sequence[int]) -> Postings:
+    postings: Postings = {}
+    doc = 0
+    i = 0
+    while i < len(encoded):
+        doc += encoded[i]
+        field, size = encoded[i + 1], encoded[i + 2]
+        positions = [encoded[i + 3]]
+        for delta in encoded[i + 4 : i + 3 + size]:
+            positions.append(positions[-1] + delta)
+        postings.setdefault(doc, {})[field] = positions
+        i += 3 + size
+    return postings
+
+
+def build_search_index(
+    questions: Iterable[Mapping[str, Any]],
+    locale: str,
+    task_shas: Mapping[str, str],
+    previous: Optional[Mapping[str, Any]] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Inverted index of a locale bank: term -> delta-encoded postings over docs numbered in bank order
+    (by id, then taskId); a repeated id is a doc of its own for every question that carries it.
+
+    task_shas (taskId -> bundle sha256) is recorded in the index; with a previous index, questions
+    of tasks whose sha is unchanged keep their postings and only the rest are tokenized.
+    Returns (index, number of tokenized questions).
+    """
+    reusable: Set[str] = set()
+    if (
+        previous is not None
+        and previous.get("schema") == SEARCH_INDEX_SCHEMA
+        and previous.get("version") == SEARCH_INDEX_VERSION
+        and previous.get("locale") == locale
+    ):
+        reusable = {task for task, sha in previous.get("tasks", {}).items() if task_shas.get(task) == sha}
+
+    # term -> doc key -> field -> positions
+    terms: Dict[str, Dict[DocKey, Dict[int, List[int]]]] = {}
+    docs: Set[DocKey] = set()
+    if reusable and previous is not None:
+        previous_tasks: List[str] = previous["taskIds"]
+        previous_keys = _doc_keys(previous["ids"], [previous_tasks[task] for task in previous["docTasks"]])
+        kept = {doc for doc, key in enumerate(previous_keys) if key[1] in reusable}
+        docs.update(previous_keys[doc] for doc in kept)
+        for term, encoded in previous["terms"].items():
+            for doc, fields in decode_postings(encoded).items():
+                if doc in kept:
+                    terms.setdefault(term, {})[previous_keys[doc]] = fields
+
+    tokenized = 0
+    occurrences: Dict[Tuple[str, str], int] = {}
+    for question in questions:
+        question_id = str(question.get("id", ""))
+        task_id = str(question.get("taskId", ""))
+        if task_id in reusable:
+            continue
+        ordinal = occurrences.get((question_id, task_id), 0)
+        occurrences[(question_id, task_id)] = ordinal + 1
+        key = (question_id, task_id, ordinal)
+        docs.add(key)
+        tokenized += 1
+        for term, fields in tokenize_question(question, locale).items():
+            terms.setdefault(term, {})[key] = fields
+
+    # Bank order: sorted by (id, taskId) and stable, i.e. by the occurrence among equal keys
+    keys = sorted(docs)
+    doc_numbers = {key: doc for doc, key in enumerate(keys)}
+    task_ids = sorted({key[1] for key in keys})
+    task_numbers = {task_id: number for number, task_id in enumerate(task_ids)}
+    index = {
+        "schema": SEARCH_INDEX_SCHEMA,
+        "version": SEARCH_INDEX_VERSION,
+        "locale": locale,
+        "fields": list(SEARCH_FIELDS),
+        "tasks": dict(sorted(task_shas.items())),
+        "taskIds": task_ids,
+        "ids": [key[0] for key in keys],
+        "docTasks": [task_numbers[key[1]] for key in keys],
+        "terms": {
+            term: encode_postings({doc_numbers[key]: fields for key, fields in by_key.items()})
+            for term, by_key in sorted(terms.items())
+        },
+    }
+    return index, tokenized
+
+
+def _doc_keys(ids: Sequence[str], tasks: Sequence[str]) -> List[DocKey]:
+    occurrences: Dict[Tuple[str, str], int] = {}
+    keys: List[DocKey] = []
+    for question_id, task_id in zip(ids, tasks):
+        ordinal = occurrences.get((question_id, task_id), 0)
+        occurrences[(question_id, task_id)] = ordinal + 1
+        keys.append((question_id, task_id, ordinal))
+    return keys
+
+
+def encode_search_index(index: Mapping[str, Any]) -> bytes:
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_search_index(path: Path) -> Optional[Dict[str, Any]]:
+    """The index at path, or None if it is missing, unreadable or of another schema."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("schema") != SEARCH_INDEX_SCHEMA:
+        return None
+    return data
+
+
+class SearchIndex:
+    """
+    Term, phrase and prefix queries over a search.v1.json. Postings are decoded on first use;
+    results are question ids in bank order, an id once per matching question that carries it.
+    """
+
+    def __init__(self, index: Mapping[str, Any]) -> None:
+        self.index = index
+        self.locale: str = index["locale"]
+        self.ids: List[str] = index["ids"]
+        self.fields: List[str] = index["fields"]
+        self._encoded: Mapping[str, List[int]] = index["terms"]
+        self._sorted_terms = sorted(self._encoded)
+        self._decoded: Dict[str, Postings] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        index = load_search_index(path)
+        if index is None:
+            raise ValueError(f"{path}: not a {SEARCH_INDEX_SCHEMA} file")
+        return cls(index)
+
+    def _field_numbers(self, fields: Optional[Sequence[str]]) -> Optional[Set[int]]:
+        if fields is None:
+            return None
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown search field(s) {sorted(unknown)}; expected {self.fields}")
+        return {self.fields.index(field) for field in fields}
+
+    def postings(self, term: str) -> Postings:
+        postings = self._decoded.get(term)
+        if postings is None:
+            postings = decode_postings(self._encoded.get(term, []))
+            self._decoded[term] = postings
+        return postings
+
+    def _docs(self, postings: Postings, fields: Optional[Set[int]]) -> Set[int]:
+        return {doc for doc, by_field in postings.items() if fields is None or fields & by_field.keys()}
+
+    def term_docs(self, term: str, fields: Optional[Set[int]] = None) -> Set[int]:
+        return self._docs(self.postings(term), fields)
+
+    def prefix_docs(self, prefix: str, fields: Optional[Set[int]] = None) -> Set[int]:
+        docs: Set[int] = set()
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            docs |= self.term_docs(term, fields)
+        return docs
+
+    def phrase_docs(self, tokens: Sequence[str], fields: Optional[Set[int]] = None) -> Set[int]:
+        if not tokens:
+            return set()
+        lists = [self.postings(token) for token in tokens]
+        candidates = set.intersection(*(self._docs(postings, fields) for postings in lists))
+        docs: Set[int] = set()
+        for doc in candidates:
+            for field in lists[0][doc]:
+                if fields is not None and field not in fields:
+                    continue
+                starts = set(lists[0][doc][field])
+                for offset, postings in enumerate(lists[1:], start=1):
+                    following = set(postings[doc].get(field, ()))
+                    starts = {start for start in starts if start + offset in following}
+                if starts:
+                    docs.add(doc)
+                    break
+        return docs
+
+    def search(self, query: str, fields: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Ids of questions matching every part of query: "quoted phrase", prefix* or a word
+        (a word that tokenizes into several tokens, e.g. AWG-14, is matched as a phrase).
+        """
+        field_numbers = self._field_numbers(fields)
+        result: Optional[Set[int]] = None
+        for phrase, word in _QUERY_RE.findall(query):
+            if word.endswith("*"):
+                tokens = tokenize(word[:-1], self.locale)
+                if not tokens:
+                    continue
+                docs = self.prefix_docs(tokens[-1], field_numbers)
+                if len(tokens) > 1:
+                    docs &= self.phrase_docs(tokens[:-1], field_numbers)
+            else:
+                tokens = tokenize(phrase or word, self.locale)
+                if not tokens:
+                    continue
+                docs = self.phrase_docs(tokens, field_numbers)
+            result = docs if result is None else result & docs
+            if not result:
+                return []
+        return [self.ids[doc] for doc in sorted(result or ())]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Query a questions search index (<locale>/search.v1.json written by the bank generator).",
+    )
+    parser.add_argument("index", type=Path, help="Path to search.v1.json")
+    parser.add_argument("query", nargs="+", help='Words, "quoted phrases" and prefix* terms; all must match')
+    parser.add_argument(
+        "--field",
+        action="append",
+        choices=SEARCH_FIELDS,
+        help="Only match in this field (repeatable; default: all fields)",
+    )
+    parser.add_argument("--limit", type=int, default=50, help="Print at most this many ids (default: %(default)s)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    index = SearchIndex.load(args.index)
+    started = time.perf_counter()
+    ids = index.search(" ".join(args.query), args.field)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for question_id in ids[: args.limit]:
+        print(question_id)
+    print(f"{len(ids)} match(es) in {elapsed_ms:.1f} ms")
+    return 0 if ids else 1
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from qw_changed_files import add_changed_files_arguments, changed_paths_from_args, select_question_files
+from qw_content_loader import load_document
+from qw_profile import add_profile_arguments, count, profiling_from_args, stage
+from qw_schema import (
+    BLUEPRINT_SCHEMA,
+    EXPLANATION_SCHEMA,
+    INDEX_SCHEMA,
+    QUESTION_SCHEMA,
+    ValidationIssue,
+    compile_schema_file,
+    question_issues,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+KINDS = ("questions", "explanations", "indexes", "blueprints")
+# Blueprints are opt-in: the legacy welder_ip_2024.json predates the strict blueprint schema
+DEFAULT_KINDS = ("questions", "explanations", "indexes")
+
+
+@dataclass
+class Target:
+    kind: str
+    schema: Path
+    root: Path
+    patterns: Tuple[str, ...]
+
+
+def build_targets(args: argparse.Namespace) -> List[Target]:
+    return [
+        Target("questions", QUESTION_SCHEMA, args.content_root, ("**/*.json",)),
+        Target("explanations", EXPLANATION_SCHEMA, args.explanations_root, ("**/*.json",)),
+        Target("indexes", INDEX_SCHEMA, args.questions_root, ("index.json", "*/index.json")),
+        Target("blueprints", BLUEPRINT_SCHEMA, args.blueprints_root, ("*.json",)),
+    ]
+
+
+def target_files(target: Target, paths: Iterable[Path] | None = None) -> List[Path]:
+    with stage("discover", root=str(target.root)):
+        files = sorted({path for pattern in target.patterns for path in target.root.glob(pattern) if path.is_file()})
+        if paths is not None:
+            selected = set(select_question_files(target.root, paths))
+            files = [path for path in files if path.resolve() in selected]
+    count("files.discovered", len(files))
+    return files
+
+
+def validate_file(path: Path, target: Target) -> List[ValidationIssue]:
+    try:
+        data = load_document(path).data
+    except RuntimeError as exc:
+        issues = [ValidationIssue("", "json", str(exc))]
+    else:
+        issues = compile_schema_file(target.schema).validate(data)
+        if target.kind == "questions" and isinstance(data, dict):
+            issues.extend(question_issues(data))
+    for issue in issues:
+        issue.file = str(path)
+    return issues
+
+
+def validate(targets: Iterable[Target], paths: Iterable[Path] | None = None) -> Tuple[int, List[ValidationIssue]]:
+    """Validates every file of every target in one pass; returns the number of files and all issues."""
+    paths = list(paths) if paths is not None else None
+    checked = 0
+    issues: List[ValidationIssue] = []
+    for target in targets:
+        for path in target_files(target, paths):
+            checked += 1
+            issues.extend(validate_file(path, target))
+    count("schema.files", checked)
+    count("schema.issues", len(issues))
+    return checked, issues
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Validate content questions, explanations, blueprints and generated indexes against their JSON schemas.",
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "questions",
+        help="Root directory containing localized question JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--explanations-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "explanations",
+        help="Root directory containing explanation JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--questions-root",
+        type=Path,
+        default=REPO_ROOT / "app-android" / "src" / "main" / "assets" / "questions",
+        help="Generated questions root whose index.json files are validated (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--blueprints-root",
+        type=Path,
+        default=REPO_ROOT / "content" / "blueprints",
+        help="Directory containing blueprint JSON files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        choices=KINDS,
+        default=list(DEFAULT_KINDS),
+        help="What to validate (default: %(default)s)",
+    )
+    add_changed_files_arguments(parser)
+    add_profile_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    with profiling_from_args(args):
+        return run(args, changed_paths_from_args(args))
+
+
+def run(args: argparse.Namespace, paths: Iterable[Path] | None = None) -> int:
+    targets = [target for target in build_targets(args) if target.kind in args.kinds]
+    with stage("schema"):
+        checked, issues = validate(targets, paths)
+
+    for issue in issues:
+        print(f"[schema] {issue}")
+    print(f"Validated {checked} file(s) against {len(targets)} schema(s): {len(issues)} error(s).")
+    return 1 if issues else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+# <linux/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def _is_watched_file(name: str) -> bool:
+    # Editors and atomic_write_text save through hidden temp files; only the final rename matters
+    return name.endswith(".json") and not name.startswith(".")
+
+
+class PollingWatcher:
+    """Portable fallback: re-stats the tree every interval and reports files whose mtime or size moved."""
+
+    def __init__(self, root: Path, interval: float = 0.25) -> None:
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if _is_watched_file(name):
+                    path = Path(directory, name)
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float | None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {path for path in current.keys() | self._snapshot.keys() if current.get(path) != self._snapshot.get(path)}
+            self._snapshot = current
+            if changed:
+                return changed
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining <= 0:
+                return set()
+            time.sleep(remaining)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify through libc, one watch per directory; new directories are picked up as they appear."""
+
+    def __init__(self, root: Path) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self._dirs: Dict[int, Path] = {}
+        self._add_tree(root)
+
+    def _add_tree(self, directory: Path) -> Set[Path]:
+        """Watches directory and its subdirectories; returns the files already inside (created before the watch)."""
+        found: Set[Path] = set()
+        for current, _, names in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {current}")
+            self._dirs[wd] = Path(current)
+            found.update(Path(current, name) for name in names if _is_watched_file(name))
+        return found
+
+    def poll(self, timeout: float | None) -> Set[Path]:
+        changed: Set[Path] = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        while True:
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = _EVENT.unpack_from(buffer, offset)
+                name = os.fsdecode(buffer[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0"))
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; report the root so the caller rescans everything
+                    changed.add(self.root)
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / name
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed.update(self._add_tree(path))
+                    elif mask & IN_MOVED_FROM:
+                        changed.add(path)
+                elif _is_watched_file(name):
+                    changed.add(path)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_watcher(root: Path, polling: bool = False, interval: float = 0.25) -> InotifyWatcher | PollingWatcher:
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def wait_for_changes(
+    watcher: InotifyWatcher | PollingWatcher, debounce: float = 0.05, timeout: float | None = None
+) -> Set[Path]:
+    """Blocks until something changes, then keeps collecting until the tree has been quiet for debounce seconds."""
+    changed = watcher.poll(timeout)
+    while changed:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from qw_bank_binary import BinaryBank, BinaryBankError, encode_binary_bank
+
+ASSETS_ROOT = Path(__file__).resolve().parents[3] / "app-android" / "src" / "main" / "assets" / "questions"
+
+
+def _sample_bank():
+    return [
+        {"id": "Q-A-1_a_1", "taskId": "A-1", "stem": "Первый", "choices": [{"id": "A", "text": "x"}], "correctId": "A"},
+        {"id": "Q-A-1_b_2", "taskId": "A-1", "stem": "Second", "weight": -3, "score": 0.5, "flag": None},
+        {"id": "Q-B-6_c_3", "taskId": "B-6", "stem": "Third", "tags": [True, False, {}]},
+    ]
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib"])
+def test_binary_bank_round_trip_and_lookup(tmp_path, codec):
+    bank = _sample_bank()
+    path = tmp_path / "bank.v1.qwb"
+    path.write_bytes(encode_binary_bank(bank, codec=codec, records_per_block=2, strings_per_block=3))
+
+    with BinaryBank(path) as reader:
+        assert list(reader) == bank
+        assert reader.get("Q-A-1_b_2") == bank[1]
+        assert reader.get("missing") is None
+        assert [q["id"] for q in reader.by_task("A-1")] == ["Q-A-1_a_1", "Q-A-1_b_2"]
+        assert reader.task_ids() == ["A-1", "B-6"]
+
+
+@pytest.mark.parametrize("locale", ["en", "ru"])
+def test_binary_bank_matches_bank_json(tmp_path, locale):
+    bank_path = ASSETS_ROOT / locale / "bank.v1.json"
+    if not bank_path.is_file():
+        pytest.skip(f"no bank for {locale}")
+    bank = json.loads(bank_path.read_text(encoding="utf-8"))
+    path = tmp_path / "bank.v1.qwb"
+    path.write_bytes(encode_binary_bank(bank))
+
+    with BinaryBank(path) as reader:
+        assert len(reader) == len(bank)
+        assert list(reader) == bank
+        for question in bank[:: max(1, len(bank) // 25)]:
+            assert reader.get(question["id"]) == question
+
+
+def test_binary_bank_rejects_foreign_files(tmp_path):
+    path = tmp_path / "bank.v1.qwb"
+    path.write_bytes(b"not a bank" * 10)
+    with pytest.raises(BinaryBankError):
+        BinaryBank(path)
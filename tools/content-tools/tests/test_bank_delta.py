@@ -0,0 +1,28 @@
+from qw_bank_delta import apply_delta, build_delta, build_manifest, load_manifest, question_sha256
+
+
+def _q(question_id, stem="Stem"):
+    return {"id": question_id, "taskId": "A-1", "stem": stem}
+
+
+def test_delta_patch_rebuilds_the_new_bank_from_the_old_one():
+    old = [_q("Q1"), _q("Q2"), _q("Q3"), _q("Q3", "Duplicate id"), _q("Q4")]
+    new = [_q("Q0"), _q("Q1"), _q("Q3"), _q("Q3", "Duplicate id, edited"), _q("Q4"), _q("Q5")]
+
+    delta = build_delta(build_manifest(old, "en", "old-sha"), build_manifest(new, "en", "new-sha"), new)
+
+    assert apply_delta(old, delta) == new
+    assert (delta["added"], delta["removed"], delta["changed"]) == (["Q0", "Q5"], ["Q2"], ["Q3"])
+    assert delta["hashes"]["Q3"] == [question_sha256(new[2]), question_sha256(new[3])]
+    assert (delta["fromBankSha256"], delta["toBankSha256"]) == ("old-sha", "new-sha")
+    # Unchanged runs travel as positions into the old bank, not as questions
+    assert sum(len(step["questions"]) for step in delta["patch"] if step["op"] == "insert") == 3
+
+
+def test_load_manifest_ignores_foreign_files(tmp_path):
+    path = tmp_path / "bank.manifest.v1.json"
+    assert load_manifest(path) is None
+    path.write_text('{"schema": "something-else"}', encoding="utf-8")
+    assert load_manifest(path) is None
+    path.write_text("{broken", encoding="utf-8")
+    assert load_manifest(path) is None
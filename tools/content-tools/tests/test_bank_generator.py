@@ -0,0 +1,276 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import generate_bank_and_index_from_assets as bank_generator
+
+
+def _question(question_id, task_id, stem="Stem"):
+    return {
+        "id": question_id,
+        "taskId": task_id,
+        "difficulty": "medium",
+        "stem": stem,
+        "choices": [{"id": f"CHOICE-{i}", "text": f"Option {i}"} for i in range(1, 5)],
+        "correctId": "CHOICE-1",
+    }
+
+
+def _write_tree(root, tasks=None):
+    tasks = tasks or {
+        "A-1": [_question("Q-A-1_b", "A-1"), _question("Q-A-1_a", "A-1")],
+        "A-2": [_question("Q-A-2_a", "A-2")],
+    }
+    for locale in ("en", "ru"):
+        (root / locale / "tasks").mkdir(parents=True)
+        (root / locale / "meta").mkdir()
+        (root / locale / "meta" / "task_labels.json").write_text(json.dumps({"A-1": locale}), encoding="utf-8")
+        for task_id, questions in tasks.items():
+            _write_task(root, locale, task_id, questions)
+    return root
+
+
+def _write_task(root, locale, task_id, questions):
+    path = root / locale / "tasks" / f"{task_id}.json"
+    path.write_text(json.dumps(questions, indent=2), encoding="utf-8")
+    return path
+
+
+def _snapshot(root):
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def _build(root, cache_file=None, **kwargs):
+    cache = bank_generator.BuildCache(cache_file)
+    bank_generator.build_banks_and_indexes(root, cache, **kwargs)
+    return cache
+
+
+def _spy_loads(monkeypatch):
+    loaded = []
+    real = bank_generator.load_document
+
+    def load_document(path):
+        loaded.append(path.name if path.parent.name == "tasks" else path)
+        return real(path)
+
+    monkeypatch.setattr(bank_generator, "load_document", load_document)
+    return loaded
+
+
+def test_cached_rebuild_matches_a_no_cache_build(tmp_path):
+    cached = _write_tree(tmp_path / "cached" / "questions")
+    cache_file = tmp_path / "cache.json"
+    _build(cached, cache_file)
+    _build(cached, cache_file)
+    _write_task(cached, "en", "A-2", [_question("Q-A-2_a", "A-2", stem="Edited"), _question("Q-A-2_0", "A-2")])
+    _build(cached, cache_file)
+
+    fresh = tmp_path / "fresh" / "questions"
+    shutil.copytree(cached, fresh, ignore=shutil.ignore_patterns("bank.v1.json", "index.json"))
+    _build(fresh)
+
+    assert _snapshot(cached) == _snapshot(fresh)
+    bank = json.loads((cached / "en" / "bank.v1.json").read_text(encoding="utf-8"))
+    assert [q["id"] for q in bank] == ["Q-A-1_a", "Q-A-1_b", "Q-A-2_0", "Q-A-2_a"]
+
+
+def test_cache_invalidates_only_changed_tasks_and_stale_sources(tmp_path, monkeypatch):
+    root = _write_tree(tmp_path / "questions")
+    cache_file = tmp_path / "cache.json"
+    _build(root, cache_file)
+    reference = _snapshot(root)
+    loaded = _spy_loads(monkeypatch)
+
+    # Unchanged tree: nothing is read
+    _build(root, cache_file)
+    assert loaded == []
+
+    # Touch without an edit: only that bundle is re-hashed, the bank stays as it is
+    task = root / "en" / "tasks" / "A-2.json"
+    os.utime(task, ns=(task.stat().st_atime_ns, task.stat().st_mtime_ns + 1_000_000))
+    _build(root, cache_file)
+    assert loaded == ["A-2.json"]
+    assert _snapshot(root) == reference
+
+    # An edit re-reads exactly that task
+    loaded.clear()
+    _write_task(root, "ru", "A-1", [_question("Q-A-1_a", "A-1", stem="Правка")])
+    _build(root, cache_file)
+    assert loaded == ["A-1.json"]
+    assert json.loads((root / "ru" / "bank.v1.json").read_text(encoding="utf-8"))[0]["stem"] == "Правка"
+
+    # A cache whose bank sources no longer match the tasks is not trusted: the task is reloaded
+    data = json.loads(cache_file.read_text(encoding="utf-8"))
+    bank_key = (root / "en" / "bank.v1.json").as_posix()
+    data["entries"][bank_key]["sources"]["A-1"] = "0" * 64
+    cache_file.write_text(json.dumps(data), encoding="utf-8")
+    loaded.clear()
+    _build(root, cache_file)
+    assert loaded == ["A-1.json"]
+    assert _snapshot(root)["en/bank.v1.json"] == reference["en/bank.v1.json"]
+
+
+def test_streaming_build_matches_the_in_memory_build(tmp_path):
+    # Ids that tie under locale collation (case only, or fully equal) and repeat across tasks
+    members = {
+        "A-1": {"a.json": _question("Q-a_1", "A-1"), "b.json": _question("Q-A_1", "A-1"),
+                "c.json": _question("Q-A_1", "A-1", stem="Second copy"), "d.json": _question("Q-ä_1", "A-1")},
+        "A-2": {"a.json": _question("Q-A_1", "A-2"), "b.json": _question("Q-a_1", "A-2", stem="Другой")},
+        "B-1": {"a.json": _question("Q-B_1", "B-1")},
+    }
+    content = tmp_path / "content"
+    for locale in ("en", "ru"):
+        for task_id, files in members.items():
+            (content / locale / task_id).mkdir(parents=True)
+            for name, question in files.items():
+                (content / locale / task_id / name).write_text(json.dumps(question), encoding="utf-8")
+
+    builds = {}
+    for streaming in (False, True):
+        root = tmp_path / f"streaming-{streaming}" / "questions"
+        for locale in ("en", "ru"):
+            (root / locale / "tasks").mkdir(parents=True)
+        _build(root, content_root=content, streaming=streaming)
+        builds[streaming] = _snapshot(root)
+
+    assert builds[True] == builds[False]
+    for locale in ("en", "ru"):
+        assert {f"{locale}/bank.v1.json", f"{locale}/index.json"} <= set(builds[True])
+    bank = json.loads(builds[True]["en/bank.v1.json"])
+    assert [(q["id"], q["taskId"], q["stem"]) for q in bank] == [
+        ("Q-A_1", "A-1", "Stem"),
+        ("Q-A_1", "A-1", "Second copy"),
+        ("Q-A_1", "A-2", "Stem"),
+        ("Q-B_1", "B-1", "Stem"),
+        ("Q-a_1", "A-1", "Stem"),
+        ("Q-a_1", "A-2", "Другой"),
+        ("Q-ä_1", "A-1", "Stem"),
+    ]
+
+
+def _stat_snapshot(root):
+    return {path: (path.stat().st_mtime_ns, path.read_bytes()) for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def _check(root, capsys):
+    before = _stat_snapshot(root)
+    try:
+        bank_generator.main(["--questions-root", str(root), "--check"])
+        status = 0
+    except SystemExit as exc:
+        status = exc.code
+    # --check never writes: not the artifacts and not the build cache
+    assert _stat_snapshot(root) == before
+    return status, capsys.readouterr().out
+
+
+def test_check_mode_passes_on_a_fresh_build_and_fails_on_stale_or_missing_artifacts(tmp_path, capsys):
+    root = _write_tree(tmp_path / "questions")
+    _build(root)
+    capsys.readouterr()
+
+    status, output = _check(root, capsys)
+    assert status == 0
+    assert "[INFO] Check passed: banks and indexes of 2 locale(s)" in output
+
+    _write_task(root, "en", "A-2", [_question("Q-A-2_a", "A-2", stem="Edited")])
+    status, output = _check(root, capsys)
+    assert status == 1
+    assert "[FAIL] questions/en/tasks/A-2.json: does not match" in output
+
+    _build(root)
+    (root / "ru" / "bank.v1.json").unlink()
+    status, output = _check(root, capsys)
+    assert status == 1
+    assert "[FAIL] questions/ru/bank.v1.json:" in output and "found missing" in output
+
+
+def test_check_mode_reports_an_unreadable_question_file(tmp_path, capsys):
+    content = tmp_path / "content"
+    source = content / "en" / "A-1" / "q1.json"
+    source.parent.mkdir(parents=True)
+    source.write_text(json.dumps(_question("Q-A-1_a", "A-1")), encoding="utf-8")
+    root = tmp_path / "questions"
+    (root / "en" / "tasks").mkdir(parents=True)
+    _build(root, content_root=content)
+    source.write_text("{", encoding="utf-8")
+    capsys.readouterr()
+
+    before = _stat_snapshot(root)
+    with pytest.raises(SystemExit) as exc:
+        bank_generator.main(["--questions-root", str(root), "--content-root", str(content), "--check"])
+    assert exc.value.code == 1
+    assert capsys.readouterr().out.startswith(f"[FAIL] Invalid JSON in {source}")
+    assert _stat_snapshot(root) == before
+
+
+def test_bank_delta_that_does_not_lead_to_the_current_bank_is_removed(tmp_path):
+    root = _write_tree(tmp_path / "questions")
+    delta_path = root / "en" / "bank.delta.v1.json"
+    _build(root, bank_delta=True)
+    assert not delta_path.exists()
+
+    _write_task(root, "en", "A-2", [_question("Q-A-2_a", "A-2", stem="Edited")])
+    _build(root, bank_delta=True)
+    bank_sha = bank_generator.sha256_of_file(root / "en" / "bank.v1.json")
+    assert json.loads(delta_path.read_text(encoding="utf-8"))["toBankSha256"] == bank_sha
+    # An unchanged rebuild keeps the delta that leads to the current bank
+    _build(root, bank_delta=True)
+    assert "questions/en/bank.delta.v1.json" in json.loads((root / "en" / "index.json").read_text(encoding="utf-8"))["files"]
+
+    # Without the previous manifest no fresh delta can be built; the old one must not survive
+    (root / "en" / "bank.manifest.v1.json").unlink()
+    _write_task(root, "en", "A-2", [_question("Q-A-2_a", "A-2", stem="Edited again")])
+    _build(root, bank_delta=True)
+    assert not delta_path.exists()
+    assert "questions/en/bank.delta.v1.json" not in json.loads((root / "en" / "index.json").read_text(encoding="utf-8"))["files"]
+
+
+def test_parallel_build_does_not_hand_freshly_aggregated_bundles_to_workers(tmp_path, monkeypatch):
+    content = tmp_path / "content"
+    for locale in ("en", "ru"):
+        for task_id in ("A-1", "A-2", "B-1"):
+            (content / locale / task_id).mkdir(parents=True)
+            (content / locale / task_id / "q.json").write_text(
+                json.dumps(_question(f"Q-{task_id}_a", task_id)), encoding="utf-8"
+            )
+    root = tmp_path / "questions"
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("bundles primed by aggregation must not be re-read in worker processes")
+
+    monkeypatch.setattr(bank_generator, "ProcessPoolExecutor", no_pool)
+    misses = bank_generator.default_loader.misses
+    _build(root, content_root=content, jobs=4)
+    # Only the question files were read; the bundles came from the loader cache
+    assert bank_generator.default_loader.misses - misses == 6
+    assert len(json.loads((root / "ru" / "bank.v1.json").read_text(encoding="utf-8"))) == 3
+
+
+def test_write_if_changed_reads_the_old_output_only_when_it_may_be_unchanged(tmp_path, monkeypatch):
+    path = tmp_path / "bank.v1.json"
+    path.write_bytes(b"[1, 2]")
+    hashed = []
+    real = bank_generator.sha256_of_file
+
+    def sha256_of_file(file):
+        hashed.append(file)
+        return real(file)
+
+    monkeypatch.setattr(bank_generator, "sha256_of_file", sha256_of_file)
+    cache = bank_generator.BuildCache(None)
+
+    # A different size settles it without reading the old file
+    assert bank_generator.write_if_changed(path, ["[1, 2, 3]"], cache)[1] is True
+    assert hashed == []
+    # Same size: the recorded sha decides, still without a read
+    assert bank_generator.write_if_changed(path, ["[1, 2, 3]"], cache)[1] is False
+    assert bank_generator.write_if_changed(path, ["[1, 2, 4]"], cache)[1] is True
+    assert hashed == []
+    # Same size and no cache entry: the old file is hashed once
+    assert bank_generator.write_if_changed(path, [b"[1, 2, 4]"], bank_generator.BuildCache(None))[1] is False
+    assert hashed == [path]
+    assert path.read_bytes() == b"[1, 2, 4]"
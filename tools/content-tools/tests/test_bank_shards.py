@@ -0,0 +1,85 @@
+import hashlib
+import json
+
+import pytest
+
+import generate_bank_and_index_from_assets as bank_generator
+from qw_bank_shards import ShardError, ShardSpec, ShardedBank, build_shard_table, encode_shard, plan_shards, shard_entry, shard_file
+
+
+def _bank(count=12):
+    return [
+        {"id": f"Q-{i:03d}", "taskId": f"A-{i % 3 + 1}", "stem": "Stem " * 20, "choices": [], "correctId": "A"}
+        for i in range(count)
+    ]
+
+
+def _write_shards(tmp_path, bank, spec, root_name="questions"):
+    locale_dir = tmp_path / root_name / "en"
+    (locale_dir / "shards").mkdir(parents=True)
+    shards = []
+    for name, questions in plan_shards(bank, spec):
+        data, raw_size = encode_shard(questions, spec.codec)
+        entry = shard_entry("en", name, questions, spec, hashlib.sha256(data).hexdigest(), len(data), raw_size)
+        shard_file(tmp_path / root_name, entry["path"]).write_bytes(data)
+        shards.append(entry)
+    index_path = locale_dir / "index.json"
+    index_path.write_text(json.dumps({"files": {}, "shards": build_shard_table("en", spec, "sha", shards)}), encoding="utf-8")
+    return index_path, shards
+
+
+def test_byte_budget_shards_are_read_one_at_a_time(tmp_path):
+    bank = _bank()
+    spec = ShardSpec("bytes", "gzip", max_bytes=400)
+    index_path, shards = _write_shards(tmp_path, bank, spec)
+
+    assert len(shards) > 2
+    assert all(shard["rawSize"] <= 400 for shard in shards)
+    assert [shard["firstId"] for shard in shards] == sorted(shard["firstId"] for shard in shards)
+    # Deterministic output: the same shard encodes to the same bytes
+    assert encode_shard(bank[:2], "gzip") == encode_shard(bank[:2], "gzip")
+
+    reader = ShardedBank(index_path)
+    assert len(reader) == len(bank)
+    assert reader.get("Q-011") == bank[11]
+    assert reader.get("Q-010") == bank[10]
+    assert reader.get("Q-999") is None
+    assert reader.loads == 1
+    assert list(reader.iter_questions()) == bank
+
+
+def test_task_shards_and_corruption(tmp_path):
+    bank = _bank(6)
+    index_path, shards = _write_shards(tmp_path, bank, ShardSpec("task", "gzip"))
+
+    assert [shard["taskIds"] for shard in shards] == [["A-1"], ["A-2"], ["A-3"]]
+    assert [shard["path"] for shard in shards][0] == "questions/en/shards/A-1.json.gz"
+    assert ShardedBank(index_path).get("Q-004") == bank[4]
+
+    shard_file(tmp_path / "questions", shards[0]["path"]).write_bytes(encode_shard(bank[:1], "gzip")[0])
+    with pytest.raises(ShardError, match="sha256"):
+        ShardedBank(index_path).get("Q-000")
+    index_path.write_text(json.dumps({"files": {}}), encoding="utf-8")
+    with pytest.raises(ShardError, match="no shard table"):
+        ShardedBank(index_path)
+
+
+def test_reader_and_generator_accept_a_questions_root_with_another_name(tmp_path):
+    bank = _bank(6)
+    index_path, shards = _write_shards(tmp_path, bank, ShardSpec("task", "gzip"), root_name="sh")
+    # Table paths stay asset paths; the files live under the root actually used
+    assert shards[0]["path"] == "questions/en/shards/A-1.json.gz"
+    assert (tmp_path / "sh" / "en" / "shards" / "A-1.json.gz").is_file()
+    assert ShardedBank(index_path).get("Q-004") == bank[4]
+
+    question = dict(bank[0], choices=[{"id": "A", "text": "Yes"}])
+    root = tmp_path / "assets-out"
+    for locale in ("en", "ru"):
+        (root / locale / "tasks").mkdir(parents=True)
+        (root / locale / "tasks" / "A-1.json").write_text(json.dumps([question]), encoding="utf-8")
+    cache_file = tmp_path / "cache.json"
+    for _ in range(2):
+        bank_generator.build_banks_and_indexes(
+            root, bank_generator.BuildCache(cache_file), shards=ShardSpec("task", "gzip")
+        )
+    assert ShardedBank(root / "ru" / "index.json").get("Q-000") == question
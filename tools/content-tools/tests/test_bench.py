@@ -0,0 +1,56 @@
+import json
+
+from qw_bench import measure, synthesize_assets, synthesize_content, synthesize_glossary
+from qw_bench_compare import compare
+
+
+def _write_question(root, locale, task_id, name, stem):
+    path = root / locale / task_id / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    question = {
+        "id": f"Q-{task_id}_{name}_1",
+        "taskId": task_id,
+        "stem": stem,
+        "choices": [{"id": "A", "text": "x"}],
+        "correctId": "A",
+    }
+    path.write_text(json.dumps(question, ensure_ascii=False), encoding="utf-8")
+
+
+def test_synthetic_tree_scales_and_runs_every_tool(tmp_path):
+    source = tmp_path / "source"
+    _write_question(source, "en", "A-1", "ladder", "Ladder use")
+    _write_question(source, "ru", "A-1", "ladder", "Как ставить ladder у стены")
+    base_glossary = tmp_path / "glossary.md"
+    base_glossary.write_text("| Англицизм | Термин |\n| --- | --- |\n| harness | привязь |\n", encoding="utf-8")
+
+    work = tmp_path / "work"
+    assert synthesize_content(source, work / "content", 3) == 6
+    assert synthesize_assets(work / "content", work / "assets") == 2
+    bundle = json.loads((work / "assets" / "ru" / "tasks" / "A-1.json").read_text(encoding="utf-8"))
+    assert len({question["id"] for question in bundle}) == 3
+
+    glossary = work / "glossary.md"
+    assert synthesize_glossary(base_glossary, work / "content", glossary, 4) == 4
+    assert "| ladder |" in glossary.read_text(encoding="utf-8")
+
+    assert measure("familyid", work, None, jobs=1)["files"] == 6
+    assert measure("ru_lint", work, glossary, jobs=1)["files"] == 3
+    assert measure("bank_warm", work, None, jobs=1)["files"] == 2
+    assert (work / "assets" / "ru" / "bank.v1.json").is_file()
+
+
+def test_compare_flags_only_regressions_over_thresholds():
+    baseline = {
+        "ru_lint/x1": {"seconds": 1.0, "peak_rss_kb": 1000},
+        "bank_warm/x1": {"seconds": 0.002, "peak_rss_kb": 1000},
+    }
+    current = {
+        "ru_lint/x1": {"seconds": 1.3, "peak_rss_kb": 1100},
+        "bank_warm/x1": {"seconds": 0.004, "peak_rss_kb": 1500},
+    }
+    _, regressions = compare(baseline, current, max_slowdown=0.15, max_rss_growth=0.2, min_delta_seconds=0.05)
+    assert [(item.name, item.metric) for item in regressions] == [
+        ("bank_warm/x1", "peak_rss_kb"),
+        ("ru_lint/x1", "seconds"),
+    ]
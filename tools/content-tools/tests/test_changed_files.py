@@ -0,0 +1,50 @@
+import subprocess
+
+from qw_changed_files import git_changed_paths, read_paths, select_question_files
+
+
+def test_select_question_files_filters_to_content_root(tmp_path):
+    content_root = tmp_path / "content" / "questions"
+    (content_root / "ru" / "A-1").mkdir(parents=True)
+    inside = content_root / "ru" / "A-1" / "q.json"
+    inside.write_text("{}", encoding="utf-8")
+    outside = tmp_path / "other.json"
+    outside.write_text("{}", encoding="utf-8")
+    (content_root / "notes.md").write_text("", encoding="utf-8")
+
+    selected = select_question_files(
+        content_root,
+        [inside, outside, content_root / "notes.md", content_root / "deleted.json", inside],
+        repo_root=tmp_path,
+    )
+    assert selected == [inside.resolve()]
+
+
+def test_read_paths_resolves_repo_relative_lists(tmp_path):
+    content_root = tmp_path / "content" / "questions"
+    content_root.mkdir(parents=True)
+    question = content_root / "q.json"
+    question.write_text("{}", encoding="utf-8")
+    listing = tmp_path / "changed.txt"
+    listing.write_text("content/questions/q.json\n\n", encoding="utf-8")
+
+    assert select_question_files(content_root, read_paths(str(listing)), repo_root=tmp_path) == [question.resolve()]
+
+
+def test_git_changed_paths_includes_modified_and_untracked(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "dev")
+    (tmp_path / "a.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "b.json").write_text("{}", encoding="utf-8")
+    git("add", ".")
+    git("commit", "-q", "-m", "init")
+
+    (tmp_path / "a.json").write_text('{"x": 1}', encoding="utf-8")
+    (tmp_path / "c.json").write_text("{}", encoding="utf-8")
+
+    changed = sorted(path.name for path in git_changed_paths("HEAD", repo_root=tmp_path))
+    assert changed == ["a.json", "c.json"]
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from qw_content_loader import ContentLoader, validate_task_questions
+from qw_ru_lint import load_glossary, lint_node
+
+
+def test_loader_reuses_document_until_file_changes(tmp_path):
+    path = tmp_path / "q.json"
+    path.write_text(json.dumps({"id": "Q-1"}), encoding="utf-8")
+    loader = ContentLoader()
+
+    first = loader.load(path)
+    assert loader.load(path) is first
+    assert first.data == {"id": "Q-1"}
+
+    path.write_text(json.dumps({"id": "Q-22"}), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = loader.load(path)
+    assert second is not first
+    assert second.data == {"id": "Q-22"}
+    assert (loader.hits, loader.misses) == (1, 2)
+
+
+def test_primed_document_is_served_without_reading(tmp_path):
+    path = tmp_path / "A-1.json"
+    raw = b'[{"id": "Q-1"}]'
+    path.write_bytes(raw)
+    loader = ContentLoader()
+    questions = [{"id": "Q-1"}]
+
+    loader.prime(path, raw, questions)
+    document = loader.load(path)
+    assert document.data is questions
+    assert (loader.hits, loader.misses) == (1, 0)
+
+
+def test_loader_evicts_least_recently_used(tmp_path):
+    loader = ContentLoader(max_entries=1)
+    a = tmp_path / "a.json"
+    b = tmp_path / "b.json"
+    a.write_text("{}", encoding="utf-8")
+    b.write_text("[]", encoding="utf-8")
+
+    doc_a = loader.load(a)
+    loader.load(b)
+    assert loader.load(a) is not doc_a
+
+
+def test_validate_task_questions_reports_bad_correct_id(tmp_path):
+    question = {
+        "id": "Q-A-1_x_1",
+        "taskId": "A-1",
+        "stem": "?",
+        "choices": [{"id": "A", "text": "a"}],
+        "correctId": "B",
+    }
+    with pytest.raises(ValueError, match="correctId='B'"):
+        validate_task_questions([question], tmp_path / "A-1.json", "A-1")
+    with pytest.raises(ValueError, match="taskId='A-1', expected 'A-2'"):
+        validate_task_questions([question], tmp_path / "A-2.json", "A-2")
+
+
+def test_lint_node_does_not_mutate_shared_document(tmp_path):
+    glossary_path = tmp_path / "glossary.md"
+    glossary_path.write_text("| ladder | лестница |", encoding="utf-8")
+    shared = {"stem": "a ladder", "choices": [{"text": "ladder"}, {"text": "rope"}]}
+    snapshot = json.loads(json.dumps(shared))
+
+    updated, records, changed = lint_node(shared, load_glossary(glossary_path))
+
+    assert changed and len(records) == 2
+    assert shared == snapshot
+    assert updated["choices"][0]["text"] == "лестница"
+    assert updated["choices"][1] is shared["choices"][1]
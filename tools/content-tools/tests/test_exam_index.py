@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from qw_exam_index import (
+    ExamProfileError,
+    build_exam_index,
+    failed_quotas,
+    load_exam_profile,
+    quota_report,
+)
+
+
+def _write_profile(tmp_path, **overrides):
+    blueprint = {
+        "id": "bp_test",
+        "questionCount": 3,
+        "blocks": [{"id": "A", "tasks": [{"id": "A-1", "quota": 2}, {"id": "A-2", "quota": 1}]}],
+    }
+    (tmp_path / "content" / "blueprints").mkdir(parents=True)
+    (tmp_path / "content" / "blueprints" / "bp_test.json").write_text(json.dumps(blueprint), encoding="utf-8")
+    profile = {"id": "exam_test", "blueprintId": "bp_test", "locales": ["en"], "mode": "min", "minMultiple": 1}
+    profile.update(overrides)
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(profile), encoding="utf-8")
+    return load_exam_profile(path, repo_root=tmp_path)
+
+
+def test_quota_report_follows_check_quotas_semantics(tmp_path):
+    profile = _write_profile(tmp_path)
+    assert profile.quotas == {"A-1": 2, "A-2": 1}
+    report = quota_report(profile, {"A-1": 5})
+    assert [(item.taskId, item.required, item.status) for item in report] == [("A-1", 2, "ok"), ("A-2", 1, "missing")]
+
+    strict = _write_profile(tmp_path / "strict", mode="exact", minMultiple=2)
+    assert [item.status for item in failed_quotas(quota_report(strict, {"A-1": 5, "A-2": 2}))] == ["excess"]
+
+    with pytest.raises(ExamProfileError):
+        _write_profile(tmp_path / "bad", mode="random")
+
+
+def test_build_exam_index_groups_ids(tmp_path):
+    profile = _write_profile(tmp_path)
+    questions = [
+        {"id": "Q-A-1_ladder_1", "taskId": "A-1", "difficulty": "easy"},
+        {"id": "Q-A-1_ladder_2", "taskId": "A-1", "difficulty": "hard"},
+        {"id": "Q-A-1_rope_3", "taskId": "A-1", "familyId": "rope", "difficulty": "easy"},
+        {"id": "Q-A-2_gfci_4", "taskId": "A-2"},
+    ]
+    index = build_exam_index(questions, profile, "en")
+
+    task = index["tasks"]["A-1"]
+    assert task["count"] == 3
+    assert task["familyCount"] == 2
+    assert task["byFamily"] == {"Q-A-1_ladder": ["Q-A-1_ladder_1", "Q-A-1_ladder_2"], "rope": ["Q-A-1_rope_3"]}
+    assert task["byDifficulty"]["easy"] == ["Q-A-1_ladder_1", "Q-A-1_rope_3"]
+    assert index["tasks"]["A-2"]["difficultyCounts"] == {"unknown": 1}
+    assert index["feasible"] is True
+    assert [item["families"] for item in index["quotas"]] == [2, 1]
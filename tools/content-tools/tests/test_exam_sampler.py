@@ -0,0 +1,77 @@
+import numpy as np
+
+from qw_exam_index import ExamProfile, build_exam_index
+from qw_exam_sampler import TaskPool, build_report, draw_task, simulate, task_pools
+
+
+def _profile(quotas):
+    return ExamProfile(
+        id="exam_test",
+        blueprint_id="bp_test",
+        blueprint_path=None,
+        locales=["en"],
+        mode="min",
+        min_multiple=1,
+        allow_extra=True,
+        question_count=sum(quotas.values()),
+        quotas=quotas,
+    )
+
+
+def _walk(families, quota, rng):
+    """Reference: ExamAssembler.selectByFamily over a uniformly shuffled pool."""
+    used, picked, skipped = set(), [], 0
+    for position in rng.permutation(len(families)):
+        if families[position] in used:
+            skipped += 1
+            continue
+        used.add(families[position])
+        picked.append(position)
+        if len(picked) == quota:
+            break
+    return picked, skipped
+
+
+def test_draw_task_matches_sequential_family_walk():
+    families = np.array([0, 0, 0, 1, 2, 2, 3, 4, 4, 4])
+    pool = TaskPool("A-1", 3, [f"q{i}" for i in range(len(families))], families)
+    exams = 40_000
+
+    picked, collisions = draw_task(pool, exams, np.random.default_rng(1))
+    assert picked.shape == (exams, 3)
+    assert all(len(set(families[row])) == 3 for row in picked[:2000])
+
+    rng = np.random.default_rng(2)
+    counts = np.zeros(len(families))
+    skipped = 0
+    for _ in range(exams):
+        chosen, skips = _walk(families, 3, rng)
+        counts[chosen] += 1
+        skipped += skips
+    vectorised = np.bincount(picked.ravel(), minlength=len(families)) / exams
+    assert np.abs(vectorised - counts / exams).max() < 0.015
+    assert abs(collisions.mean() - skipped / exams) < 0.03
+
+
+def test_simulate_reports_shortfalls_and_collisions():
+    questions = [
+        {"id": f"Q-A-1_item{i}_1", "taskId": "A-1"} for i in range(6)
+    ] + [
+        {"id": "Q-A-2_same_1", "taskId": "A-2"},
+        {"id": "Q-A-2_same_2", "taskId": "A-2"},
+        {"id": "Q-A-2_other_3", "taskId": "A-2"},
+    ]
+    profile = _profile({"A-1": 2, "A-2": 3, "B-5": 1})
+    pools = task_pools(build_exam_index(questions, profile, "en"), profile)
+
+    stats, exposure = simulate(pools, exams=5000, batch=1000, seed=7)
+    report = build_report("en", profile, pools, stats, exposure, 5000, 1.0, top=3)
+
+    tasks = {task["taskId"]: task for task in report["tasks"]}
+    assert tasks["A-1"]["shortfall"] == 0 and tasks["A-1"]["familyCollisionRate"] == 0
+    assert tasks["A-2"]["shortfall"] == 1 and tasks["A-2"]["meanFamilyCollisions"] == 1
+    assert tasks["B-5"]["shortfall"] == 1 and tasks["B-5"]["pool"] == 0
+    assert report["feasibleExams"] == 0
+    # One question per exam always comes from the single-member family
+    assert report["mostExposed"][0]["id"] == "Q-A-2_other_3"
+    assert sum(exposure[0]) == 2 * 5000
@@ -0,0 +1,99 @@
+import json
+import os
+
+from qw_explain_coverage import build_coverage_index, load_coverage_index, main as coverage_main, stamp_explanations
+
+
+def _write(path, payload, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def _question(root, locale, task, name, stem="Stem", mtime=1):
+    payload = {"id": f"Q-{name}", "taskId": task, "stem": stem, "choices": [{"id": "A", "text": "a"}], "correctId": "A"}
+    _write(root / locale / task / f"{name}.json", payload, mtime)
+
+
+def _explanation(root, locale, task, name, summary="Why", mtime=1):
+    payload = {"id": name, "locale": locale, "questionRef": {"taskId": task}, "summary": summary}
+    _write(root / locale / task / f"{name}__explain_{locale}.json", payload, mtime)
+
+
+def test_missing_orphaned_and_stale_explanations(tmp_path):
+    questions, explanations = tmp_path / "questions", tmp_path / "explanations"
+    for name in ("A-1_a", "A-1_b", "A-1_c"):
+        _question(questions, "en", "A-1", name)
+        _explanation(explanations, "en", "A-1", name)
+    _question(questions, "en", "A-1", "A-1_d")
+    _explanation(explanations, "en", "A-1", "A-1_gone")
+    _explanation(explanations, "en", "A-2", "A-1_c")
+
+    index = build_coverage_index(questions, explanations, ["en"])
+    found = {(issue.type, issue.id) for issue in index.issues()}
+    assert found == {("missing", "A-1_d"), ("orphaned", "A-1_gone"), ("orphaned", "A-1_c")}
+
+    # Only explanations of an existing question in the right task get the hash
+    stamped = stamp_explanations(index)
+    assert sorted(path.name for path in stamped) == [f"A-1_{name}__explain_en.json" for name in "abc"]
+    text = (explanations / "en" / "A-1" / "A-1_a__explain_en.json").read_text(encoding="utf-8")
+    assert list(json.loads(text)["questionRef"]) == ["taskId", "sha256"]
+    assert stamp_explanations(index) == []
+
+    # Editing a question makes its explanation stale until the explanation is rewritten
+    _question(questions, "en", "A-1", "A-1_a", stem="New stem", mtime=2)
+    _question(questions, "en", "A-1", "A-1_b", stem="New stem", mtime=2)
+    _explanation(explanations, "en", "A-1", "A-1_b", summary="Updated", mtime=2)
+    index = build_coverage_index(questions, explanations, ["en"], previous=index)
+    assert {(issue.type, issue.id) for issue in index.issues() if issue.type == "stale"} == {("stale", "A-1_a")}
+    assert index.reused == 6 and index.parsed == 3
+    assert index.task_summary(index.issues())["en"]["A-1"] == {"questions": 4, "missing": 1, "orphaned": 1, "stale": 1}
+
+    # The hash lives in the explanation itself, so a fresh checkout without the index sees the same
+    fresh = build_coverage_index(questions, explanations, ["en"])
+    assert {(issue.type, issue.id) for issue in fresh.issues() if issue.type == "stale"} == {("stale", "A-1_a")}
+
+
+def test_cli_reuses_index_and_fails_on_requested_types(tmp_path, capsys):
+    questions, explanations, out = tmp_path / "questions", tmp_path / "explanations", tmp_path / "coverage.json"
+    for locale in ("en", "ru"):
+        _question(questions, locale, "A-1", "A-1_a")
+        _question(questions, locale, "A-1", "A-1_b")
+        _explanation(explanations, locale, "A-1", "A-1_a")
+    args = ["--questions-root", str(questions), "--explanations-root", str(explanations), "--out", str(out)]
+
+    assert coverage_main(args + ["--jobs", "2"]) == 0
+    output = capsys.readouterr().out
+    assert "[explain-coverage:en] missing A-1_b (task: A-1)" in output
+    assert "[explain-coverage:ru] 1/2 questions explained (50.0%)" in output
+    # Nothing is stamped yet, so nothing could be judged stale: say so rather than report a clean run
+    assert "[explain-coverage:en] 1 explanation(s) without questionRef.sha256 are not checked" in output
+    assert "2 missing, 2 unstamped" in output
+    assert "Indexed 6 file(s) (0 unchanged)" in output
+
+    assert coverage_main(args + ["--fail-on", "missing"]) == 1
+    assert "Indexed 6 file(s) (6 unchanged)" in capsys.readouterr().out
+    assert load_coverage_index(out, questions, explanations) is not None
+    assert load_coverage_index(out, questions, tmp_path / "other") is None
+    assert coverage_main(args + ["--fail-on", "stale", "orphaned"]) == 0
+
+    # An EN explanation without its RU counterpart is an untranslated issue of ru
+    _explanation(explanations, "en", "A-1", "A-1_b")
+    assert coverage_main(args + ["--fail-on", "untranslated"]) == 1
+    output = capsys.readouterr().out
+    assert "[explain-coverage:ru] untranslated A-1_b (task: A-1) EN explanation has no RU translation" in output
+    assert "[explain-coverage:ru] 1/2 EN explanations have RU translations (50.0%)" in output
+    _explanation(explanations, "ru", "A-1", "A-1_b")
+    assert coverage_main(args + ["--fail-on", "untranslated"]) == 0
+    assert "2/2 EN explanations have RU translations (100.0%)" in capsys.readouterr().out
+
+    _question(questions, "ru", "A-1", "A-1_a", stem="Новая формулировка", mtime=2)
+    assert coverage_main(args + ["--fail-on", "stale"]) == 0
+    capsys.readouterr()
+    assert coverage_main(args + ["--stamp"]) == 0
+    output = capsys.readouterr().out
+    assert "stamped questionRef.sha256" in output
+    assert "unstamped" not in output
+    _question(questions, "ru", "A-1", "A-1_a", stem="Ещё одна", mtime=3)
+    assert coverage_main(args + ["--fail-on", "stale"]) == 1
+    assert "[explain-coverage:ru] stale A-1_a (task: A-1)" in capsys.readouterr().out
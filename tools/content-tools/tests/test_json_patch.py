@@ -0,0 +1,112 @@
+import difflib
+import json
+
+import pytest
+
+from qw_json_patch import JsonPatcher, JsonPatchError, atomic_write_text, changed_values
+
+SOURCE = """{
+  "id": "Q-A-1_sample_1",
+  "stem":   "Old stem",
+  "choices": [{"id": "A", "text": "Old"}, {"id": "B", "text": "Keep"}],
+  "rationales": {
+    "A": "Old"
+  }
+}
+"""
+
+
+def test_patcher_splices_only_changed_values():
+    patcher = JsonPatcher(SOURCE)
+    patcher.replace_value(("stem",), "Новый \"stem\"")
+    patcher.replace_value(("choices", 0, "text"), "New")
+    new_text = patcher.apply()
+
+    expected = SOURCE.replace('"Old stem"', '"Новый \\"stem\\""').replace('"text": "Old"', '"text": "New"')
+    assert new_text == expected
+    assert json.loads(new_text)["stem"] == 'Новый "stem"'
+
+
+def test_insert_member_follows_existing_layout():
+    patcher = JsonPatcher(SOURCE)
+    patcher.insert_member((), "familyId", "Q-A-1_sample")
+    patcher.insert_member(("rationales",), "B", "Also")
+    new_text = patcher.apply()
+
+    assert new_text.endswith('    "A": "Old",\n    "B": "Also"\n  },\n  "familyId": "Q-A-1_sample"\n}\n')
+    assert json.loads(new_text)["familyId"] == "Q-A-1_sample"
+
+
+@pytest.mark.parametrize(
+    "edits",
+    [
+        [(("stem",), "x")],
+        [(("id",), "a\nb"), (("rationales", "A"), "y")],
+        [(("choices", 1, "id"), "C"), (("choices", 0, "text"), "z")],
+    ],
+)
+def test_unified_diff_matches_difflib(edits):
+    patcher = JsonPatcher(SOURCE)
+    for path, value in edits:
+        patcher.replace_value(path, value)
+    patcher.insert_member((), "familyId", "f", after="id")
+    new_text = patcher.apply()
+
+    expected = "".join(
+        difflib.unified_diff(SOURCE.splitlines(True), new_text.splitlines(True), fromfile="q.json", tofile="q.json", n=1)
+    )
+    assert patcher.unified_diff("q.json", "q.json", n=1) == expected
+
+
+REPEATED = """{
+  "tags": [
+    "weld",
+    "weld",
+    "cut",
+    "weld"
+  ],
+  "stem": "weld"
+}
+"""
+
+
+@pytest.mark.parametrize(
+    "edits",
+    [
+        [(("tags", 1), "cut")],
+        [(("tags", 0), "cut"), (("tags", 3), "grind")],
+        [(("tags", 2), "weld")],
+        [(("tags", 1), "weld")],
+    ],
+)
+def test_unified_diff_matches_difflib_with_repeated_lines(edits):
+    patcher = JsonPatcher(REPEATED)
+    for path, value in edits:
+        patcher.replace_value(path, value)
+    new_text = patcher.apply()
+
+    expected = "".join(
+        difflib.unified_diff(REPEATED.splitlines(True), new_text.splitlines(True), fromfile="q.json", tofile="q.json", n=1)
+    )
+    assert patcher.unified_diff("q.json", "q.json", n=1) == expected
+
+
+def test_changed_values_skips_shared_subtrees():
+    old = {"a": {"b": "x"}, "c": ["y", "z"]}
+    new = dict(old, c=["y", "w"])
+    assert list(changed_values(old, new)) == [(("c", 1), "w")]
+
+
+def test_patcher_rejects_overlapping_edits_and_bad_json(tmp_path):
+    patcher = JsonPatcher(SOURCE)
+    patcher.replace_value(("rationales",), {})
+    patcher.replace_value(("rationales", "A"), "y")
+    with pytest.raises(JsonPatchError):
+        patcher.apply()
+    with pytest.raises(JsonPatchError):
+        JsonPatcher('{"a": 1,}')
+
+    target = tmp_path / "q.json"
+    atomic_write_text(target, SOURCE)
+    assert target.read_text(encoding="utf-8") == SOURCE
+    assert [p.name for p in tmp_path.iterdir()] == ["q.json"]
@@ -0,0 +1,59 @@
+import json
+
+from qw_near_dupes import (
+    SignatureCache,
+    collect_documents,
+    compare_shingles,
+    find_near_duplicates,
+    shingles,
+    tokens_of,
+)
+
+
+def _question(stem, rationale="Keep the work area clear of combustibles before any hot work starts."):
+    return {
+        "id": "Q",
+        "stem": stem,
+        "choices": [{"id": "A", "text": "Yes"}],
+        "rationales": {"A": rationale},
+    }
+
+
+def test_tokens_and_overlap_follow_check_plagiarism():
+    assert tokens_of("Ёлка_и GMAW-3!  «тест»") == ["ёлка", "и", "gmaw", "3", "тест"]
+    left = shingles("question", _question("one two three four five six"))
+    right = shingles("question", _question("one two three four five seven eight nine"))
+    assert "one two three four five" in left
+    overlap, basis, similarity = compare_shingles(left, right)
+    assert basis == min(len(left), len(right))
+    assert similarity == overlap / basis
+
+
+def test_find_near_duplicates_confirms_candidates_and_caches_signatures(tmp_path):
+    stem = "Which gas cylinder storage practice keeps cylinders upright and chained away from heat sources?"
+    files = {
+        "questions/en/A-1/a.json": _question(stem),
+        "questions/en/A-1/b.json": _question(stem.replace("Which", "What")),
+        "questions/en/A-1/c.json": _question("Completely different text about grinding wheels and ring tests", "No."),
+        "questions/ru/A-1/a.json": _question(stem),
+    }
+    for relative, payload in files.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload), encoding="utf-8")
+
+    documents = collect_documents(tmp_path)
+    cache_path = tmp_path / "cache.json"
+    cache = SignatureCache(cache_path)
+    matches, stats = find_near_duplicates(documents, threshold=0.7, lsh_threshold=0.3, cache=cache)
+    cache.save(document.file for document in documents)
+
+    assert [(match.a.file.split("/")[-1], match.b.file.split("/")[-1], match.a.locale) for match in matches] == [
+        ("a.json", "b.json", "en")
+    ]
+    assert matches[0].similarity >= 0.7
+
+    cache = SignatureCache(cache_path)
+    again, stats = find_near_duplicates(documents, threshold=0.7, lsh_threshold=0.3, cache=cache)
+    assert stats["signaturesReused"] == len(documents)
+    assert [(match.overlap, match.basis) for match in again] == [(matches[0].overlap, matches[0].basis)]
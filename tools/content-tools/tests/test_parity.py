@@ -0,0 +1,60 @@
+import json
+
+from qw_parity import build_parity_index, load_parity_index
+
+
+def _write(root, relative, question_id, correct="A", choices=("A", "B"), task="A-1", family="fam"):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "id": question_id,
+        "taskId": task,
+        "correctId": correct,
+        "choices": [{"id": choice, "text": choice} for choice in choices],
+    }
+    if family:
+        payload["familyId"] = family
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def test_parity_issues_cover_missing_mismatched_and_duplicate_ids(tmp_path):
+    root = tmp_path / "questions"
+    _write(root, "en/A-1/q1__en.json", "Q1")
+    _write(root, "ru/A-1/q1__ru.json", "Q1")
+    _write(root, "en/A-1/q2__en.json", "Q2", correct="A")
+    _write(root, "ru/A-1/q2__ru.json", "Q2", correct="B", choices=("A", "B", "C"))
+    _write(root, "en/A-1/q3__en.json", "Q3", family=None)
+    _write(root, "ru/A-1/q4__ru.json", "Q4")
+    _write(root, "ru/A-1/q4_copy__ru.json", "Q4")
+
+    index = build_parity_index(root)
+    found = {(issue.type, issue.id, issue.locale) for issue in index.issues()}
+
+    assert found == {
+        ("correct-id-mismatch", "Q2", "ru"),
+        ("choice-ids-mismatch", "Q2", "ru"),
+        ("missing-family-id", "Q3", "en"),
+        ("missing", "Q3", "ru"),
+        ("missing", "Q4", "en"),
+        ("duplicate-id", "Q4", "ru"),
+    }
+    assert index.task_counts() == {"A-1": {"en": 3, "ru": 4}}
+
+
+def test_saved_index_is_reused_for_unchanged_files(tmp_path):
+    root = tmp_path / "questions"
+    _write(root, "en/A-1/q1__en.json", "Q1")
+    _write(root, "ru/A-1/q1__ru.json", "Q1")
+    artifact = tmp_path / "parity-index.json"
+    build_parity_index(root).save(artifact)
+
+    _write(root, "ru/A-1/q1__ru.json", "Q1", correct="BB")
+    previous = load_parity_index(artifact, root)
+    assert previous is not None
+    assert [path.name for path in previous.files("ru")] == ["q1__ru.json"]
+
+    index = build_parity_index(root, previous=previous)
+    assert (index.reused, index.parsed) == (1, 1)
+    assert [issue.type for issue in index.issues()] == ["correct-id-mismatch"]
+    assert load_parity_index(artifact, tmp_path / "elsewhere") is None
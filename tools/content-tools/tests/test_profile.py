@@ -0,0 +1,44 @@
+import json
+
+from qw_profile import Profiler, profiler, profiling, stage
+
+
+def test_disabled_profiler_records_nothing():
+    local = Profiler()
+    with local.stage("parse"):
+        local.count("files")
+    assert local.events == [] and local.totals == {} and not local.counters
+
+    local.enable()
+    for _ in range(3):
+        with local.stage("parse", trace=False):
+            local.count("files")
+    with local.stage("write", path="bank.v1.json"):
+        pass
+    summary = local.summary()
+    assert summary["stages"]["parse"]["count"] == 3
+    assert summary["counters"] == {"files": 3}
+    assert [event["name"] for event in local.events] == ["write"]
+    assert local.events[0]["args"] == {"path": "bank.v1.json"}
+
+
+def test_profiling_writes_jsonl_chrome_trace_and_cprofile(tmp_path):
+    jsonl = tmp_path / "profile.jsonl"
+    with profiling(jsonl, cprofile_out=tmp_path / "run.pstats"):
+        with stage("discover"):
+            # A nested profiled run neither resets nor writes the outer profile
+            with profiling(tmp_path / "nested.jsonl"):
+                pass
+    assert not profiler.enabled
+    assert not (tmp_path / "nested.jsonl").exists()
+    assert (tmp_path / "run.pstats").stat().st_size > 0
+    lines = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert [line.get("name") for line in lines] == ["discover", "run", None]
+    assert lines[-1]["type"] == "summary"
+
+    chrome = tmp_path / "trace.json"
+    with profiling(chrome):
+        with stage("write"):
+            pass
+    events = json.loads(chrome.read_text(encoding="utf-8"))["traceEvents"]
+    assert {"write", "run"} <= {event["name"] for event in events if event["ph"] == "X"}
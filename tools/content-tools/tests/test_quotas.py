@@ -0,0 +1,69 @@
+import dataclasses
+import json
+
+from qw_exam_index import load_exam_profile, quota_report
+from qw_quotas import evaluate_quotas, main as quotas_main, profile_with_blueprint, scan_question_table
+
+
+def _setup(tmp_path):
+    blueprints = tmp_path / "content" / "blueprints"
+    blueprints.mkdir(parents=True)
+    for name, tasks in (("bp_main", {"A-1": 2, "A-2": 1}), ("bp_alt", {"A-1": 1, "A-3": 2})):
+        blueprint = {"id": name, "blocks": [{"id": "A", "tasks": [{"id": t, "quota": q} for t, q in tasks.items()]}]}
+        (blueprints / f"{name}.json").write_text(json.dumps(blueprint), encoding="utf-8")
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps({"id": "exam", "blueprint": str(blueprints / "bp_main.json"), "locales": ["en", "ru"]}), encoding="utf-8")
+
+    content = tmp_path / "questions"
+    for locale, task, count in (("en", "A-1", 3), ("en", "A-2", 1), ("ru", "A-1", 2), ("en", "A-3", 1)):
+        (content / locale / task).mkdir(parents=True)
+        for i in range(count):
+            (content / locale / task / f"q{i}__{locale}.json").write_text("{}", encoding="utf-8")
+    (content / "en" / "A-1" / "notes.txt").write_text("", encoding="utf-8")
+    return profile_path, content
+
+
+def test_matrix_matches_quota_report_for_every_scenario(tmp_path):
+    profile_path, content = _setup(tmp_path)
+    profile = load_exam_profile(profile_path, repo_root=tmp_path)
+    table = scan_question_table(content, ["en", "ru"])
+    assert len(table.ids) == 7
+
+    scenarios = [dataclasses.replace(profile, min_multiple=m) for m in (1, 2, 3)]
+    scenarios.append(dataclasses.replace(profile_with_blueprint(profile, "bp_alt", tmp_path), mode="exact"))
+    matrix = evaluate_quotas(table, scenarios, ["en", "ru", "fr"])
+
+    assert matrix.task_ids == ["A-1", "A-2", "A-3"]
+    for number, scenario in enumerate(scenarios):
+        for row, locale in enumerate(matrix.locales):
+            counts = dict(zip(matrix.task_ids, matrix.available[row].tolist()))
+            assert matrix.report(number, locale) == quota_report(scenario, counts)
+    assert matrix.shortfall()[1, 0].tolist() == [1, 1, 0]
+    assert matrix.failures()[:, 0].tolist() == [0, 2, 2, 2]
+    assert [item.status for item in matrix.report(3, "en")] == ["excess", "missing"]
+
+
+def test_cli_checks_changed_tasks_and_plans(tmp_path, capsys):
+    profile_path, content = _setup(tmp_path)
+    args = ["--content-root", str(content), "--profile", str(profile_path), "--log-dir", str(tmp_path / "logs")]
+    changed = tmp_path / "changed.txt"
+
+    assert quotas_main(args) == 1
+    output = capsys.readouterr().out
+    assert quotas_main(args + ["--warn-only"]) == 0
+    assert "quota mismatches detected (--warn-only" in capsys.readouterr().out
+    assert "[quota:en] A-1 expected=2 got=3 status=ok" in output
+    assert "[quota:ru] A-2 expected=1 got=0 status=missing" in output
+    assert "[quota:en] A-2 expected=1 got=1 status=ok" in (tmp_path / "logs" / "quotas_en.txt").read_text()
+
+    changed.write_text(f"{content}/en/A-1/q0__en.json\n", encoding="utf-8")
+    assert quotas_main(args + ["--changed-only", "--paths-from", str(changed)]) == 0
+    assert quotas_main(args + ["--changed-only", "--paths-from", str(changed), "--no-allow-extra"]) == 1
+    changed.write_text(f"{content}/en/A-3/q0__en.json\n", encoding="utf-8")
+    assert quotas_main(args + ["--changed-only", "--paths-from", str(changed)]) == 0
+    assert "no changed question tasks; skip" in capsys.readouterr().out
+
+    assert quotas_main(args + ["--plan-min-multiple", "1", "2", "--plan-blueprint", str(tmp_path / "content/blueprints/bp_alt.json")]) == 0
+    output = capsys.readouterr().out
+    assert "[quotas:plan] bp_main x2 en: 2/2 task(s) not ok, 2 question(s) to write (A-1:+1 A-2:+1)" in output
+    assert "[quotas:plan] bp_alt x1 ru: 1/2 task(s) not ok, 2 question(s) to write (A-3:+2)" in output
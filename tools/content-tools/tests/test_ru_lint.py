@@ -1,10 +1,14 @@
 import json
 import re
 
+import qw_ru_lint
 from qw_ru_lint import (
+    Glossary,
     GlossaryEntry,
+    LintCache,
     apply_glossary,
     lint_file,
+    lint_paths,
     load_glossary,
     match_case,
 )
@@ -23,6 +27,59 @@ def test_apply_glossary_records_replacements():
     assert records[0].path == "stem"
 
 
+def test_load_glossary_matches_all_terms_in_one_pass(tmp_path):
+    glossary_path = tmp_path / "glossary.md"
+    glossary_path.write_text(
+        "| Англицизм | Предпочтительный термин |\n| --- | --- |\n"
+        "| tag | бирка |\n| tag line | направляющий канат |\n| ladder | лестница |",
+        encoding="utf-8",
+    )
+    glossary = load_glossary(glossary_path)
+    assert isinstance(glossary, Glossary)
+    assert [entry.source for entry in glossary] == ["tag", "tag line", "ladder"]
+
+    updated, records = apply_glossary("Ladder, TAG LINE and tag; ladders stay", glossary, "stem")
+
+    assert updated == "Лестница, НАПРАВЛЯЮЩИЙ КАНАТ and бирка; ladders stay"
+    # Records keep glossary order; longest term wins over its prefix
+    assert [(r.source_text, r.glossary_source) for r in records] == [
+        ("tag", "tag"),
+        ("TAG LINE", "tag line"),
+        ("Ladder", "ladder"),
+    ]
+
+
+def test_glossary_trie_ignores_case_of_overlapping_sources(tmp_path):
+    glossary_path = tmp_path / "glossary.md"
+    glossary_path.write_text(
+        "| Англицизм | Предпочтительный термин |\n| --- | --- |\n"
+        "| Tag | бирка |\n| tag line | направляющий канат |\n| Straße | улица |",
+        encoding="utf-8",
+    )
+    glossary = load_glossary(glossary_path)
+
+    updated, records = apply_glossary("A tag line, a TAG, a Tag Line and a STRASSE straße", glossary, "stem")
+
+    # The longest term wins whatever the case of the glossary source and of the text
+    assert updated == "A направляющий канат, a БИРКА, a Направляющий Канат and a STRASSE улица"
+    assert [(r.source_text, r.glossary_source) for r in records] == [
+        ("TAG", "Tag"),
+        ("tag line", "tag line"),
+        ("Tag Line", "tag line"),
+        ("straße", "Straße"),
+    ]
+
+
+def test_apply_glossary_does_not_rescan_replacements():
+    entries = [
+        GlossaryEntry(source="rig", replacement="ladder", pattern=re.compile(r"\brig\b", re.IGNORECASE)),
+        GlossaryEntry(source="ladder", replacement="лестница", pattern=re.compile(r"\bladder\b", re.IGNORECASE)),
+    ]
+    updated, records = apply_glossary("rig", entries, "stem")
+    assert updated == "ladder"
+    assert len(records) == 1
+
+
 def test_lint_file_creates_diff_without_writing(tmp_path):
     glossary_path = tmp_path / "glossary.md"
     glossary_path.write_text(
@@ -45,3 +102,30 @@ def test_lint_file_creates_diff_without_writing(tmp_path):
     assert "familyId" not in diff_text
     assert question_path.read_text(encoding="utf-8").count("лестница") == 0
     assert records
+
+
+def test_lint_paths_reuses_cached_results(tmp_path, monkeypatch):
+    glossary_path = tmp_path / "glossary.md"
+    glossary_path.write_text("| ladder | лестница |", encoding="utf-8")
+    entries = load_glossary(glossary_path)
+    dirty = tmp_path / "dirty.json"
+    dirty.write_text(json.dumps({"stem": "a ladder"}), encoding="utf-8")
+    clean = tmp_path / "clean.json"
+    clean.write_text(json.dumps({"stem": "a rope"}), encoding="utf-8")
+    cache_path = tmp_path / "cache.json"
+
+    cache = LintCache(cache_path, "glossary-v1")
+    first = lint_paths([dirty, clean], entries, apply=False, report_dir=None, cache=cache)
+    cache.save()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("cached file was linted again")
+
+    monkeypatch.setattr(qw_ru_lint, "lint_file", _fail)
+    second = lint_paths([dirty, clean], entries, apply=False, report_dir=None, cache=LintCache(cache_path, "glossary-v1"))
+    assert second == first
+    assert [result.changed for result in second] == [True, False]
+
+    # A different glossary digest invalidates every entry
+    with_new_glossary = LintCache(cache_path, "glossary-v2")
+    assert with_new_glossary.get(dirty, qw_ru_lint.sha256_of_bytes(dirty.read_bytes())) is None
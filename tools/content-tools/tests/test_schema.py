@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+import generate_bank_and_index_from_assets as bank_generator
+from qw_bank_shards import ShardSpec
+from qw_schema import CompiledSchema, SchemaError
+from qw_validate import main as validate_main
+
+
+def _question(**overrides):
+    question = {
+        "id": "Q-A-1_x",
+        "taskId": "A-1",
+        "stem": "Stem",
+        "choices": [{"id": f"CHOICE-{i}", "text": str(i)} for i in range(1, 5)],
+        "correctId": "CHOICE-1",
+    }
+    question.update(overrides)
+    return question
+
+
+def test_compiled_schema_collects_every_error():
+    schema = CompiledSchema(
+        {
+            "$defs": {"choiceId": {"type": "string", "pattern": "^CHOICE-\\d+$"}},
+            "type": "object",
+            "required": ["id", "choices"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"oneOf": [{"type": "string"}, {"type": "integer", "minimum": 1}]},
+                "correctId": {"$ref": "#/$defs/choiceId"},
+                "choices": {"type": "array", "uniqueItems": True, "items": {"$ref": "#/$defs/choiceId"}},
+                "meta": {"patternProperties": {"^x-": {"const": {"$data": "2/id"}}}},
+            },
+        }
+    )
+
+    assert schema.validate({"id": 1, "choices": ["CHOICE-1"], "meta": {"x-a": 1, "other": 2}}) == []
+    found = {
+        (issue.path, issue.keyword)
+        for issue in schema.validate(
+            {"id": 0, "choices": ["CHOICE-1", "CHOICE-1", "choice-3"], "correctId": 5, "meta": {"x-a": 2}, "extra": True}
+        )
+    }
+    assert found == {
+        ("/id", "type"),
+        ("/id", "minimum"),
+        ("/id", "oneOf"),
+        ("/choices", "uniqueItems"),
+        ("/choices/2", "pattern"),
+        ("/correctId", "type"),
+        ("/meta/x-a", "const"),
+        ("", "additionalProperties"),
+    }
+    # 1.0 is an integer and equal to 1 in JSON
+    assert ("/choices", "uniqueItems") in {(i.path, i.keyword) for i in schema.validate({"id": 1.0, "choices": [1, 1.0]})}
+    with pytest.raises(SchemaError, match="unsupported keyword"):
+        CompiledSchema({"dependentSchemas": {}})
+
+
+def test_validate_cli_reports_all_files_in_one_pass(tmp_path, capsys):
+    questions = tmp_path / "questions"
+    (questions / "en" / "A-1").mkdir(parents=True)
+    (questions / "en" / "A-1" / "ok.json").write_text(json.dumps(_question()), encoding="utf-8")
+    (questions / "en" / "A-1" / "bad.json").write_text(
+        json.dumps(_question(id="bad", correctId="CHOICE-9", difficulty="trivial")), encoding="utf-8"
+    )
+    (questions / "en" / "A-1" / "broken.json").write_text("{", encoding="utf-8")
+    args = ["--content-root", str(questions), "--explanations-root", str(tmp_path / "none"), "--kinds", "questions"]
+
+    assert validate_main(args) == 1
+    output = capsys.readouterr().out
+    assert "bad.json:/id: must match pattern" in output
+    assert "bad.json:/difficulty: must be one of" in output
+    assert "bad.json:/correctId: has correctId='CHOICE-9'" in output
+    assert "broken.json:/: Invalid JSON" in output
+    assert "Validated 3 file(s) against 1 schema(s): 4 error(s)." in output
+
+    (questions / "en" / "A-1" / "bad.json").unlink()
+    (questions / "en" / "A-1" / "broken.json").unlink()
+    assert validate_main(args) == 0
+
+
+def test_generated_indexes_match_the_index_schema(tmp_path, capsys):
+    questions = tmp_path / "questions"
+    for locale in ("en", "ru"):
+        (questions / locale / "tasks").mkdir(parents=True)
+        (questions / locale / "tasks" / "A-1.json").write_text(json.dumps([_question()]), encoding="utf-8")
+    bank_generator.build_banks_and_indexes(
+        questions, bank_generator.BuildCache(None), shards=ShardSpec()
+    )
+    args = ["--questions-root", str(questions), "--kinds", "indexes"]
+
+    assert validate_main(args) == 0
+    assert "Validated 3 file(s) against 1 schema(s): 0 error(s)." in capsys.readouterr().out
+
+    index_path = questions / "en" / "index.json"
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    index["files"]["questions/en/bank.v1.json"] = "not-a-sha"
+    index_path.write_text(json.dumps(index), encoding="utf-8")
+    assert validate_main(args) == 1
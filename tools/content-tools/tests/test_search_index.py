@@ -0,0 +1,78 @@
+from qw_search_index import SearchIndex, build_search_index, decode_postings, encode_postings, tokenize
+
+
+def _question(question_id, task_id, stem, choices=("Yes", "No"), rationale="Because"):
+    return {
+        "id": question_id,
+        "taskId": task_id,
+        "stem": stem,
+        "choices": [{"id": f"CHOICE-{i}", "text": text} for i, text in enumerate(choices, start=1)],
+        "correctId": "CHOICE-1",
+        "rationales": {"CHOICE-1": rationale},
+    }
+
+
+BANK = [
+    _question("Q-1", "A-1", "The welder's cable drops voltage", choices=("Thin cable", "Thick cable")),
+    _question("Q-2", "A-1", "Voltage of 1,000 V on a long cable"),
+    _question("Q-3", "A-2", "Which cable is thin?", choices=("Cable", "Thin wire")),
+]
+
+
+def test_tokenizer_and_queries():
+    assert tokenize("The welder's CABLE don't", "en") == ["the", "welder", "cable", "dont"]
+    assert tokenize("Ёмкость 0,035\" и 1.5 мм", "ru") == ["емкость", "0.035", "и", "1.5", "мм"]
+    assert tokenize("1,000 V", "en") == ["1000", "v"]
+    postings = {0: {0: [1, 4, 9]}, 3: {1: [0], 2: [2, 3]}}
+    assert decode_postings(encode_postings(postings)) == postings
+
+    index = SearchIndex(build_search_index(BANK, "en", {"A-1": "a", "A-2": "b"})[0])
+    assert index.search("cable") == ["Q-1", "Q-2", "Q-3"]
+    assert index.search("volt*") == ["Q-1", "Q-2"]
+    assert index.search("volt* 1,000") == ["Q-2"]
+    assert index.search('"thin cable"') == ["Q-1"]
+    # Choices are separate values: "cable thin" does not run across "Cable" / "Thin wire"
+    assert index.search('"cable thin"') == []
+    assert index.search("thin", fields=["stem"]) == ["Q-3"]
+    assert index.search("welder") == ["Q-1"]
+    assert index.search("missing cable") == []
+
+
+def test_incremental_update_matches_full_build():
+    index, tokenized = build_search_index(BANK, "en", {"A-1": "a", "A-2": "b"})
+    assert tokenized == 3
+
+    changed = BANK[:2] + [_question("Q-4", "A-2", "Arc length"), _question("Q-5", "A-3", "Cable reel")]
+    updated, tokenized = build_search_index(changed, "en", {"A-1": "a", "A-2": "c", "A-3": "d"}, previous=index)
+    assert tokenized == 2
+    assert updated == build_search_index(changed, "en", {"A-1": "a", "A-2": "c", "A-3": "d"})[0]
+    assert SearchIndex(updated).search("cable") == ["Q-1", "Q-2", "Q-5"]
+    # Another locale's index is never reused
+    assert build_search_index(changed, "ru", {"A-1": "a", "A-2": "c", "A-3": "d"}, previous=index)[1] == 4
+
+
+def test_repeated_ids_are_indexed_once_per_question():
+    bank = [
+        _question("Q-1", "A-1", "alpha"),
+        _question("Q-1", "A-1", "beta"),
+        _question("Q-1", "A-2", "gamma beta"),
+        _question("Q-2", "A-2", "delta"),
+    ]
+    shas = {"A-1": "a", "A-2": "b"}
+    index, tokenized = build_search_index(bank, "en", shas)
+    assert tokenized == 4 and index["ids"] == ["Q-1", "Q-1", "Q-1", "Q-2"]
+    search = SearchIndex(index)
+    assert search.search("alpha") == ["Q-1"]
+    assert search.search("beta") == ["Q-1", "Q-1"]
+    assert search.search("gamma") == ["Q-1"]
+
+    # Reused postings keep every occurrence of the unchanged task's repeated id
+    changed = bank[:3] + [_question("Q-2", "A-2", "epsilon")]
+    updated, tokenized = build_search_index(changed, "en", {"A-1": "a", "A-2": "c"}, previous=index)
+    assert tokenized == 2
+    assert updated == build_search_index(changed, "en", {"A-1": "a", "A-2": "c"})[0]
+    assert SearchIndex(updated).search("beta") == ["Q-1", "Q-1"]
+
+    # An index from before repeated ids were kept is rebuilt, not reused
+    legacy = dict(index, version=None)
+    assert build_search_index(bank, "en", shas, previous=legacy)[1] == 4
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+
+import pytest
+
+import qw_content_pipeline
+from qw_content_pipeline import WatchSession, bank_generator, build_parser
+from qw_watch import InotifyWatcher, PollingWatcher, wait_for_changes
+
+
+@pytest.mark.parametrize("kind", ["polling", "inotify"])
+def test_watchers_report_saved_new_and_deleted_question_files(tmp_path, kind):
+    if kind == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux-only")
+    existing = tmp_path / "en" / "A-1" / "q1.json"
+    existing.parent.mkdir(parents=True)
+    existing.write_text("{}", encoding="utf-8")
+    watcher = PollingWatcher(tmp_path, interval=0.01) if kind == "polling" else InotifyWatcher(tmp_path)
+    try:
+        existing.write_text('{"id": "Q1"}', encoding="utf-8")
+        (tmp_path / "en" / "A-1" / ".q1.json.tmp").write_text("{}", encoding="utf-8")
+        assert wait_for_changes(watcher, debounce=0.05, timeout=2) == {existing}
+
+        added = tmp_path / "en" / "B-2" / "q2.json"
+        added.parent.mkdir()
+        added.write_text("{}", encoding="utf-8")
+        existing.unlink()
+        assert wait_for_changes(watcher, debounce=0.05, timeout=2) == {added, existing}
+
+        assert wait_for_changes(watcher, debounce=0.01, timeout=0.05) == set()
+    finally:
+        watcher.close()
+
+
+def _question(stem="How is a lug attached?"):
+    question = {
+        "id": "Q-A-1_lug_1",
+        "taskId": "A-1",
+        "difficulty": "medium",
+        "stem": stem,
+        "choices": [{"id": f"CHOICE-{i}", "text": f"Option {i}"} for i in range(1, 5)],
+        "correctId": "CHOICE-2",
+    }
+    if stem is None:
+        del question["stem"]
+    return json.dumps(question)
+
+
+def _session(tmp_path):
+    content = tmp_path / "content"
+    source = content / "en" / "A-1" / "A-1_lug_1__en.json"
+    source.parent.mkdir(parents=True)
+    source.write_text(_question(), encoding="utf-8")
+    questions = tmp_path / "assets"
+    (questions / "en" / "tasks").mkdir(parents=True)
+    glossary = tmp_path / "glossary.md"
+    glossary.write_text("| кейс | случай |\n", encoding="utf-8")
+    args = build_parser().parse_args(
+        ["--content-root", str(content), "--questions-root", str(questions), "--glossary", str(glossary),
+         "--report-dir", str(tmp_path / "reports"), "--no-cache"]
+    )
+    session = WatchSession(args, jobs=1)
+    # Keep the lint cache out of the repository's build/ directory
+    session._load_glossary()
+    session.lint_cache = None
+    return session, source, questions / "en" / "tasks" / "A-1.json"
+
+
+def _bump(path, text):
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watch_cycle_keeps_invalid_saves_out_of_task_bundles(tmp_path, capsys):
+    session, source, bundle = _session(tmp_path)
+
+    assert session.bank_cache.path is None
+    bank = bundle.parent.parent / "bank.v1.json"
+    _bump(source, _question("Which lug fits?"))
+    session.cycle({source})
+    assert json.loads(bundle.read_text(encoding="utf-8"))[0]["stem"] == "Which lug fits?"
+    assert json.loads(bank.read_text(encoding="utf-8"))[0]["stem"] == "Which lug fits?"
+
+    # A save that drops the stem is reported and the bundle keeps the last valid version
+    _bump(source, _question(None))
+    session.cycle({source})
+    output = capsys.readouterr().out
+    assert "must have required property 'stem'" in output
+    assert "en/A-1: task bundle not rebuilt" in output
+    assert json.loads(bundle.read_text(encoding="utf-8"))[0]["stem"] == "Which lug fits?"
+
+    _bump(source, _question("Fixed stem"))
+    session.cycle({source})
+    assert json.loads(bundle.read_text(encoding="utf-8"))[0]["stem"] == "Fixed stem"
+    assert json.loads(bank.read_text(encoding="utf-8"))[0]["stem"] == "Fixed stem"
+
+
+def test_run_aggregates_edited_questions_into_the_bank(tmp_path, monkeypatch):
+    session, source, bundle = _session(tmp_path)
+    bank = bundle.parent.parent / "bank.v1.json"
+    calls = []
+    real_main = bank_generator.main
+    monkeypatch.setattr(bank_generator, "main", lambda argv: calls.append(argv) or real_main(argv))
+
+    assert qw_content_pipeline.run(session.args, None, jobs=1) == 0
+    assert "--no-cache" in calls[0] and calls[0][calls[0].index("--content-root") + 1] == str(session.content_root)
+    assert json.loads(bank.read_text(encoding="utf-8"))[0]["stem"] == "How is a lug attached?"
+
+    _bump(source, _question("Which crimp tool?"))
+    qw_content_pipeline.default_loader.clear()
+    assert qw_content_pipeline.run(session.args, None, jobs=1) == 0
+    assert json.loads(bank.read_text(encoding="utf-8"))[0]["stem"] == "Which crimp tool?"
+
+
+def test_watch_survives_a_failed_cycle(tmp_path, monkeypatch, capsys):
+    session, source, _ = _session(tmp_path)
+    events = iter([{source}, KeyboardInterrupt()])
+
+    class Watcher:
+        def close(self):
+            pass
+
+    def next_event(watcher):
+        event = next(events)
+        if isinstance(event, BaseException):
+            raise event
+        return event
+
+    def failing_cycle(self, changed):
+        raise ValueError("1 task bundle(s) failed validation")
+
+    monkeypatch.setattr(qw_content_pipeline, "open_watcher", lambda *args, **kwargs: Watcher())
+    monkeypatch.setattr(qw_content_pipeline, "wait_for_changes", next_event)
+    monkeypatch.setattr(WatchSession, "cycle", failing_cycle)
+    assert qw_content_pipeline.watch(session.args, jobs=1) == 0
+    assert "[watch] cycle failed: 1 task bundle(s) failed validation" in capsys.readouterr().out
@@ -1,20 +1,59 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import heapq
 import json
 import hashlib
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Общие модули лежат в tools/content-tools
+CONTENT_TOOLS_DIR = Path(__file__).resolve().parent / "content-tools"
+if str(CONTENT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CONTENT_TOOLS_DIR))
+
+from qw_bank_binary import CODECS, encode_binary_bank  # noqa: E402
+from qw_bank_delta import build_delta, build_manifest, load_manifest  # noqa: E402
+from qw_bank_shards import (  # noqa: E402
+    DEFAULT_SHARD_BYTES,
+    SHARD_CODECS,
+    SHARD_MODES,
+    ShardSpec,
+    build_shard_table,
+    encode_shard,
+    plan_shards,
+    shard_entry,
+    shard_file,
+)
+from qw_content_loader import default_loader, load_document, validate_task_questions  # noqa: E402
+from qw_parity import ParityIndex, load_parity_index  # noqa: E402
+from qw_search_index import build_search_index, encode_search_index, load_search_index  # noqa: E402
+from qw_profile import add_profile_arguments, count, profiling_from_args, stage  # noqa: E402
+from qw_exam_index import (  # noqa: E402
+    DEFAULT_EXAM_PROFILE,
+    ExamProfile,
+    build_exam_index,
+    failed_quotas,
+    load_exam_profile,
+    quota_report,
+)
+
 
 # Конфиг — подправь, если нужно
 BLUEPRINT_ID = "welder_ip_sk_202404"
 BANK_VERSION = "v1"
 LOCALES = ["en", "ru"]
+BUILD_CACHE_VERSION = 1
 
 
 def sha256_of_file(path: Path) -> str:
     h = hashlib.sha256()
-    with path.open("rb") as f:
+    with stage("hash", trace=False), path.open("rb") as f:
         for chunk in iter(lambda: f.read(65536), b""):
             if not chunk:
                 break
@@ -22,131 +61,1000 @@ def sha256_of_file(path: Path) -> str:
     return h.hexdigest()
 
 
+class BuildCache:
+    """
+    Персистентный кэш сборки: path -> {mtimeNs, size, sha256, ...}.
+
+    Запись считается актуальной, пока mtime и размер файла совпадают с
+    сохранёнными; в этом случае sha256 и метаданные (questionCount) берутся
+    из кэша без чтения файла.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        if path is not None and path.is_file():
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[WARN] Ignoring unreadable build cache {path}: {e}")
+                return
+            if isinstance(data, dict) and data.get("version") == BUILD_CACHE_VERSION:
+                self.entries = data.get("entries", {})
+
+    @staticmethod
+    def _key(file: Path) -> str:
+        return file.as_posix()
+
+    def lookup(self, file: Path) -> Optional[Dict[str, Any]]:
+        """Возвращает запись, если файл не менялся (mtime/size), иначе None."""
+        entry = self.entries.get(self._key(file))
+        if entry is None:
+            return None
+        try:
+            st = file.stat()
+        except OSError:
+            return None
+        if entry.get("mtimeNs") != st.st_mtime_ns or entry.get("size") != st.st_size:
+            return None
+        return entry
+
+    def record(self, file: Path, sha256: str, **extra: Any) -> Dict[str, Any]:
+        st = file.stat()
+        entry: Dict[str, Any] = {"mtimeNs": st.st_mtime_ns, "size": st.st_size, "sha256": sha256}
+        entry.update(extra)
+        if self.entries.get(self._key(file)) != entry:
+            self.entries[self._key(file)] = entry
+            self.dirty = True
+        return entry
+
+    def sha256(self, file: Path) -> str:
+        entry = self.lookup(file)
+        if entry is not None:
+            return entry["sha256"]
+        digest = sha256_of_file(file)
+        # Метаданные прежней записи переживают touch без изменения содержимого
+        previous = self.entries.get(self._key(file), {})
+        extra = {k: v for k, v in previous.items() if k not in ("mtimeNs", "size", "sha256")}
+        if previous.get("sha256") != digest:
+            extra = {}
+        self.record(file, digest, **extra)
+        return digest
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": BUILD_CACHE_VERSION, "entries": self.entries},
+                f,
+                ensure_ascii=False,
+                sort_keys=True,
+            )
+        tmp_path.replace(self.path)
+        self.dirty = False
+
+
+# Канонический вид JSON-артефактов: тот же, что даёт
+# json.dump(obj, ensure_ascii=False, indent=2)
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def iter_json(obj: Any) -> Iterator[str]:
+    """Чанки канонического JSON для произвольного объекта."""
+    return _JSON_ENCODER.iterencode(obj)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    """
+    Чанки канонического JSON-массива, сериализуемого поэлементно.
+
+    Байт-в-байт совпадает с json.dumps(list(items), ensure_ascii=False, indent=2),
+    но не требует держать весь массив (и его строковое представление) в памяти.
+    """
+    first = True
+    for item in items:
+        yield "[\n  " if first else ",\n  "
+        first = False
+        # Сырых переводов строк внутри JSON-строк не бывает (они экранируются),
+        # поэтому сдвиг вложенного уровня — простая замена.
+        for chunk in _JSON_ENCODER.iterencode(item):
+            yield chunk.replace("\n", "\n  ")
+    yield "[]" if first else "\n]"
+
+
+class HashingWriter:
+    """
+    Пишет текст (в UTF-8) или байты в файл и одновременно считает sha256 этих же байт.
+
+    Запись идёт во временный файл рядом с целевым; commit() атомарно
+    подменяет целевой файл. Без path работает как чистый хешер.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._hasher = hashlib.sha256()
+        self.size = 0
+        self._tmp_path: Optional[Path] = None
+        self._file: Optional[BinaryIO] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_path = path.with_name(path.name + ".tmp")
+            self._file = self._tmp_path.open("wb")
+
+    def write(self, chunk: Union[str, bytes]) -> None:
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        self._hasher.update(data)
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def commit(self) -> None:
+        if self._file is not None and self._tmp_path is not None and self.path is not None:
+            self._file.close()
+            self._file = None
+            self._tmp_path.replace(self.path)
+
+    def discard(self) -> None:
+        if self._file is not None and self._tmp_path is not None:
+            self._file.close()
+            self._file = None
+            self._tmp_path.unlink(missing_ok=True)
+
+
+def write_if_changed(
+    path: Path, chunks: Iterable[Union[str, bytes]], cache: BuildCache
+) -> Tuple[str, bool]:
+    """
+    Стримит chunks в path, хешируя по ходу записи (без повторного чтения).
+
+    Если итоговый sha256 совпадает с текущим файлом, запись отбрасывается.
+    Текущий файл читается ради sha, только если его нет в кэше и размер
+    совпал с записанным: иначе (например, с --no-cache) каждый изменённый
+    выход читался бы целиком второй раз.
+    Возвращает (sha256, был ли файл перезаписан).
+    """
+    try:
+        previous_size: Optional[int] = path.stat().st_size
+    except OSError:
+        previous_size = None
+    writer = HashingWriter(path)
+    try:
+        with stage("write", trace=False):
+            for chunk in chunks:
+                writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+
+    digest = writer.hexdigest()
+    if previous_size == writer.size and cache.sha256(path) == digest:
+        writer.discard()
+        return digest, False
+    writer.commit()
+    cache.record(path, digest)
+    return digest, True
+
+
+# Порядок String.prototype.localeCompare (корневая сортировка ICU) для id из
+# ASCII: "_" < "-" < прочая пунктуация < цифры < буквы без учёта регистра,
+# а при равенстве строчная буква раньше заглавной
+_COLLATION_PUNCTUATION = "_-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$"
+
+
+def locale_compare_key(value: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    primary: List[int] = []
+    tertiary: List[int] = []
+    for char in value:
+        if char in _COLLATION_PUNCTUATION:
+            primary.append(_COLLATION_PUNCTUATION.index(char))
+        elif char.isascii() and char.isdigit():
+            primary.append(100 + int(char))
+        elif char.isascii() and char.isalpha():
+            primary.append(200 + ord(char.lower()))
+        else:
+            primary.append(1000 + ord(char))
+        tertiary.append(1 if char.isupper() else 0)
+    return tuple(primary), tuple(tertiary)
+
+
+def encode_task_bundle(members: Dict[Path, Dict[str, Any]]) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """Байты таск-бандла из вопросов-файлов (путь -> вопрос) и вопросы в порядке бандла."""
+    questions = [
+        members[path]
+        for path in sorted(members, key=lambda item: (locale_compare_key(str(members[item].get("id", ""))), item.name))
+    ]
+    return (json.dumps(questions, ensure_ascii=False, indent=2) + "\n").encode("utf-8"), questions
+
+
+def write_task_bundle(
+    bundle_path: Path, members: Dict[Path, Dict[str, Any]], cache: BuildCache
+) -> Tuple[str, bool]:
+    """
+    Пишет таск-бандл из вопросов-файлов (путь -> вопрос) так же, как
+    scripts/build-questions-dist.mjs: массив, отсортированный по id в порядке
+    localeCompare (при равных id — по имени файла), indent=2 и перевод строки в конце.
+    Записанный файл остаётся в кэше загрузчика, так что сборка банка
+    следом не читает и не разбирает его заново.
+    """
+    payload, questions = encode_task_bundle(members)
+    sha, written = write_if_changed(bundle_path, [payload], cache)
+    default_loader.prime(bundle_path, payload, questions)
+    return sha, written
+
+
+def aggregate_task_bundles(content_root: Path, questions_root: Path, cache: BuildCache) -> None:
+    """
+    Собирает questions/<locale>/tasks/<taskId>.json из файлов-вопросов
+    content/questions/<locale>/<taskId>/*.json.
+
+    Для каждого бандла в кэше хранится дайджест его входов (имена и sha256
+    файлов-вопросов; sha берутся из кэша по mtime/size). Бандл пересобирается,
+    только если файлы в его папке добавились, удалились или изменились
+    (или сам бандл изменён/удалён); остальные папки не читаются.
+    """
+    with stage("aggregate", root=str(content_root)):
+        for locale in LOCALES:
+            locale_dir = content_root / locale
+            if not locale_dir.is_dir():
+                print(f"[WARN] Locale {locale!r}: no question sources at {locale_dir}, skipping aggregation")
+                continue
+
+            task_dirs = sorted(path for path in locale_dir.iterdir() if path.is_dir())
+            rebuilt = 0
+            for task_dir in task_dirs:
+                members = sorted(path for path in task_dir.glob("*.json") if path.is_file())
+                inputs = hashlib.sha256()
+                for member in members:
+                    entry = cache.lookup(member)
+                    sha = entry["sha256"] if entry is not None else cache.record(member, load_document(member).sha256)["sha256"]
+                    inputs.update(f"{member.name}\0{sha}\n".encode("utf-8"))
+                inputs_sha = inputs.hexdigest()
+
+                bundle_path = questions_root / locale / "tasks" / f"{task_dir.name}.json"
+                state = cache.lookup(task_dir)
+                if (
+                    state is not None
+                    and state["sha256"] == inputs_sha
+                    and bundle_path.is_file()
+                    and cache.sha256(bundle_path) == state.get("bundle")
+                ):
+                    continue
+                bundle_sha, _ = write_task_bundle(
+                    bundle_path, {member: load_document(member).data for member in members}, cache
+                )
+                cache.record(task_dir, inputs_sha, bundle=bundle_sha)
+                rebuilt += 1
+            count("aggregate.rebuilt", rebuilt)
+            print(
+                f"[INFO] Locale {locale!r}: rebuilt {rebuilt} of {len(task_dirs)} task bundle(s) "
+                f"from {locale_dir}"
+            )
+
+
 def load_task_questions(task_path: Path, locale: str, task_id: str) -> List[Dict[str, Any]]:
     """Читает questions/<locale>/tasks/<taskId>.json и проверяет базовые инварианты."""
-    try:
-        with task_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        # Чтобы сразу увидеть, какой файл битый и где
-        raise RuntimeError(f"Invalid JSON in {task_path}: {e}") from e
+    return validate_task_questions(load_document(task_path).data, task_path, task_id)
+
+
+def load_bank(bank_path: Path) -> List[Dict[str, Any]]:
+    with stage("parse-bank", path=str(bank_path)), bank_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
 
-    if not isinstance(data, list):
-        raise ValueError(
-            f"{task_path}: expected JSON array of questions, got {type(data).__name__}"
+
+def load_previous_bank(bank_path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Читает прежний bank.v1.json и группирует вопросы по taskId."""
+    by_task: Dict[str, List[Dict[str, Any]]] = {}
+    for q in load_bank(bank_path):
+        by_task.setdefault(str(q.get("taskId", "")), []).append(q)
+    return by_task
+
+
+class BankQuestions:
+    """Вопросы банка локали для производных артефактов; со свежим банком читаются лениво."""
+
+    def __init__(self, bank_path: Path, questions: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.bank_path = bank_path
+        self._questions = questions
+
+    def get(self) -> List[Dict[str, Any]]:
+        if self._questions is None:
+            self._questions = load_bank(self.bank_path)
+        return self._questions
+
+
+def write_derived_if_stale(
+    path: Path,
+    sources: Dict[str, Any],
+    produce: Callable[[], Iterable[Union[str, bytes]]],
+    cache: BuildCache,
+) -> str:
+    """Перестраивает производный артефакт, только если изменились его источники."""
+    entry = cache.lookup(path) if path.is_file() else None
+    if entry is not None and entry.get("sources") == sources:
+        return entry["sha256"]
+    sha, _ = write_if_changed(path, produce(), cache)
+    cache.record(path, sha, sources=sources)
+    return sha
+
+
+def write_bank_delta(
+    locale_dir: Path, locale: str, bank_sha: str, bank: BankQuestions, cache: BuildCache
+) -> Tuple[str, Optional[str]]:
+    """
+    Пишет <locale>/bank.manifest.v1.json (sha256 каждого вопроса в порядке банка)
+    и, если банк изменился с прошлой сборки, <locale>/bank.delta.v1.json —
+    добавленные/удалённые/изменённые id и патч от прежнего банка к новому
+    (см. qw_bank_delta). Прежний манифест берётся с диска до перезаписи.
+
+    Возвращает (sha манифеста, sha дельты или None, если дельты нет). Дельта,
+    которая ведёт не к текущему банку (первая сборка после смены банка без
+    прежнего манифеста, файл от чужой сборки), удаляется, чтобы не попасть
+    в files-карту.
+    """
+    manifest_path = locale_dir / "bank.manifest.v1.json"
+    delta_path = locale_dir / "bank.delta.v1.json"
+    sources = {"bank": bank_sha}
+    entry = cache.lookup(manifest_path) if manifest_path.is_file() else None
+
+    if entry is None or entry.get("sources") != sources:
+        previous = load_manifest(manifest_path)
+        if previous is None or previous.get("bankSha256") != bank_sha:
+            manifest = build_manifest(bank.get(), locale, bank_sha)
+            if previous is not None:
+                delta = build_delta(previous, manifest, bank.get())
+                delta_sha, written = write_if_changed(delta_path, iter_json(delta), cache)
+                cache.record(delta_path, delta_sha, toBankSha256=bank_sha)
+                if written:
+                    print(
+                        f"[INFO] Locale {locale!r}: wrote {delta_path} "
+                        f"(+{len(delta['added'])} -{len(delta['removed'])} ~{len(delta['changed'])})"
+                    )
+            write_if_changed(manifest_path, iter_json(manifest), cache)
+        cache.record(manifest_path, cache.sha256(manifest_path), sources=sources)
+
+    manifest_sha = cache.sha256(manifest_path)
+    if not delta_path.is_file():
+        return manifest_sha, None
+    delta_entry = cache.lookup(delta_path)
+    target = delta_entry.get("toBankSha256") if delta_entry is not None else None
+    if target is None:
+        try:
+            with delta_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            data = None
+        target = data.get("toBankSha256") if isinstance(data, dict) else None
+    if target != bank_sha:
+        delta_path.unlink()
+        print(f"[INFO] Locale {locale!r}: removed {delta_path}, it does not lead to the current bank")
+        return manifest_sha, None
+    delta_sha = cache.sha256(delta_path)
+    cache.record(delta_path, delta_sha, toBankSha256=bank_sha)
+    return manifest_sha, delta_sha
+
+
+def write_bank_shards(
+    locale_dir: Path, locale: str, bank_sha: str, bank: BankQuestions, spec: ShardSpec, cache: BuildCache
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Режет банк на шарды <locale>/shards/<имя>.json.gz|.json.zst (минифицированный
+    JSON, сжатый целиком; см. qw_bank_shards) и пишет таблицу шардов
+    <locale>/bank.shards.v1.json: путь, sha256, число вопросов, диапазон id
+    и taskId каждого шарда. Пока банк и spec те же, а шарды на месте,
+    таблица берётся с диска без чтения банка. Шарды прежней нарезки удаляются.
+
+    Возвращает (таблица, sha таблицы).
+    """
+    table_path = locale_dir / "bank.shards.v1.json"
+    shards_dir = locale_dir / "shards"
+    sources = {"bank": bank_sha, **spec.fingerprint()}
+    entry = cache.lookup(table_path) if table_path.is_file() else None
+    if entry is not None and entry.get("sources") == sources:
+        with table_path.open("r", encoding="utf-8") as f:
+            table = json.load(f)
+        if all(
+            shard_file(locale_dir.parent, shard["path"]).is_file()
+            and cache.sha256(shard_file(locale_dir.parent, shard["path"])) == shard["sha256"]
+            for shard in table["shards"]
+        ):
+            return table, entry["sha256"]
+
+    shards: List[Dict[str, Any]] = []
+    with stage("write-shards", locale=locale, mode=spec.mode):
+        for name, questions in plan_shards(bank.get(), spec):
+            data, raw_size = encode_shard(questions, spec.codec)
+            shard_path = shards_dir / f"{name}{SHARD_CODECS[spec.codec]}"
+            sha, _ = write_if_changed(shard_path, [data], cache)
+            shards.append(shard_entry(locale, name, questions, spec, sha, len(data), raw_size))
+    current = {Path(shard["path"]).name for shard in shards}
+    for stale in sorted(shards_dir.iterdir()):
+        if stale.name not in current and stale.name.endswith(tuple(SHARD_CODECS.values())):
+            stale.unlink()
+    count("bank.shards", len(shards))
+
+    table = build_shard_table(locale, spec, bank_sha, shards)
+    sha, written = write_if_changed(table_path, iter_json(table), cache)
+    cache.record(table_path, sha, sources=sources)
+    if written:
+        print(f"[INFO] Locale {locale!r}: wrote {len(shards)} {spec.codec} shard(s) by {spec.mode}")
+    return table, sha
+
+
+def write_search_index(
+    locale_dir: Path, locale: str, bank_sha: str, task_shas: Dict[str, str], bank: BankQuestions, cache: BuildCache
+) -> str:
+    """
+    Пишет <locale>/search.v1.json — инвертированный индекс банка для поиска по
+    формулировкам (см. qw_search_index): нормализованный токен -> позиции в
+    stem/choices/rationales вопросов, номера вопросов закодированы дельтами.
+    В индексе хранятся sha таск-бандлов, так что вопросы неизменившихся тасков
+    берутся из прежнего индекса, а токенизируются только остальные.
+    """
+    index_path = locale_dir / "search.v1.json"
+
+    def produce() -> List[bytes]:
+        with stage("search-index", locale=locale):
+            index, tokenized = build_search_index(bank.get(), locale, task_shas, load_search_index(index_path))
+        count("search.tokenized", tokenized)
+        print(
+            f"[INFO] Locale {locale!r}: search index over {len(index['ids'])} question(s), "
+            f"{tokenized} tokenized, {len(index['terms'])} term(s)"
         )
+        return [encode_search_index(index)]
+
+    return write_derived_if_stale(index_path, {"bank": bank_sha}, produce, cache)
+
+
+def bank_sort_key(q: Dict[str, Any]) -> Tuple[str, str]:
+    """Порядок вопросов в bank.v1.json: по id, затем по taskId."""
+    return (str(q.get("id", "")), str(q.get("taskId", "")))
+
+
+class SpilledTask:
+    """
+    Вопросы одного таска, отсортированные по bank_sort_key и сброшенные на диск
+    уже в том виде, в каком они стоят в банке (см. iter_json_array). В памяти
+    остаются только ключи и длины записей.
+    """
 
-    questions: List[Dict[str, Any]] = []
-    for idx, q in enumerate(data):
-        if not isinstance(q, dict):
-            raise ValueError(f"{task_path}: question #{idx} is not an object")
+    def __init__(self, path: Path, keys: List[Tuple[str, str]], lengths: List[int]) -> None:
+        self.path = path
+        self.keys = keys
+        self.lengths = lengths
 
-        # Обязательные поля на уровне вопроса
-        missing = [k for k in ("id", "taskId", "stem", "choices", "correctId") if k not in q]
-        if missing:
-            raise ValueError(f"{task_path}: question #{idx} is missing required fields: {missing}")
+    def __len__(self) -> int:
+        return len(self.keys)
 
-        if q.get("taskId") != task_id:
-            raise ValueError(
-                f"{task_path}: question #{idx} has taskId={q.get('taskId')!r}, "
-                f"expected {task_id!r}"
+    def iter_items(self) -> Iterator[Tuple[Tuple[str, str], bytes]]:
+        with self.path.open("rb") as f:
+            for key, length in zip(self.keys, self.lengths):
+                yield key, f.read(length)
+
+
+def spill_task_questions(questions: List[Dict[str, Any]], spill_path: Path) -> SpilledTask:
+    keys: List[Tuple[str, str]] = []
+    lengths: List[int] = []
+    with spill_path.open("wb") as f:
+        # sorted() стабилен, как и общий sort банка
+        for q in sorted(questions, key=bank_sort_key):
+            data = "".join(_JSON_ENCODER.iterencode(q)).replace("\n", "\n  ").encode("utf-8")
+            f.write(data)
+            keys.append(bank_sort_key(q))
+            lengths.append(len(data))
+    return SpilledTask(spill_path, keys, lengths)
+
+
+# (sha256, вопросы / сброшенный на диск таск / None, если таск берётся из прежнего банка)
+TaskResult = Tuple[str, Optional[Union[List[Dict[str, Any]], SpilledTask]]]
+
+
+def iter_merged_bank(tasks: List[SpilledTask]) -> Iterator[bytes]:
+    """
+    k-way merge отсортированных тасков в JSON-массив банка. heapq.merge при
+    равных ключах сохраняет порядок тасков, поэтому результат байт-в-байт
+    совпадает с iter_json_array(sorted(все вопросы)).
+    """
+    first = True
+    for _, data in heapq.merge(*(task.iter_items() for task in tasks), key=lambda item: item[0]):
+        yield b"[\n  " if first else b",\n  "
+        first = False
+        yield data
+    yield b"[]" if first else b"\n]"
+
+
+def process_task_file(
+    task_path: Path,
+    locale: str,
+    task_id: str,
+    known_sha: Optional[str],
+    reusable_sha: Optional[str],
+    spill_dir: Optional[Path] = None,
+) -> TaskResult:
+    """
+    Единица работы сборки (выполняется и в пуле процессов): хеширует таск-бандл,
+    если его sha ещё не известен, и загружает/валидирует вопросы, если sha
+    отличается от того, из которого собран прежний банк.
+
+    Возвращает (sha256, вопросы или None, если их можно взять из прежнего банка).
+    Со spill_dir вопросы не возвращаются, а сбрасываются на диск (SpilledTask),
+    и файл не остаётся в кэше загрузчика.
+    """
+    if known_sha == reusable_sha and known_sha is not None:
+        return known_sha, None
+    # Один read на хеш и парсинг; JSON разбирается лениво, только если таск изменился
+    document = load_document(task_path)
+    sha = known_sha or document.sha256
+    if sha == reusable_sha:
+        if spill_dir is not None:
+            default_loader.invalidate(task_path)
+        return sha, None
+    data = document.data
+    with stage("validate", trace=False):
+        questions = validate_task_questions(data, task_path, task_id)
+    if spill_dir is None:
+        return sha, questions
+    default_loader.invalidate(task_path)
+    return sha, spill_task_questions(questions, spill_dir / f"{locale}-{task_id}.bin")
+
+
+def run_task_jobs(
+    jobs: List[Tuple[Path, str, str, Optional[str], Optional[str]]],
+    workers: int,
+    spill_dir: Optional[Path] = None,
+) -> List[TaskResult]:
+    """
+    Выполняет process_task_file для всех jobs; порядок результатов = порядок jobs.
+    Ошибки валидации не прерывают прогон: они собираются по всем таскам
+    и поднимаются одним ValueError в конце.
+
+    Таск-бандлы, которые уже лежат разобранными в кэше загрузчика этого
+    процесса (только что записанные write_task_bundle), обрабатываются здесь
+    же и в пул не отдаются: воркер прочитал бы и разобрал их заново.
+    """
+    results: List[TaskResult] = []
+    errors: List[str] = []
+
+    def collect(run: Callable[[], TaskResult]) -> None:
+        try:
+            results.append(run())
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    pooled = [index for index, job in enumerate(jobs) if default_loader.peek(job[0]) is None] if workers > 1 else []
+    if len(pooled) <= 1:
+        for job in jobs:
+            collect(lambda: process_task_file(*job, spill_dir=spill_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pooled))) as pool:
+            futures = {index: pool.submit(process_task_file, *jobs[index], spill_dir=spill_dir) for index in pooled}
+            for index, job in enumerate(jobs):
+                future = futures.get(index)
+                collect(future.result if future is not None else lambda: process_task_file(*job, spill_dir=spill_dir))
+    if errors:
+        raise ValueError(f"{len(errors)} task bundle(s) failed validation:\n" + "\n".join(errors))
+    return results
+
+
+def task_question_counts(
+    plan: Dict[str, Any],
+    results: List[TaskResult],
+    cache: BuildCache,
+) -> Dict[str, int]:
+    """
+    Число вопросов в каждом таске локали без сборки банка: для перезагруженных
+    тасков — по результатам, для остальных — questionCount из кэша, а если его
+    нет, то по прежнему банку.
+    """
+    counts: Dict[str, int] = {}
+    previous_bank: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    for task_file in plan["task_files"]:
+        task_id = task_file.stem
+        slot = plan["job_slots"].get(task_id)
+        if slot is not None and results[slot][1] is not None:
+            counts[task_id] = len(results[slot][1])
+            continue
+        entry = cache.lookup(task_file)
+        if entry is not None and entry.get("questionCount") is not None:
+            counts[task_id] = entry["questionCount"]
+            continue
+        if previous_bank is None:
+            previous_bank = load_previous_bank(plan["bank_path"])
+        counts[task_id] = len(previous_bank.get(task_id, []))
+    return counts
+
+
+def exam_locales(profile: ExamProfile, plans: List[Dict[str, Any]]) -> List[str]:
+    return [p["locale"] for p in plans if not profile.locales or p["locale"] in profile.locales]
+
+
+def check_exam_quotas(
+    plans: List[Dict[str, Any]],
+    results: List[TaskResult],
+    profile: ExamProfile,
+    cache: BuildCache,
+) -> None:
+    """Падает до записи банков, если какой-то таск не набирает квоту профиля экзамена."""
+    locales = exam_locales(profile, plans)
+    failures: List[str] = []
+    for plan in plans:
+        if plan["locale"] not in locales:
+            continue
+        counts = task_question_counts(plan, results, cache)
+        for item in failed_quotas(quota_report(profile, counts)):
+            failures.append(
+                f"[quota:{plan['locale']}] {item.taskId} expected={item.required} "
+                f"got={item.available} status={item.status}"
             )
+    if failures:
+        print("\n".join(failures))
+        raise SystemExit(
+            f"Exam profile {profile.id!r}: {len(failures)} task quota(s) cannot be met, nothing was written"
+        )
+    print(f"[INFO] Exam profile {profile.id!r}: all task quotas can be met for {', '.join(locales)}")
 
-        choices = q.get("choices")
-        if not isinstance(choices, list) or not choices:
-            raise ValueError(f"{task_path}: question #{idx} has invalid 'choices'")
 
-        choice_ids = set()
-        for c_idx, c in enumerate(choices):
-            if not isinstance(c, dict):
-                raise ValueError(
-                    f"{task_path}: question #{idx} choice #{c_idx} is not an object"
-                )
-            if "id" not in c or "text" not in c:
-                raise ValueError(
-                    f"{task_path}: question #{idx} choice #{c_idx} "
-                    f"is missing 'id' or 'text'"
-                )
-            cid = str(c["id"])
-            if cid in choice_ids:
-                raise ValueError(
-                    f"{task_path}: question #{idx} has duplicate choice id {cid!r}"
+def check_parity(
+    plans: List[Dict[str, Any]],
+    results: List[TaskResult],
+    index: ParityIndex,
+    cache: BuildCache,
+) -> None:
+    """
+    Сверяет таск-бандлы с индексом паритета (qw_parity.py) вместо обхода
+    content/questions: предупреждает о расхождениях en/ru и о тасках, где
+    число вопросов в бандле не совпадает с исходниками. Сборку не прерывает.
+    """
+    issue_counts: Dict[str, int] = {}
+    for issue in index.issues():
+        issue_counts[issue.type] = issue_counts.get(issue.type, 0) + 1
+    if issue_counts:
+        summary = ", ".join(f"{count} {kind}" for kind, count in sorted(issue_counts.items()))
+        print(f"[WARN] Parity index: {summary} (details: qw_parity.py)")
+
+    content_counts = index.task_counts()
+    for plan in plans:
+        locale = plan["locale"]
+        if locale not in index.locales:
+            continue
+        counts = task_question_counts(plan, results, cache)
+        for task_id in sorted(set(counts) | {t for t, c in content_counts.items() if locale in c}):
+            in_bundle = counts.get(task_id, 0)
+            in_content = content_counts.get(task_id, {}).get(locale, 0)
+            if in_bundle != in_content:
+                print(
+                    f"[WARN] [parity:{locale}] {task_id}: {in_bundle} question(s) in task bundle, "
+                    f"{in_content} in content"
                 )
-            choice_ids.add(cid)
 
-        correct_id = str(q["correctId"])
-        if correct_id not in choice_ids:
-            raise ValueError(
-                f"{task_path}: question #{idx} has correctId={correct_id!r} "
-                f"which is not present in choices {sorted(choice_ids)}"
-            )
 
-        questions.append(q)
+def build_locale_index(
+    locale: str, files_map: Dict[str, str], shard_table: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Содержимое <locale>/index.json."""
+    locale_index: Dict[str, Any] = {
+        "schema": "questions-locale-index-v1",
+        "locale": locale,
+        "blueprintId": BLUEPRINT_ID,
+        "bankVersion": BANK_VERSION,
+        "files": files_map,  # ВАЖНО: именно объект, а не массив
+    }
+    if shard_table is not None:
+        locale_index["shards"] = shard_table
+    return locale_index
 
-    return questions
 
-def build_banks_and_indexes(questions_root: Path) -> None:
+def build_root_index(root_locale_files: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """Содержимое root questions/index.json (агрегатор по локалям)."""
+    locales_obj: Dict[str, Any] = {}
+    for locale, files_map in sorted(root_locale_files.items()):
+        locales_obj[locale] = {
+            "files": files_map
+        }
+    return {
+        "schema": "questions-index-v1",
+        "blueprintId": BLUEPRINT_ID,
+        "bankVersion": BANK_VERSION,
+        "locales": locales_obj,
+    }
+
+
+def build_banks_and_indexes(
+    questions_root: Path,
+    cache: Optional[BuildCache] = None,
+    jobs: int = 1,
+    binary_codec: Optional[str] = None,
+    exam_profile: Optional[ExamProfile] = None,
+    parity_index: Optional[ParityIndex] = None,
+    bank_delta: bool = False,
+    streaming: bool = False,
+    shards: Optional[ShardSpec] = None,
+    content_root: Optional[Path] = None,
+    search_index: bool = False,
+) -> None:
     """
     Собирает bank.v1.json и per-locale index.json для LOCALES,
     используя агрегированные таски из:
 
         app-android/src/main/assets/questions/<locale>/tasks/<taskId>.json
 
+    С content_root таски сперва собираются из файлов-вопросов
+    content_root/<locale>/<taskId>/*.json (см. aggregate_task_bundles);
+    пересобранные бандлы попадают в сборку банка без повторного чтения.
+
     Пишет:
 
         app-android/src/main/assets/questions/<locale>/bank.v1.json
         app-android/src/main/assets/questions/<locale>/index.json
         app-android/src/main/assets/questions/index.json (root агрегатор)
+
+    С кэшем (BuildCache) неизменившиеся таски не перечитываются и не
+    перехешируются, а выходные файлы перезаписываются только при изменении
+    содержимого. При jobs > 1 загрузка, валидация и хеширование тасков всех
+    локалей идут в пуле процессов; результат сливается в детерминированном
+    порядке и байт-в-байт совпадает с последовательной сборкой.
+
+    С binary_codec дополнительно пишется компактный бинарный банк
+    <locale>/bank.v1.qwb (см. qw_bank_binary) и попадает в files-карту индекса.
+
+    С exam_profile квоты блупринта проверяются до записи чего-либо (сборка
+    падает, если таск не набирает квоту), а для локалей профиля пишется
+    <locale>/exam.index.v1.json (см. qw_exam_index): id вопросов по taskId,
+    difficulty и familyId со счётчиками и отчётом о выполнимости квот.
+
+    С bank_delta рядом с банком ведётся манифест с sha256 каждого вопроса и
+    пишется дельта от банка прошлой сборки (см. write_bank_delta); оба файла
+    попадают в files-карту индекса.
+
+    Со streaming банк собирается с ограниченной памятью: каждый таск по
+    очереди читается, сортируется и сбрасывается во временный файл
+    (SpilledTask), а bank.v1.json пишется k-way merge этих файлов
+    (iter_merged_bank). Прежний банк при этом не читается; результат
+    байт-в-байт тот же.
+
+    С shards банк дополнительно режется на сжатые шарды (по taskId или по
+    бюджету байт, см. write_bank_shards); шарды и таблица шардов попадают в
+    files-карту, а таблица ещё и в поле "shards" индекса локали, так что
+    читатель (qw_bank_shards.ShardedBank) открывает только нужный шард.
+
+    С search_index для каждой локали пишется инвертированный индекс
+    <locale>/search.v1.json (см. write_search_index) и попадает в files-карту;
+    при изменении части тасков перетокенизируются только их вопросы.
+
+    С parity_index таск-бандлы сверяются с индексом паритета en/ru
+    (см. check_parity); выходные файлы от этого не меняются.
     """
-    # Для root-индекса: locale -> map path->sha
-    root_locale_files: Dict[str, Dict[str, str]] = {}
+    if cache is None:
+        cache = BuildCache()
+
+    if content_root is not None:
+        aggregate_task_bundles(content_root, questions_root, cache)
+
+    if streaming:
+        with tempfile.TemporaryDirectory(prefix="qw-bank-") as spill_dir:
+            _build_banks_and_indexes(
+                questions_root,
+                cache,
+                jobs,
+                binary_codec,
+                exam_profile,
+                parity_index,
+                bank_delta,
+                shards,
+                search_index,
+                Path(spill_dir),
+            )
+    else:
+        _build_banks_and_indexes(
+            questions_root, cache, jobs, binary_codec, exam_profile, parity_index, bank_delta, shards, search_index, None
+        )
+
+
+def _build_banks_and_indexes(
+    questions_root: Path,
+    cache: BuildCache,
+    jobs: int,
+    binary_codec: Optional[str],
+    exam_profile: Optional[ExamProfile],
+    parity_index: Optional[ParityIndex],
+    bank_delta: bool,
+    shards: Optional[ShardSpec],
+    search_index: bool,
+    spill_dir: Optional[Path],
+) -> None:
+
+    # 1. Планируем: какие таски надо хешировать и/или загрузить
+    plans: List[Dict[str, Any]] = []
+    task_jobs: List[Tuple[Path, str, str, Optional[str], Optional[str]]] = []
 
     for locale in LOCALES:
         tasks_dir = questions_root / locale / "tasks"
-        meta_dir = questions_root / locale / "meta"
         bank_path = questions_root / locale / "bank.v1.json"
-        locale_index_path = questions_root / locale / "index.json"
 
         if not tasks_dir.is_dir():
             print(f"[WARN] Locale {locale!r}: tasks dir not found at {tasks_dir}, skipping")
             continue
 
-        print(f"[INFO] Building bank and index for locale {locale!r}")
-
-        task_files = sorted(tasks_dir.glob("*.json"))
+        with stage("discover", locale=locale):
+            task_files = sorted(tasks_dir.glob("*.json"))
+        count("tasks.discovered", len(task_files))
         if not task_files:
             print(f"[WARN] Locale {locale!r}: no task JSON files found in {tasks_dir}, skipping")
             continue
 
-        all_questions: List[Dict[str, Any]] = []
-        # task meta нужно только для статистики и root-индекса, но sha мы всё равно считаем
-        tasks_meta: List[Dict[str, Any]] = []
+        # Банк можно переиспользовать для тасков с тем же sha, из которого он собран
+        bank_entry = cache.lookup(bank_path) if bank_path.is_file() else None
+        bank_sources: Dict[str, str] = (bank_entry or {}).get("sources", {})
 
+        # taskId -> sha256 текущих таск-бандлов (из кэша по mtime/size)
+        task_shas: Dict[str, str] = {}
+        job_slots: Dict[str, int] = {}
         for task_file in task_files:
             task_id = task_file.stem
-            qs = load_task_questions(task_file, locale, task_id)
-            all_questions.extend(qs)
-
-            tasks_meta.append(
-                {
-                    "taskId": task_id,
-                    "path": f"questions/{locale}/tasks/{task_file.name}",
-                    "sha256": sha256_of_file(task_file),
-                    "questionCount": len(qs),
-                }
+            entry = cache.lookup(task_file)
+            known_sha = entry["sha256"] if entry is not None else None
+            if known_sha is not None and known_sha == bank_sources.get(task_id):
+                task_shas[task_id] = known_sha
+                continue
+            job_slots[task_id] = len(task_jobs)
+            task_jobs.append(
+                (task_file, locale, task_id, known_sha, bank_sources.get(task_id))
             )
 
-        # Сортируем плоский банк по id / taskId
-        all_questions.sort(
-            key=lambda q: (str(q.get("id", "")), str(q.get("taskId", "")))
+        plans.append(
+            {
+                "locale": locale,
+                "task_files": task_files,
+                "bank_path": bank_path,
+                "bank_entry": bank_entry,
+                "task_shas": task_shas,
+                "job_slots": job_slots,
+            }
         )
 
-        # Пишем банк
-        bank_path.parent.mkdir(parents=True, exist_ok=True)
-        with bank_path.open("w", encoding="utf-8") as f:
-            json.dump(all_questions, f, ensure_ascii=False, indent=2)
+    # 2. Хешируем/загружаем изменившиеся таски (последовательно или в пуле)
+    with stage("load-tasks", tasks=len(task_jobs), jobs=jobs):
+        results = run_task_jobs(task_jobs, jobs, spill_dir)
+
+    if parity_index is not None:
+        check_parity(plans, results, parity_index, cache)
+
+    exam_scope: List[str] = []
+    if exam_profile is not None:
+        check_exam_quotas(plans, results, exam_profile, cache)
+        exam_scope = exam_locales(exam_profile, plans)
+
+    # Для root-индекса: locale -> map path->sha
+    root_locale_files: Dict[str, Dict[str, str]] = {}
+
+    # 3. Собираем банки и индексы в порядке LOCALES
+    for plan in plans:
+        locale = plan["locale"]
+        task_files: List[Path] = plan["task_files"]
+        bank_path: Path = plan["bank_path"]
+        bank_entry: Optional[Dict[str, Any]] = plan["bank_entry"]
+        task_shas: Dict[str, str] = plan["task_shas"]
+        meta_dir = questions_root / locale / "meta"
+        locale_index_path = questions_root / locale / "index.json"
+
+        print(f"[INFO] Building bank and index for locale {locale!r}")
+
+        loaded: Dict[str, Union[List[Dict[str, Any]], SpilledTask]] = {}
+        for task_id, slot in plan["job_slots"].items():
+            sha, qs = results[slot]
+            task_shas[task_id] = sha
+            if qs is not None:
+                loaded[task_id] = qs
+        task_shas = {t.stem: task_shas[t.stem] for t in task_files}
+
+        # Банк актуален, если собран ровно из этих же версий тасков
+        bank_fresh = bank_entry is not None and bank_entry.get("sources") == task_shas
+
+        # task meta нужно только для статистики и root-индекса, но sha мы всё равно считаем
+        tasks_meta: List[Dict[str, Any]] = []
+
+        if bank_fresh:
+            bank_sha = bank_entry["sha256"]
+            bank = BankQuestions(bank_path)
+            for task_file in task_files:
+                sha = task_shas[task_file.stem]
+                entry = cache.lookup(task_file)
+                if entry is None or entry["sha256"] != sha:
+                    entry = cache.record(task_file, sha)
+                tasks_meta.append(
+                    {
+                        "taskId": task_file.stem,
+                        "path": f"questions/{locale}/tasks/{task_file.name}",
+                        "sha256": sha,
+                        "questionCount": entry.get("questionCount"),
+                    }
+                )
+            print(f"[INFO] Locale {locale!r}: bank is up to date")
+        elif spill_dir is not None:
+            spilled: List[SpilledTask] = []
+            for task_file in task_files:
+                task_id = task_file.stem
+                sha = task_shas[task_id]
+                if task_id in loaded:
+                    task = loaded[task_id]
+                else:
+                    # Не менявшийся таск читаем сам по себе, а не весь прежний банк
+                    task = spill_task_questions(
+                        load_task_questions(task_file, locale, task_id), spill_dir / f"{locale}-{task_id}.bin"
+                    )
+                    default_loader.invalidate(task_file)
+                spilled.append(task)
+                cache.record(task_file, sha, questionCount=len(task))
+                tasks_meta.append(
+                    {
+                        "taskId": task_id,
+                        "path": f"questions/{locale}/tasks/{task_file.name}",
+                        "sha256": sha,
+                        "questionCount": len(task),
+                    }
+                )
+            count("bank.questions", sum(len(task) for task in spilled))
+
+            with stage("write-bank", locale=locale, streaming=True):
+                bank_sha, written = write_if_changed(bank_path, iter_merged_bank(spilled), cache)
+            if written:
+                print(f"[INFO] Locale {locale!r}: wrote {bank_path}")
+            cache.record(bank_path, bank_sha, sources=task_shas)
+            bank = BankQuestions(bank_path)
+            print(f"[INFO] Locale {locale!r}: streamed {len(task_files)} task(s) into the bank")
+        else:
+            all_questions: List[Dict[str, Any]] = []
+            previous_bank: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+            for task_file in task_files:
+                task_id = task_file.stem
+                sha = task_shas[task_id]
+                if task_id in loaded:
+                    qs = loaded[task_id]
+                else:
+                    # Таск не менялся — берём уже провалидированные вопросы из прежнего банка
+                    if previous_bank is None:
+                        previous_bank = load_previous_bank(bank_path)
+                    qs = previous_bank.get(task_id, [])
+                cache.record(task_file, sha, questionCount=len(qs))
+                all_questions.extend(qs)
 
-        bank_sha = sha256_of_file(bank_path)
+                tasks_meta.append(
+                    {
+                        "taskId": task_id,
+                        "path": f"questions/{locale}/tasks/{task_file.name}",
+                        "sha256": sha,
+                        "questionCount": len(qs),
+                    }
+                )
+
+            # Сортируем плоский банк по id / taskId
+            with stage("sort", locale=locale, questions=len(all_questions)):
+                all_questions.sort(
+                    key=lambda q: (str(q.get("id", "")), str(q.get("taskId", "")))
+                )
+            count("bank.questions", len(all_questions))
+
+            # Пишем банк
+            with stage("write-bank", locale=locale):
+                bank_sha, written = write_if_changed(
+                    bank_path, iter_json_array(all_questions), cache
+                )
+            if written:
+                print(f"[INFO] Locale {locale!r}: wrote {bank_path}")
+            cache.record(bank_path, bank_sha, sources=task_shas)
+            bank = BankQuestions(bank_path, all_questions)
+            print(
+                f"[INFO] Locale {locale!r}: reloaded {len(loaded)} task(s), "
+                f"reused {len(task_files) - len(loaded)} from previous bank"
+            )
 
         # files: map path -> sha (именно это ждёт IndexParser.collectFiles)
         files_map: Dict[str, str] = {}
@@ -154,7 +1062,7 @@ def build_banks_and_indexes(questions_root: Path) -> None:
         # meta/task_labels.json (если есть)
         labels_path = meta_dir / "task_labels.json"
         if labels_path.is_file():
-            labels_sha = sha256_of_file(labels_path)
+            labels_sha = cache.sha256(labels_path)
             files_map[f"questions/{locale}/meta/task_labels.json"] = labels_sha
         else:
             print(
@@ -164,22 +1072,51 @@ def build_banks_and_indexes(questions_root: Path) -> None:
         # банк
         files_map[f"questions/{locale}/bank.v1.json"] = bank_sha
 
+        # бинарный банк (опционально)
+        if binary_codec is not None:
+            files_map[f"questions/{locale}/bank.v1.qwb"] = write_derived_if_stale(
+                questions_root / locale / "bank.v1.qwb",
+                {"bank": bank_sha, "codec": binary_codec},
+                lambda: [encode_binary_bank(bank.get(), codec=binary_codec)],
+                cache,
+            )
+
+        # манифест и дельта к прошлому банку (опционально)
+        if bank_delta:
+            manifest_sha, delta_sha = write_bank_delta(questions_root / locale, locale, bank_sha, bank, cache)
+            files_map[f"questions/{locale}/bank.manifest.v1.json"] = manifest_sha
+            if delta_sha is not None:
+                files_map[f"questions/{locale}/bank.delta.v1.json"] = delta_sha
+
+        # сжатые шарды банка (опционально)
+        shard_table: Optional[Dict[str, Any]] = None
+        if shards is not None:
+            shard_table, table_sha = write_bank_shards(questions_root / locale, locale, bank_sha, bank, shards, cache)
+            files_map[f"questions/{locale}/bank.shards.v1.json"] = table_sha
+            for shard in shard_table["shards"]:
+                files_map[shard["path"]] = shard["sha256"]
+
+        # поисковый индекс (опционально)
+        if search_index:
+            files_map[f"questions/{locale}/search.v1.json"] = write_search_index(
+                questions_root / locale, locale, bank_sha, task_shas, bank, cache
+            )
+
+        # индекс для сборки экзамена (опционально)
+        if exam_profile is not None and locale in exam_scope:
+            files_map[f"questions/{locale}/exam.index.v1.json"] = write_derived_if_stale(
+                questions_root / locale / "exam.index.v1.json",
+                {"bank": bank_sha, "profile": exam_profile.fingerprint()},
+                lambda: iter_json(build_exam_index(bank.get(), exam_profile, locale)),
+                cache,
+            )
+
         # все task-бандлы
         for t in tasks_meta:
             files_map[t["path"]] = t["sha256"]
 
         # per-locale index.json в формате, который понимает IndexParser
-        locale_index = {
-            "schema": "questions-locale-index-v1",
-            "locale": locale,
-            "blueprintId": BLUEPRINT_ID,
-            "bankVersion": BANK_VERSION,
-            "files": files_map,  # ВАЖНО: именно объект, а не массив
-        }
-
-        locale_index_path.parent.mkdir(parents=True, exist_ok=True)
-        with locale_index_path.open("w", encoding="utf-8") as f:
-            json.dump(locale_index, f, ensure_ascii=False, indent=2)
+        write_if_changed(locale_index_path, iter_json(build_locale_index(locale, files_map, shard_table)), cache)
 
         # копим для root-индекса
         root_locale_files[locale] = files_map
@@ -187,34 +1124,301 @@ def build_banks_and_indexes(questions_root: Path) -> None:
     # root questions/index.json (агрегатор по локалям)
     if not root_locale_files:
         print("[WARN] No locales processed, root index will not be written")
+        cache.save()
         return
 
-    locales_obj: Dict[str, Any] = {}
-    for locale, files_map in sorted(root_locale_files.items()):
-        locales_obj[locale] = {
-            "files": files_map
-        }
+    root_index_path = questions_root / "index.json"
+    _, written = write_if_changed(root_index_path, iter_json(build_root_index(root_locale_files)), cache)
+    if written:
+        print(f"[INFO] Wrote root index to {root_index_path}")
+    else:
+        print(f"[INFO] Root index is up to date at {root_index_path}")
 
-    root_index = {
-        "schema": "questions-index-v1",
-        "blueprintId": BLUEPRINT_ID,
-        "bankVersion": BANK_VERSION,
-        "locales": locales_obj,
+    cache.save()
+
+
+class CheckMismatch(Exception):
+    """Первое расхождение, найденное в режиме --check."""
+
+
+def _digest(chunks: Iterable[Union[str, bytes]]) -> str:
+    """sha256 артефакта, сериализуемого прямо в хешер, без записи на диск."""
+    hasher = HashingWriter()
+    for chunk in chunks:
+        hasher.write(chunk)
+    return hasher.hexdigest()
+
+
+def _file_sha(path: Path) -> str:
+    return sha256_of_file(path) if path.is_file() else "missing"
+
+
+def _expect(subject: Union[str, Path], expected: str, actual: str, problem: str) -> None:
+    if expected != actual:
+        raise CheckMismatch(f"{subject}: {problem} (expected sha256 {expected}, found {actual})")
+
+
+def _load_json_for_check(path: Path) -> Dict[str, Any]:
+    if not path.is_file():
+        raise CheckMismatch(f"{path}: missing")
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        raise CheckMismatch(f"{path}: invalid JSON: {e}") from e
+
+
+def _first_difference(recorded: Dict[str, str], expected: Dict[str, str]) -> Optional[str]:
+    for path, sha in expected.items():
+        if path not in recorded:
+            return f"{path} is missing from the files map"
+        if recorded[path] != sha:
+            return f"{path}: files map records sha256 {recorded[path]}, expected {sha}"
+    for path in recorded:
+        if path not in expected:
+            return f"{path} is in the files map but is not produced by the build"
+    return None
+
+
+def check_task_bundles(content_root: Path, questions_root: Path) -> None:
+    """Таск-бандлы совпадают с тем, что собрала бы из файлов-вопросов aggregate_task_bundles."""
+    for locale in LOCALES:
+        locale_dir = content_root / locale
+        if not locale_dir.is_dir():
+            continue
+        for task_dir in sorted(path for path in locale_dir.iterdir() if path.is_dir()):
+            members = sorted(path for path in task_dir.glob("*.json") if path.is_file())
+            payload, _ = encode_task_bundle({member: load_document(member).data for member in members})
+            bundle_path = questions_root / locale / "tasks" / f"{task_dir.name}.json"
+            _expect(bundle_path, _digest([payload]), _file_sha(bundle_path), f"out of date with {task_dir}")
+
+
+def _check_locale(questions_root: Path, locale: str, task_files: List[Path], jobs: int) -> Dict[str, str]:
+    locale_index_path = questions_root / locale / "index.json"
+    locale_index = _load_json_for_check(locale_index_path)
+    # IndexParser понимает и {"path": sha}, и {"path": {"sha256": sha}}
+    recorded: Dict[str, str] = {
+        path: entry.get("sha256", "") if isinstance(entry, dict) else str(entry)
+        for path, entry in (locale_index.get("files") or {}).items()
     }
 
-    root_index_path = questions_root / "index.json"
-    with root_index_path.open("w", encoding="utf-8") as f:
-        json.dump(root_index, f, ensure_ascii=False, indent=2)
+    # 1. Набор таск-бандлов тот же, что в files-карте (дёшево, без чтения файлов)
+    task_paths = [f"questions/{locale}/tasks/{task_file.name}" for task_file in task_files]
+    tasks_prefix = f"questions/{locale}/tasks/"
+    recorded_tasks = [path for path in recorded if path.startswith(tasks_prefix)]
+    difference = _first_difference(
+        {path: "" for path in recorded_tasks}, {path: "" for path in task_paths}
+    )
+    if difference is not None:
+        raise CheckMismatch(f"{locale_index_path}: {difference}")
+
+    # 2. Каждый файл из files-карты на диске совпадает с записанным sha
+    for path, sha in recorded.items():
+        _expect(path, sha, _file_sha(questions_root / path.split("/", 1)[1]), f"does not match {locale_index_path}")
 
-    print(f"[INFO] Wrote root index to {root_index_path}")
+    # 3. Банк, который собрала бы сборка, — из текущих таск-бандлов
+    with stage("load-tasks", tasks=len(task_files), jobs=jobs):
+        results = run_task_jobs([(task_file, locale, task_file.stem, None, None) for task_file in task_files], jobs)
+    questions = [q for _, qs in results for q in (qs or [])]
+    questions.sort(key=bank_sort_key)
+    bank_key = f"questions/{locale}/bank.v1.json"
+    with stage("hash-bank", locale=locale, questions=len(questions)):
+        bank_sha = _digest(iter_json_array(questions))
+    _expect(bank_key, bank_sha, recorded.get(bank_key, "missing"), "is not the bank built from the task bundles")
 
+    # 4. files-карта целиком; производные артефакты проверены в п. 2 и берутся как есть
+    expected: Dict[str, str] = {}
+    labels_path = questions_root / locale / "meta" / "task_labels.json"
+    if labels_path.is_file():
+        expected[f"questions/{locale}/meta/task_labels.json"] = sha256_of_file(labels_path)
+    expected[bank_key] = bank_sha
+    for path, sha in recorded.items():
+        if path not in expected and not path.startswith(tasks_prefix):
+            expected[path] = sha
+    for path, (sha, _) in zip(task_paths, results):
+        expected[path] = sha
+    difference = _first_difference(recorded, expected)
+    if difference is not None:
+        raise CheckMismatch(f"{locale_index_path}: {difference}")
 
-def main() -> None:
+    # 5. Сам index.json локали байт-в-байт
+    expected_index = build_locale_index(locale, expected, locale_index.get("shards"))
+    _expect(
+        locale_index_path,
+        _digest(iter_json(expected_index)),
+        sha256_of_file(locale_index_path),
+        "differs from the index the build would write",
+    )
+    return expected
+
+
+def check_banks_and_indexes(questions_root: Path, jobs: int = 1, content_root: Optional[Path] = None) -> int:
+    """
+    Режим --check: проверяет, что закоммиченные bank.v1.json, index.json локалей
+    и root index.json соответствуют таск-бандлам, ничего не записывая.
+
+    Ожидаемые артефакты сериализуются прямо в хешер (HashingWriter без пути)
+    и сверяются с sha256 из files-карт и с файлами на диске; сначала идут
+    дешёвые проверки, затем пересборка банка в памяти. Производные артефакты
+    (бинарный банк, шарды, дельта, индексы экзамена и поиска) сверяются с
+    files-картой по sha файла, но не пересобираются. С content_root сами
+    таск-бандлы сверяются с файлами-вопросами.
+
+    Поднимает CheckMismatch на первом же расхождении; возвращает число
+    проверенных локалей.
+    """
+    try:
+        if content_root is not None:
+            with stage("check-bundles"):
+                check_task_bundles(content_root, questions_root)
+
+        root_index_path = questions_root / "index.json"
+        _load_json_for_check(root_index_path)
+        expected_locales: Dict[str, Dict[str, str]] = {}
+        for locale in LOCALES:
+            tasks_dir = questions_root / locale / "tasks"
+            task_files = sorted(tasks_dir.glob("*.json")) if tasks_dir.is_dir() else []
+            if not task_files:
+                continue
+            with stage("check", locale=locale):
+                expected_locales[locale] = _check_locale(questions_root, locale, task_files, jobs)
+    except (ValueError, RuntimeError) as e:
+        # Таск-бандл не читается как JSON (RuntimeError загрузчика) или не проходит
+        # валидацию — сборка упала бы
+        raise CheckMismatch(str(e)) from e
+
+    if not expected_locales:
+        raise CheckMismatch(f"{questions_root}: no task bundles found for locales {LOCALES}")
+    _expect(
+        root_index_path,
+        _digest(iter_json(build_root_index(expected_locales))),
+        sha256_of_file(root_index_path),
+        "differs from the root index the build would write",
+    )
+    return len(expected_locales)
+
+
+def build_parser() -> argparse.ArgumentParser:
     # Скрипт предполагает, что лежит в <repo>/tools/
-    # и запускается из корня репо.
     repo_root = Path(__file__).resolve().parents[1]
-    questions_root = repo_root / "app-android" / "src" / "main" / "assets" / "questions"
+    parser = argparse.ArgumentParser(
+        description="Build bank.v1.json and index.json files from aggregated task bundles.",
+    )
+    parser.add_argument(
+        "--questions-root",
+        type=Path,
+        default=repo_root / "app-android" / "src" / "main" / "assets" / "questions",
+        help="Root of the questions assets directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--content-root",
+        type=Path,
+        help="First aggregate <locale>/tasks/<taskId>.json bundles from the per-question files in "
+        "CONTENT_ROOT/<locale>/<taskId>/*.json (as scripts/build-questions-dist.mjs does), "
+        "rebuilding only bundles whose files were added, removed or changed",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=repo_root / "build" / "content-cache" / "bank-build-cache.json",
+        help="Persistent build cache used to skip unchanged task files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the build cache and rebuild everything from scratch.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for loading and hashing task files; 0 means one per CPU (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--binary-bank",
+        nargs="?",
+        const="zlib",
+        choices=sorted(CODECS),
+        help="Also emit <locale>/bank.v1.qwb with the given block codec (default codec: zlib)",
+    )
+    parser.add_argument(
+        "--bank-delta",
+        action="store_true",
+        help="Keep <locale>/bank.manifest.v1.json with per-question hashes and emit "
+        "<locale>/bank.delta.v1.json against the previous build's bank",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Bounded-memory bank build: spill sorted tasks to temporary files and k-way merge them "
+        "into bank.v1.json (same bytes as the default build)",
+    )
+    parser.add_argument(
+        "--shards",
+        choices=SHARD_MODES,
+        help="Also split each bank into compressed shards under <locale>/shards/, one per taskId (task) "
+        "or up to --shard-bytes of minified JSON each (bytes), listed in the locale index.json",
+    )
+    parser.add_argument(
+        "--shard-codec",
+        choices=sorted(SHARD_CODECS),
+        default="gzip",
+        help="Compression of --shards output (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--shard-bytes",
+        type=int,
+        default=DEFAULT_SHARD_BYTES,
+        help="Uncompressed size budget of one shard with --shards bytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Also emit <locale>/search.v1.json, an inverted index of stems, choices and rationales "
+        "for qw_search_index.py; only questions of changed task bundles are re-tokenized",
+    )
+    parser.add_argument(
+        "--exam-profile",
+        nargs="?",
+        type=Path,
+        const=DEFAULT_EXAM_PROFILE,
+        help="Check blueprint quotas of this exam profile before writing anything and emit "
+        "<locale>/exam.index.v1.json (default profile: %(const)s)",
+    )
+    parser.add_argument(
+        "--parity-index",
+        type=Path,
+        help="Warn about en/ru parity issues and task bundles out of sync with content, "
+        "using a qw_parity.py artifact instead of walking content/questions",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Write nothing; verify that the committed banks and index.json files match the task bundles "
+        "(and, with --content-root, that the bundles match the question files). Exits 1 on the first "
+        "mismatch. Derived artifacts are only checked against the files maps.",
+    )
+    add_profile_arguments(parser)
+    return parser
+
 
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    questions_root: Path = args.questions_root
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.check:
+        with profiling_from_args(args):
+            try:
+                checked = check_banks_and_indexes(questions_root, jobs, args.content_root)
+            except CheckMismatch as e:
+                print(f"[FAIL] {e}")
+                raise SystemExit(1)
+        print(f"[INFO] Check passed: banks and indexes of {checked} locale(s) match their sources in {questions_root}")
+        return
+
+    if args.content_root is not None:
+        questions_root.mkdir(parents=True, exist_ok=True)
     if not questions_root.is_dir():
         raise SystemExit(
             f"questions assets dir not found at {questions_root}. "
@@ -222,7 +1426,27 @@ def main() -> None:
         )
 
     print(f"[INFO] Using questions root: {questions_root}")
-    build_banks_and_indexes(questions_root)
+    cache = BuildCache(None if args.no_cache else args.cache_file)
+    exam_profile = load_exam_profile(args.exam_profile) if args.exam_profile is not None else None
+    parity_index = None
+    if args.parity_index is not None:
+        parity_index = load_parity_index(args.parity_index)
+        if parity_index is None:
+            print(f"[WARN] Parity index not found or outdated at {args.parity_index}, skipping parity check")
+    with profiling_from_args(args):
+        build_banks_and_indexes(
+            questions_root,
+            cache,
+            jobs=jobs,
+            binary_codec=args.binary_bank,
+            exam_profile=exam_profile,
+            parity_index=parity_index,
+            bank_delta=args.bank_delta,
+            streaming=args.streaming,
+            shards=ShardSpec(args.shards, args.shard_codec, args.shard_bytes) if args.shards else None,
+            content_root=args.content_root,
+            search_index=args.search_index,
+        )
 
 
 if __name__ == "__main__":